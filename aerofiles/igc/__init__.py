@@ -3,8 +3,29 @@ The IGC file format is used by glide computers to record flights.
 
 - `Spec "IGC-approved Flight Recorders - Technical Specification" <https://fai.org/igc-documents>`_
 - `Wikipedia <https://en.wikipedia.org/wiki/FAI_Gliding_Commission>`__
+
+The modules with heavy dependencies (:mod:`~aerofiles.igc.parallel`,
+:mod:`~aerofiles.igc.shared`, :mod:`~aerofiles.igc.heatmap`,
+:mod:`~aerofiles.igc.archive` and :mod:`~aerofiles.igc.nmea`) are not
+imported by this package, import them directly, e.g.
+``from aerofiles.igc.archive import ArchiveIndex``.
 """
 # flake8: noqa
 
 from .writer import Writer
 from .reader import Reader
+from .lazy import LazyFlight
+from .dedupe import fingerprint, minhash, similarity
+from .phases import PhaseSegmenter, segment_phases
+from .engine import detect_engine_runs
+from .align import align_flights
+from .proximity import find_encounters
+from .resampling import find_gaps, resample
+from .thermals import detect_thermals
+from .seek import read_fixes_between, read_time_range
+from .panel import Panel, PanelBuilder, build_panel
+from .pyramid import TrackPyramid
+from .scoring import TaskScorer, TaskStatus
+from .aggregators import (
+    Aggregator, AltitudeRange, BoundingBox, Distance, FixCount, FixTimes,
+)
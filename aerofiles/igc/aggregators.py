@@ -0,0 +1,171 @@
+"""
+Aggregators compute summaries of a flight while it is parsed by
+:meth:`aerofiles.igc.Reader.read`, without walking the fixes again::
+
+    result = Reader().read(f, aggregators=[
+        BoundingBox(), AltitudeRange(), FixTimes(), FixCount(), Distance(),
+    ], store_fixes=False)
+
+    result['aggregates'][1]
+    # -> {'bbox': (...), 'gps_alt_range': (...), 'fix_times': (...),
+    #     'num_fixes': 1234, 'distance': 345678.9}
+
+Custom aggregators subclass :class:`Aggregator` and set a ``name``.
+"""
+
+from aerofiles.util import geo
+
+
+class Aggregator:
+    """
+    Base class of all aggregators.
+
+    :meth:`on_record` is called for every valid record except fixes, which
+    are passed to :meth:`on_fix` instead. The result of :meth:`finish` is
+    returned by the reader under the ``name`` of the aggregator.
+
+    Aggregators that set ``requires_degrees`` are rejected by a reader with
+    ``integer_coordinates``.
+    """
+
+    name = None
+    requires_degrees = False
+
+    def on_record(self, record_type, record):
+        """
+        Called with the record type (e.g. ``'H'``) and the decoded record.
+        """
+
+    def on_fix(self, fix):
+        """
+        Called with every fix record, including its ``datetime``.
+        """
+
+    def finish(self):
+        """
+        Called after the last record and returns the result.
+        """
+
+
+class BoundingBox(Aggregator):
+    """
+    The bounding box ``(min_lat, min_lon, max_lat, max_lon)`` of all fixes
+    or ``None`` if there are no fixes. The coordinates are in the unit of
+    the fixes, i.e. milli-minutes for a reader with ``integer_coordinates``.
+    """
+
+    name = 'bbox'
+
+    def __init__(self):
+        self.bbox = None
+
+    def on_fix(self, fix):
+        lat = fix['lat']
+        lon = fix['lon']
+        if self.bbox is None:
+            self.bbox = [lat, lon, lat, lon]
+            return
+
+        bbox = self.bbox
+        if lat < bbox[0]:
+            bbox[0] = lat
+        elif lat > bbox[2]:
+            bbox[2] = lat
+        if lon < bbox[1]:
+            bbox[1] = lon
+        elif lon > bbox[3]:
+            bbox[3] = lon
+
+    def finish(self):
+        return tuple(self.bbox) if self.bbox is not None else None
+
+
+class AltitudeRange(Aggregator):
+    """
+    The ``(min, max)`` altitude of all fixes or ``None`` if there are no
+    fixes. The name is ``gps_alt_range`` or ``pressure_alt_range``.
+
+    :param altitude: the fix altitude to use (``gps_alt`` or
+        ``pressure_alt``)
+    """
+
+    def __init__(self, altitude='gps_alt'):
+        self.name = altitude + '_range'
+        self.altitude = altitude
+        self.minimum = None
+        self.maximum = None
+
+    def on_fix(self, fix):
+        value = fix[self.altitude]
+        if self.minimum is None or value < self.minimum:
+            self.minimum = value
+        if self.maximum is None or value > self.maximum:
+            self.maximum = value
+
+    def finish(self):
+        if self.minimum is None:
+            return None
+
+        return self.minimum, self.maximum
+
+
+class FixTimes(Aggregator):
+    """
+    The ``(first, last)`` fix ``datetime`` or ``None`` if there are no fixes.
+    """
+
+    name = 'fix_times'
+
+    def __init__(self):
+        self.first = None
+        self.last = None
+
+    def on_fix(self, fix):
+        if self.first is None:
+            self.first = fix['datetime']
+        self.last = fix['datetime']
+
+    def finish(self):
+        if self.first is None:
+            return None
+
+        return self.first, self.last
+
+
+class FixCount(Aggregator):
+    """
+    The number of fixes.
+    """
+
+    name = 'num_fixes'
+
+    def __init__(self):
+        self.count = 0
+
+    def on_fix(self, fix):
+        self.count += 1
+
+    def finish(self):
+        return self.count
+
+
+class Distance(Aggregator):
+    """
+    The great circle distance in meters along all fixes.
+    """
+
+    name = 'distance'
+    requires_degrees = True
+
+    def __init__(self):
+        self.distance = 0.
+        self.previous = None
+
+    def on_fix(self, fix):
+        position = (fix['lat'], fix['lon'])
+        if self.previous is not None:
+            self.distance += geo.distance(*(self.previous + position))
+        self.previous = position
+
+    def finish(self):
+        return self.distance
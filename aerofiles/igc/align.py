@@ -0,0 +1,166 @@
+import collections
+import heapq
+
+from aerofiles.igc.columns import fix_timestamp, import_numpy
+
+
+class Alignment(collections.namedtuple('Alignment', ['times', 'positions'])):
+    """
+    Flights on a common time axis.
+
+    ``times`` are the times of the axis in seconds (see
+    :func:`~aerofiles.igc.columns.fix_timestamp`) and ``positions`` has the
+    shape ``(flights, times, 3)`` with ``(lat, lon, alt)`` for every flight
+    and time. Times at which a flight has no position (before its first
+    fix, after its last fix or in a gap) are ``nan``. If NumPy is not
+    installed both are nested lists and missing positions are ``None``.
+    """
+
+    __slots__ = ()
+
+
+def _fix_rows(flight, altitude):
+    if isinstance(flight, dict):
+        flight = flight['fix_records'][1]
+
+    return [
+        (fix_timestamp(fix), fix['lat'], fix['lon'], fix[altitude])
+        for fix in flight
+    ]
+
+
+def merged_times(flights):
+    """
+    Return the sorted union of the fix times of all flights. The fix times
+    of every flight are already sorted, so they are combined with a k-way
+    merge.
+
+    :param flights: a list of lists of fix times
+    """
+    times = []
+    for time in heapq.merge(*flights):
+        if not times or times[-1] != time:
+            times.append(time)
+
+    return times
+
+
+def align_flights(flights, step=1, start=None, end=None, max_gap=30,
+                  altitude='gps_alt'):
+    """
+    Put several flights on a common time axis::
+
+        alignment = align_flights([igc1, igc2, igc3], step=1)
+        lat, lon, alt = alignment.positions[0][100]
+
+    Positions between two fixes are linearly interpolated, unless the fixes
+    are more than ``max_gap`` seconds apart.
+
+    :param flights: a list of flights, each given as the result of
+        :meth:`aerofiles.igc.Reader.read` or as a list of fix records. The
+        positions are interpolated in the unit of the fix coordinates, which
+        should be degrees.
+    :param step: the interval of the time axis in seconds. If ``None`` the
+        time axis is the union of all fix times.
+    :param start: the first time of the axis (default: first fix of all
+        flights)
+    :param end: the last time of the axis (default: last fix of all flights)
+    :param max_gap: the maximum time in seconds between two fixes to
+        interpolate between them
+    :param altitude: the fix altitude to use (``gps_alt`` or
+        ``pressure_alt``)
+    :return: an :class:`Alignment`
+    """
+    numpy = import_numpy()
+    rows = [_fix_rows(flight, altitude) for flight in flights]
+
+    if step is None:
+        times = merged_times([[row[0] for row in r] for r in rows])
+        if start is not None:
+            times = [time for time in times if time >= start]
+        if end is not None:
+            times = [time for time in times if time <= end]
+    else:
+        if start is None:
+            start = min([r[0][0] for r in rows if r] or [0])
+        if end is None:
+            end = max([r[-1][0] for r in rows if r] or [start - step])
+        times = list(range(start, end + 1, step))
+
+    if numpy is not None:
+        times = numpy.array(times, dtype=numpy.int64)
+        positions = numpy.full((len(rows), len(times), 3), numpy.nan)
+        for i, r in enumerate(rows):
+            if r:
+                interpolate_rows_array(
+                    numpy.array(r, dtype=numpy.float64), times, max_gap,
+                    positions[i])
+    else:
+        positions = [interpolate_rows(r, times, max_gap) for r in rows]
+
+    return Alignment(times, positions)
+
+
+def interpolate_rows(rows, times, max_gap):
+    """
+    Linearly interpolate rows of values at the given times.
+
+    The sorted rows are merge-joined with the sorted times. Times before the
+    first row, after the last row or between two rows which are more than
+    ``max_gap`` seconds apart get ``None``.
+
+    :param rows: a list of ``(time, value1, value2, ...)`` tuples
+    :param times: the times to interpolate at
+    :param max_gap: the maximum time between two rows to interpolate
+    :return: a list with a list of values or ``None`` for every time
+    """
+    values = []
+    n = len(rows)
+    i = 0
+    for time in times:
+        while i + 1 < n and rows[i + 1][0] <= time:
+            i += 1
+
+        if n == 0 or rows[i][0] > time:
+            values.append(None)
+        elif rows[i][0] == time:
+            values.append(list(rows[i][1:]))
+        elif i + 1 < n and rows[i + 1][0] - rows[i][0] <= max_gap:
+            left, right = rows[i], rows[i + 1]
+            weight = float(time - left[0]) / (right[0] - left[0])
+            values.append([
+                a + (b - a) * weight for a, b in zip(left[1:], right[1:])
+            ])
+        else:
+            values.append(None)
+
+    return values
+
+
+def interpolate_rows_array(rows, times, max_gap, out):
+    """
+    Vectorized version of :func:`interpolate_rows`. ``rows`` is a NumPy
+    array with the time in the first column. The result is written into
+    ``out``, which has one row per time and one column per value. Rows of
+    ``out`` without a value are not changed.
+    """
+    numpy = import_numpy()
+    fix_times = rows[:, 0]
+    n = len(fix_times)
+
+    left = numpy.searchsorted(fix_times, times, side='right') - 1
+    found = left >= 0
+    left = numpy.maximum(left, 0)
+    exact = found & (fix_times[left] == times)
+
+    right = numpy.minimum(left + 1, n - 1)
+    gap = fix_times[right] - fix_times[left]
+    between = found & ~exact & (left + 1 < n) & (gap <= max_gap)
+
+    out[exact] = rows[left[exact], 1:]
+
+    left = left[between]
+    right = right[between]
+    weight = (times[between] - fix_times[left]) / gap[between]
+    out[between] = rows[left, 1:] + \
+        (rows[right, 1:] - rows[left, 1:]) * weight[:, None]
@@ -0,0 +1,320 @@
+import collections
+import math
+import multiprocessing
+import os
+import sqlite3
+
+from aerofiles.igc.columns import fix_timestamp, to_timestamp
+from aerofiles.igc.reader import Reader
+from aerofiles.util import geo
+
+
+class Match(collections.namedtuple('Match', [
+        'flight_id', 'path', 'start_time', 'end_time', 'min_distance'])):
+    """
+    A flight found by :meth:`ArchiveIndex.query`. ``start_time`` and
+    ``end_time`` are the times of the first and last matching fix in seconds
+    since the Unix epoch and ``min_distance`` is the smallest distance of a
+    matching fix in meters.
+    """
+
+    __slots__ = ()
+
+
+def cell_visits(fixes, cell_size):
+    """
+    Return the grid cells visited by a track as a list of
+    ``(row, col, start_time, end_time)`` tuples. Consecutive fixes in the
+    same cell are merged into one visit.
+
+    :param fixes: a list of fix records
+    :param cell_size: the size of the grid cells in degrees
+    """
+    visits = []
+    for fix in fixes:
+        row = int(math.floor(fix['lat'] / cell_size))
+        col = int(math.floor(fix['lon'] / cell_size))
+        time = fix_timestamp(fix)
+        if visits and visits[-1][0] == row and visits[-1][1] == col:
+            visits[-1][3] = time
+        else:
+            visits.append([row, col, time, time])
+
+    return [tuple(visit) for visit in visits]
+
+
+def _read_visits(args):
+    """
+    Return ``(visits, None)`` for a file or ``(None, exception)`` if it can
+    not be read.
+    """
+    path, cell_size = args
+    try:
+        fixes = Reader().read_path(path)['fix_records'][1]
+    except Exception as e:
+        return None, e
+
+    return cell_visits(fixes, cell_size), None
+
+
+class ArchiveIndex:
+    """
+    A spatio-temporal index of the flights in an IGC archive, stored in a
+    local SQLite database::
+
+        index = ArchiveIndex('archive.sqlite', cell_size=0.05)
+        index.add(glob.glob('archive/**/*.igc'), workers=8)
+
+        matches = index.query(
+            lat, lon, radius=2000,
+            start=datetime.datetime(2023, 7, 1),
+            end=datetime.datetime(2023, 8, 1),
+            time_of_day=(14 * 3600, 15 * 3600))
+
+    For every flight the index stores the grid cells its fixes are in,
+    together with the time intervals spent in them. A query first selects
+    the candidate flights from the cells around the position, then reads
+    only those files and checks their fixes.
+
+    :param path: the path of the database file (``':memory:'`` for a
+        temporary index)
+    :param cell_size: the size of the grid cells in degrees. An existing
+        database keeps its cell size.
+
+    ``failed`` is a list of ``(path, exception)`` tuples of the files which
+    the last :meth:`add` could not read.
+    """
+
+    def __init__(self, path, cell_size=0.05):
+        self.connection = sqlite3.connect(path)
+        with self.connection:
+            self.connection.executescript('''
+                CREATE TABLE IF NOT EXISTS meta (
+                    key TEXT PRIMARY KEY, value TEXT);
+                CREATE TABLE IF NOT EXISTS flights (
+                    id INTEGER PRIMARY KEY, path TEXT UNIQUE,
+                    mtime REAL, size INTEGER);
+                CREATE TABLE IF NOT EXISTS visits (
+                    row INTEGER, col INTEGER, flight_id INTEGER,
+                    start_time INTEGER, end_time INTEGER);
+                CREATE INDEX IF NOT EXISTS visits_cell ON visits (row, col);
+            ''')
+            stored = self.connection.execute(
+                "SELECT value FROM meta WHERE key = 'cell_size'").fetchone()
+            if stored is None:
+                self.connection.execute(
+                    "INSERT INTO meta VALUES ('cell_size', ?)", (repr(cell_size), ))
+            else:
+                cell_size = float(stored[0])
+
+        self.cell_size = cell_size
+        self.failed = []
+
+    def close(self):
+        self.connection.close()
+
+    def __len__(self):
+        return self.connection.execute(
+            'SELECT COUNT(*) FROM flights').fetchone()[0]
+
+    def paths(self):
+        """
+        Return the paths of all indexed flights.
+        """
+        return [row[0] for row in self.connection.execute(
+            'SELECT path FROM flights ORDER BY id')]
+
+    def add(self, paths, workers=None, pool=None):
+        """
+        Add IGC files to the index. Files which are already indexed and
+        have not changed since (same modification time and size) are
+        skipped, changed files are indexed again. The files are read in a
+        :class:`multiprocessing.Pool` with ``workers`` processes. Files
+        which can not be read are skipped and listed in :attr:`failed`.
+
+        :param paths: a list of IGC file paths
+        :param workers: the number of worker processes (default: number of
+            CPUs)
+        :param pool: a :class:`multiprocessing.pool.Pool` to use instead of
+            creating a new one
+        :return: the number of files that were indexed
+        """
+        indexed = dict(
+            (row[0], row[1:]) for row in
+            self.connection.execute('SELECT path, mtime, size FROM flights'))
+
+        changed = []
+        for path in paths:
+            stat = os.stat(path)
+            if indexed.get(path) != (stat.st_mtime, stat.st_size):
+                changed.append((path, stat))
+
+        jobs = [(path, self.cell_size) for path, _ in changed]
+        own_pool = None
+        if pool is None and workers != 1 and len(jobs) > 1:
+            pool = own_pool = multiprocessing.Pool(workers)
+
+        try:
+            if pool is None:
+                results = (_read_visits(job) for job in jobs)
+            else:
+                results = pool.imap(_read_visits, jobs)
+
+            self.failed = []
+            for (path, stat), (visits, error) in zip(changed, results):
+                if error is not None:
+                    self.failed.append((path, error))
+                else:
+                    self.add_visits(path, visits, stat.st_mtime, stat.st_size)
+        finally:
+            if own_pool is not None:
+                own_pool.close()
+                own_pool.join()
+
+        return len(changed) - len(self.failed)
+
+    def add_visits(self, path, visits, mtime=None, size=None):
+        """
+        Add or replace the cell visits of a flight, e.g. computed with
+        :func:`cell_visits` from the result of
+        :meth:`aerofiles.igc.Reader.read`.
+        """
+        with self.connection:
+            row = self.connection.execute(
+                'SELECT id FROM flights WHERE path = ?', (path, )).fetchone()
+            if row is None:
+                flight_id = self.connection.execute(
+                    'INSERT INTO flights (path, mtime, size) VALUES (?, ?, ?)',
+                    (path, mtime, size)).lastrowid
+            else:
+                flight_id = row[0]
+                self.connection.execute(
+                    'UPDATE flights SET mtime = ?, size = ? WHERE id = ?',
+                    (mtime, size, flight_id))
+                self.connection.execute(
+                    'DELETE FROM visits WHERE flight_id = ?', (flight_id, ))
+
+            self.connection.executemany(
+                'INSERT INTO visits VALUES (?, ?, ?, ?, ?)',
+                [(r, c, flight_id, start, end) for r, c, start, end in visits])
+
+        return flight_id
+
+    def candidates(self, lat, lon, radius, start=None, end=None,
+                   time_of_day=None):
+        """
+        Return the ids and paths of the flights which have fixes in the grid
+        cells around a position in the given time range. The arguments are
+        the same as for :meth:`query`.
+        """
+        start, end = to_timestamp(start), to_timestamp(end)
+
+        d_lat = math.degrees(radius / geo.EARTH_RADIUS)
+        cos_lat = math.cos(math.radians(min(abs(lat) + d_lat, 90.)))
+        d_lon = 180. if cos_lat < 1e-9 else min(d_lat / cos_lat, 180.)
+
+        cell = self.cell_size
+        sql = (
+            'SELECT DISTINCT visits.flight_id, flights.path, '
+            'visits.start_time, visits.end_time FROM visits '
+            'JOIN flights ON flights.id = visits.flight_id '
+            'WHERE row BETWEEN ? AND ? AND col BETWEEN ? AND ?'
+        )
+        parameters = [
+            int(math.floor((lat - d_lat) / cell)),
+            int(math.floor((lat + d_lat) / cell)),
+            int(math.floor((lon - d_lon) / cell)),
+            int(math.floor((lon + d_lon) / cell)),
+        ]
+        if start is not None:
+            sql += ' AND visits.end_time >= ?'
+            parameters.append(start)
+        if end is not None:
+            sql += ' AND visits.start_time <= ?'
+            parameters.append(end)
+
+        flights = {}
+        for flight_id, path, visit_start, visit_end in \
+                self.connection.execute(sql, parameters):
+            if time_of_day is None or _overlaps_time_of_day(
+                    visit_start, visit_end, time_of_day):
+                flights[flight_id] = path
+
+        return sorted(flights.items())
+
+    def query(self, lat, lon, radius, start=None, end=None, time_of_day=None):
+        """
+        Find the flights with fixes within ``radius`` meters of a position::
+
+            for match in index.query(50.2, 8.5, 2000):
+                print(match.path, match.min_distance)
+
+        :param lat: the latitude of the position
+        :param lon: the longitude of the position
+        :param radius: the search radius in meters
+        :param start: the earliest fix time as ``datetime`` (naive values
+            are UTC) or as seconds since the Unix epoch
+        :param end: the latest fix time, like ``start``
+        :param time_of_day: a ``(start, end)`` tuple of seconds since
+            midnight UTC to only match fixes at that time of any day. The
+            window may cross midnight, e.g. ``(23 * 3600, 3600)``.
+        :return: a list of :class:`Match` tuples, flights whose files can not
+            be read anymore are skipped
+        """
+        start_time, end_time = to_timestamp(start), to_timestamp(end)
+
+        matches = []
+        for flight_id, path in self.candidates(
+                lat, lon, radius, start, end, time_of_day):
+            try:
+                fixes = Reader().read_path(path)['fix_records'][1]
+            except Exception:
+                # e.g. a file that was deleted since it was indexed
+                continue
+
+            times = []
+            min_distance = None
+            for fix in fixes:
+                time = fix_timestamp(fix)
+                if start_time is not None and time < start_time:
+                    continue
+                if end_time is not None and time > end_time:
+                    continue
+                if time_of_day is not None and not _overlaps_time_of_day(
+                        time, time, time_of_day):
+                    continue
+
+                distance = geo.distance(lat, lon, fix['lat'], fix['lon'])
+                if distance <= radius:
+                    times.append(time)
+                    if min_distance is None or distance < min_distance:
+                        min_distance = distance
+
+            if times:
+                matches.append(
+                    Match(flight_id, path, times[0], times[-1], min_distance))
+
+        return matches
+
+
+def _overlaps_time_of_day(start, end, time_of_day):
+    """
+    Check if the interval ``[start, end]`` (seconds since the Unix epoch)
+    overlaps the daily window ``time_of_day``.
+    """
+    if end - start >= 86400:
+        return True
+
+    window_start, window_end = time_of_day
+    if window_start > window_end:
+        # a window across midnight
+        return _overlaps_time_of_day(start, end, (window_start, 86400)) or \
+            _overlaps_time_of_day(start, end, (0, window_end))
+
+    day = start - start % 86400
+    for offset in (-86400, 0, 86400):
+        if start <= day + offset + window_end and \
+                end >= day + offset + window_start:
+            return True
+
+    return False
@@ -0,0 +1,134 @@
+import calendar
+import datetime
+
+# ``True`` after importing NumPy failed once, see import_numpy()
+numpy_missing = False
+
+
+# Keys of a fix record returned by :class:`~aerofiles.igc.Reader` that are
+# not fix extensions.
+FIX_KEYS = (
+    'time', 'lat', 'lon', 'validity', 'pressure_alt', 'gps_alt',
+    'datetime', 'datetime_local',
+)
+
+
+def fix_timestamp(fix):
+    """
+    Return the time of a fix as integer seconds.
+
+    Fixes returned by :class:`~aerofiles.igc.Reader` have a ``datetime``,
+    which is converted to seconds since the Unix epoch (UTC) and therefore
+    keeps increasing across midnight. Fixes decoded by the
+    :class:`~aerofiles.igc.reader.LowLevelReader` only have a ``time``, which
+    is converted to seconds since midnight.
+
+    :param fix: a fix record dictionary
+    """
+    if 'datetime' in fix:
+        return calendar.timegm(fix['datetime'].utctimetuple())
+
+    time = fix['time']
+    return time.hour * 3600 + time.minute * 60 + time.second
+
+
+def to_timestamp(value):
+    """
+    Convert a ``datetime`` to seconds since the Unix epoch, naive values are
+    taken as UTC. Numbers are returned unchanged.
+    """
+    if isinstance(value, datetime.datetime):
+        return calendar.timegm(value.utctimetuple())
+
+    return value
+
+
+def import_numpy():
+    """
+    Return the :mod:`numpy` module or ``None`` if it is not installed.
+
+    NumPy is optional and takes longer to import than all of
+    :mod:`aerofiles.igc`, so it is only imported by the functions that use
+    it, when they are called.
+    """
+    global numpy_missing
+    if not numpy_missing:
+        try:
+            import numpy
+            return numpy
+        except ImportError:
+            numpy_missing = True
+
+    return None
+
+
+def scalar(value):
+    """
+    Convert a NumPy scalar to the equivalent Python number. Other values are
+    returned unchanged.
+    """
+    return getattr(value, 'item', lambda: value)()
+
+
+def fix_extension_types(fixes):
+    """
+    Return the extension types (e.g. ``ENL``) found in the fix records in
+    the order of their first appearance.
+    """
+    extensions = []
+    for fix in fixes:
+        for key in fix:
+            if key not in FIX_KEYS and key not in extensions:
+                extensions.append(key)
+
+    return extensions
+
+
+def fix_columns(fixes, extensions=None):
+    """
+    Convert a list of fix records into columns::
+
+        columns = fix_columns(igc['fix_records'][1])
+        columns['time']  # -> [992707360, 992707365, ...]
+
+    The result is a dictionary with the columns ``time`` (see
+    :func:`fix_timestamp`), ``lat``, ``lon``, ``validity`` (``True`` for
+    3D fixes), ``pressure_alt``, ``gps_alt`` and one column per fix
+    extension. If NumPy is installed the columns are NumPy arrays and missing
+    extension values are ``nan``, otherwise they are lists and missing
+    extension values are ``None``.
+
+    :param fixes: a list of fix records
+    :param extensions: the extension types that should be converted
+        (default: all extensions found in the fix records)
+    """
+    if extensions is None:
+        extensions = fix_extension_types(fixes)
+
+    columns = {
+        'time': [fix_timestamp(fix) for fix in fixes],
+        'lat': [fix['lat'] for fix in fixes],
+        'lon': [fix['lon'] for fix in fixes],
+        'validity': [fix['validity'] == 'A' for fix in fixes],
+        'pressure_alt': [fix['pressure_alt'] for fix in fixes],
+        'gps_alt': [fix['gps_alt'] for fix in fixes],
+    }
+    for extension in extensions:
+        columns[extension] = [fix.get(extension) for fix in fixes]
+
+    numpy = import_numpy()
+    if numpy is None:
+        return columns
+
+    for key in ('time', 'pressure_alt', 'gps_alt'):
+        columns[key] = numpy.array(columns[key], dtype=numpy.int64)
+    for key in ('lat', 'lon'):
+        columns[key] = numpy.array(columns[key], dtype=numpy.float64)
+    columns['validity'] = numpy.array(columns['validity'], dtype=bool)
+    for extension in extensions:
+        columns[extension] = numpy.array(
+            [numpy.nan if value is None else value
+             for value in columns[extension]],
+            dtype=numpy.float64)
+
+    return columns
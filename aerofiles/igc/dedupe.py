@@ -0,0 +1,112 @@
+import hashlib
+import random
+import zlib
+
+from aerofiles.igc.columns import import_numpy
+
+
+# Mersenne prime used for the MinHash permutations. It is small enough that
+# ``a * x + b`` never overflows a 64 bit integer for 32 bit shingle hashes.
+MINHASH_PRIME = (1 << 31) - 1
+
+
+def iter_fix_keys(file_obj):
+    """
+    Iterate over the normalised B records of an IGC file.
+
+    Only the time, latitude, longitude, pressure altitude and GPS altitude
+    of every B record are kept. The validity flag, the fix extensions, all
+    other record types and any surrounding whitespace are ignored, so that
+    re-exported files with changed headers or stripped G records produce the
+    same keys. The lines are not decoded into fix objects.
+
+    :param file_obj: a Python file object, opened in binary or text mode
+    """
+    for line in file_obj:
+        line = line.strip()
+        if not isinstance(line, bytes):
+            line = line.encode('ascii', 'replace')
+
+        if line[0:1] != b'B' or len(line) < 35:
+            continue
+
+        yield line[1:24] + line[25:35]
+
+
+def fingerprint(file_obj):
+    """
+    Return a hex digest identifying the fixes of an IGC file::
+
+        with open('track.igc', 'rb') as f:
+            key = fingerprint(f)
+
+    Two files have the same fingerprint if their B records contain the same
+    times, positions and altitudes in the same order. See
+    :func:`~aerofiles.igc.dedupe.iter_fix_keys` for the normalisation.
+
+    :param file_obj: a Python file object, opened in binary or text mode
+    """
+    digest = hashlib.sha1()
+    for key in iter_fix_keys(file_obj):
+        digest.update(key)
+        digest.update(b'\n')
+
+    return digest.hexdigest()
+
+
+def minhash(file_obj, num_perm=64, seed=1):
+    """
+    Return a MinHash signature of the fixes of an IGC file::
+
+        with open('track.igc', 'rb') as f:
+            signature = minhash(f)
+
+    The signature treats the flight as the set of its normalised fixes.
+    Use :func:`~aerofiles.igc.dedupe.similarity` to estimate the
+    Jaccard similarity of two flights, e.g. to find near-duplicates which
+    were cut or resampled before uploading. Signatures are only comparable
+    if they were created with the same ``num_perm`` and ``seed``.
+
+    :param file_obj: a Python file object, opened in binary or text mode
+    :param num_perm: the number of hash permutations (signature length)
+    :param seed: the seed of the hash permutations
+    """
+    numpy = import_numpy()
+    rand = random.Random(seed)
+    permutations = [
+        (rand.randint(1, MINHASH_PRIME - 1), rand.randint(0, MINHASH_PRIME - 1))
+        for _ in range(num_perm)
+    ]
+
+    hashes = set()
+    for key in iter_fix_keys(file_obj):
+        hashes.add((zlib.crc32(key) & 0xffffffff) % MINHASH_PRIME)
+
+    if not hashes:
+        return tuple([MINHASH_PRIME] * num_perm)
+
+    if numpy is not None:
+        values = numpy.fromiter(hashes, dtype=numpy.int64, count=len(hashes))
+        a = numpy.array([p[0] for p in permutations], dtype=numpy.int64)
+        b = numpy.array([p[1] for p in permutations], dtype=numpy.int64)
+        signature = ((numpy.outer(a, values) + b[:, None]) % MINHASH_PRIME).min(axis=1)
+        return tuple(int(value) for value in signature)
+
+    return tuple(
+        min([(a * value + b) % MINHASH_PRIME for value in hashes])
+        for a, b in permutations
+    )
+
+
+def similarity(signature1, signature2):
+    """
+    Estimate the Jaccard similarity of two flights from their
+    :func:`~aerofiles.igc.dedupe.minhash` signatures.
+
+    :return: a value between ``0.0`` (no common fixes) and ``1.0``
+    """
+    if len(signature1) != len(signature2):
+        raise ValueError('Signatures have different lengths')
+
+    matches = sum(1 for a, b in zip(signature1, signature2) if a == b)
+    return float(matches) / len(signature1)
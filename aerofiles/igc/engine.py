@@ -0,0 +1,135 @@
+import collections
+
+from aerofiles.igc.columns import (
+    fix_columns, fix_extension_types, import_numpy, scalar,
+)
+
+
+# Fix extensions that measure engine noise or power, in order of preference
+ENGINE_SENSORS = ('MOP', 'ENL')
+
+
+class EngineRun(collections.namedtuple('EngineRun', [
+        'start_time', 'end_time', 'start_index', 'end_index',
+        'altitude_gain', 'max_level'])):
+    """
+    A period in which the engine was running.
+
+    The times are seconds as returned by
+    :func:`~aerofiles.igc.columns.fix_timestamp`. The fixes of the run are
+    ``fixes[start_index:end_index]`` and ``end_time`` is the time of the
+    first fix after the run (or of the last fix). ``altitude_gain`` is the
+    altitude difference between the first fix of the run and ``end_time``
+    and ``max_level`` is the highest sensor value during the run.
+    """
+
+    __slots__ = ()
+
+    @property
+    def duration(self):
+        return self.end_time - self.start_time
+
+
+def engine_sensor(fixes):
+    """
+    Return the fix extension used for engine run detection (``MOP`` is
+    preferred over ``ENL``) or ``None`` if the fixes have neither.
+    """
+    extensions = fix_extension_types(fixes)
+    for sensor in ENGINE_SENSORS:
+        if sensor in extensions:
+            return sensor
+
+    return None
+
+
+def detect_engine_runs(fixes, sensor=None, altitude='pressure_alt', **kwargs):
+    """
+    Find the engine runs of a flight::
+
+        runs = detect_engine_runs(igc['fix_records'][1])
+
+    The engine is considered running once the sensor value reaches
+    ``on_level`` and until it drops to ``off_level`` again. Runs shorter than
+    ``min_duration`` seconds are ignored. Flights without ``MOP`` or ``ENL``
+    extension have no engine runs.
+
+    :param fixes: a list of fix records
+    :param sensor: the fix extension to use (default: see
+        :func:`engine_sensor`)
+    :param altitude: the altitude used for ``altitude_gain`` (``pressure_alt``
+        or ``gps_alt``)
+    :param on_level: sensor value from which the engine is considered
+        running (default: ``500``)
+    :param off_level: sensor value from which the engine is considered off
+        again (default: ``250``)
+    :param min_duration: minimum duration of an engine run in seconds
+        (default: ``30``)
+    :return: a list of :class:`EngineRun` tuples
+    """
+    if sensor is None:
+        sensor = engine_sensor(fixes)
+        if sensor is None:
+            return []
+
+    columns = fix_columns(fixes, extensions=[sensor])
+    return detect_engine_run_columns(
+        columns['time'], columns[sensor], columns[altitude], **kwargs)
+
+
+def detect_engine_run_columns(time, level, altitude, on_level=500,
+                              off_level=250, min_duration=30):
+    """
+    Column based version of :func:`detect_engine_runs`. Takes sequences of
+    the fix times (in seconds), sensor values (``None`` or ``nan`` if
+    missing) and altitudes. The hysteresis is computed in a vectorized way
+    if NumPy is installed.
+    """
+    numpy = import_numpy()
+    n = len(time)
+    if n == 0:
+        return []
+
+    if numpy is not None:
+        level = numpy.asarray(level, dtype=numpy.float64)
+        # +1 above on_level, -1 below off_level, 0 in between or missing
+        marks = (level >= on_level).astype(numpy.int8) - \
+            (level <= off_level).astype(numpy.int8)
+        positions = numpy.where(marks != 0, numpy.arange(n), -1)
+        last_mark = numpy.maximum.accumulate(positions)
+        running = (last_mark >= 0) & (marks[last_mark] > 0)
+
+        changes = numpy.flatnonzero(running[1:] != running[:-1]) + 1
+        bounds = numpy.concatenate(([0], changes, [n])).tolist()
+        intervals = [
+            (start, end) for start, end in zip(bounds[:-1], bounds[1:])
+            if running[start]
+        ]
+    else:
+        intervals = []
+        start = None
+        for i, value in enumerate(level):
+            if value is None:
+                continue
+            if start is None and value >= on_level:
+                start = i
+            elif start is not None and value <= off_level:
+                intervals.append((start, i))
+                start = None
+        if start is not None:
+            intervals.append((start, n))
+
+    runs = []
+    for start, end in intervals:
+        end_time = time[min(end, n - 1)]
+        if end_time - time[start] < min_duration:
+            continue
+
+        runs.append(EngineRun(
+            scalar(time[start]), scalar(end_time), start, end,
+            scalar(altitude[min(end, n - 1)] - altitude[start]),
+            int(max(value for value in level[start:end]
+                    if value is not None and value == value)),
+        ))
+
+    return runs
@@ -0,0 +1,213 @@
+import collections
+import math
+import multiprocessing
+
+from aerofiles.igc.columns import fix_columns, import_numpy
+from aerofiles.igc.reader import Reader
+
+
+class Grid(collections.namedtuple('Grid', [
+        'min_lat', 'min_lon', 'max_lat', 'max_lon', 'cell_size'])):
+    """
+    A regular grid over a bounding box with square cells of ``cell_size``
+    degrees. Row ``0`` is at ``min_lat`` and column ``0`` at ``min_lon``.
+    """
+
+    __slots__ = ()
+
+    @property
+    def shape(self):
+        return (
+            int(math.ceil(round((self.max_lat - self.min_lat) / self.cell_size, 9))),
+            int(math.ceil(round((self.max_lon - self.min_lon) / self.cell_size, 9))),
+        )
+
+    def cells(self, lat, lon):
+        """
+        Return the row and column indexes of the cells containing the given
+        positions and a mask of the positions inside the grid.
+        """
+        numpy = import_numpy()
+        rows, cols = self.shape
+        row = numpy.floor(
+            (numpy.asarray(lat) - self.min_lat) / self.cell_size).astype(numpy.int64)
+        col = numpy.floor(
+            (numpy.asarray(lon) - self.min_lon) / self.cell_size).astype(numpy.int64)
+        inside = (row >= 0) & (row < rows) & (col >= 0) & (col < cols)
+        return row, col, inside
+
+
+class Heatmap:
+    """
+    Fix counts, time and climb accumulated per grid cell.
+
+    ``counts`` is the number of fixes per cell, ``time`` the time in seconds
+    spent in a cell and ``climb`` the altitude change in meters while in a
+    cell. The interval between two fixes counts for the cell of the first
+    fix. Intervals longer than ``max_gap`` seconds are ignored.
+    ``failed`` is a list of ``(path, exception)`` tuples of the files which
+    :func:`build_heatmap` could not read.
+
+    :param grid: a :class:`Grid`
+    :param altitude: the fix altitude to use (``gps_alt`` or
+        ``pressure_alt``)
+    :param max_gap: the longest interval between two fixes in seconds
+    """
+
+    def __init__(self, grid, altitude='gps_alt', max_gap=30):
+        numpy = import_numpy()
+        if numpy is None:
+            raise ImportError('Heatmap requires NumPy')
+        if grid.cell_size <= 0 or min(grid.shape) <= 0:
+            raise ValueError('Invalid grid: %s' % (grid, ))
+
+        self.grid = grid
+        self.altitude = altitude
+        self.max_gap = max_gap
+        self.counts = numpy.zeros(grid.shape, dtype=numpy.int64)
+        self.time = numpy.zeros(grid.shape)
+        self.climb = numpy.zeros(grid.shape)
+        self.failed = []
+
+    @property
+    def vario(self):
+        """
+        The average vertical speed in m/s per cell, ``nan`` for cells
+        without time.
+        """
+        numpy = import_numpy()
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            return numpy.where(self.time > 0, self.climb / self.time, numpy.nan)
+
+    def add_fixes(self, fixes):
+        """
+        Add the fixes of a flight.
+        """
+        numpy = import_numpy()
+        columns = fix_columns(fixes, extensions=[])
+        if not len(columns['time']):
+            return
+
+        size = self.counts.size
+        row, col, inside = self.grid.cells(columns['lat'], columns['lon'])
+        index = row * self.counts.shape[1] + col
+
+        self.counts += numpy.bincount(
+            index[inside], minlength=size).reshape(self.counts.shape)
+
+        dt = numpy.diff(columns['time'])
+        dz = numpy.diff(columns[self.altitude])
+        intervals = inside[:-1] & (dt > 0) & (dt <= self.max_gap)
+        self.time += numpy.bincount(
+            index[:-1][intervals], weights=dt[intervals],
+            minlength=size).reshape(self.counts.shape)
+        self.climb += numpy.bincount(
+            index[:-1][intervals], weights=dz[intervals],
+            minlength=size).reshape(self.counts.shape)
+
+    def add_file(self, path):
+        """
+        Read an IGC file and add its fixes.
+        """
+        self.add_fixes(Reader().read_path(path)['fix_records'][1])
+
+    def merge(self, other):
+        """
+        Add the values of another heatmap with the same grid.
+        """
+        if other.grid != self.grid:
+            raise ValueError('Heatmaps have different grids')
+
+        self.counts += other.counts
+        self.time += other.time
+        self.climb += other.climb
+        self.failed.extend(other.failed)
+
+    def save(self, path):
+        """
+        Save the heatmap as compressed NumPy ``.npz`` file.
+        """
+        numpy = import_numpy()
+        numpy.savez_compressed(
+            path, grid=numpy.array(self.grid, dtype=numpy.float64),
+            counts=self.counts, time=self.time, climb=self.climb,
+            altitude=self.altitude, max_gap=self.max_gap)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Load a heatmap saved with :meth:`save`.
+        """
+        numpy = import_numpy()
+        with numpy.load(path) as data:
+            heatmap = cls(
+                Grid(*data['grid'].tolist()),
+                altitude=str(data['altitude']),
+                max_gap=data['max_gap'].item())
+            heatmap.counts = data['counts']
+            heatmap.time = data['time']
+            heatmap.climb = data['climb']
+
+        return heatmap
+
+
+def _accumulate(args):
+    paths, grid, altitude, max_gap = args
+    heatmap = Heatmap(grid, altitude=altitude, max_gap=max_gap)
+    for path in paths:
+        try:
+            heatmap.add_file(path)
+        except Exception as e:
+            heatmap.failed.append((path, e))
+
+    return heatmap
+
+
+def build_heatmap(paths, grid, workers=None, altitude='gps_alt', max_gap=30,
+                  pool=None):
+    """
+    Build a :class:`Heatmap` from many IGC files::
+
+        grid = Grid(45., 5., 48., 11., cell_size=0.01)
+        heatmap = build_heatmap(paths, grid, workers=8)
+        heatmap.save('season.npz')
+
+    The files are split into one batch per worker. Every worker process
+    accumulates its batch into its own arrays, which are merged at the end.
+    Files which can not be read are skipped and listed in
+    :attr:`Heatmap.failed`. Requires NumPy.
+
+    :param paths: a list of IGC file paths
+    :param grid: a :class:`Grid`
+    :param workers: the number of worker processes (default: number of CPUs)
+    :param altitude: see :class:`Heatmap`
+    :param max_gap: see :class:`Heatmap`
+    :param pool: a :class:`multiprocessing.pool.Pool` to use instead of
+        creating a new one
+    """
+    paths = list(paths)
+    heatmap = Heatmap(grid, altitude=altitude, max_gap=max_gap)
+
+    if workers is None:
+        workers = multiprocessing.cpu_count()
+    batches = [
+        (paths[i::workers], grid, altitude, max_gap)
+        for i in range(min(workers, len(paths)))
+    ]
+
+    if pool is not None:
+        results = pool.map(_accumulate, batches)
+    elif len(batches) < 2:
+        results = [_accumulate(batch) for batch in batches]
+    else:
+        pool = multiprocessing.Pool(len(batches))
+        try:
+            results = pool.map(_accumulate, batches)
+        finally:
+            pool.close()
+            pool.join()
+
+    for result in results:
+        heatmap.merge(result)
+
+    return heatmap
@@ -0,0 +1,203 @@
+import io
+
+from aerofiles.igc.reader import Reader
+
+
+class LazyFlight:
+    """
+    A lazily decoded IGC flight.
+
+    When the flight is opened the file content is scanned once and the byte
+    offsets of the lines of every record type are remembered. Nothing is
+    decoded at that point. Each section (``header``, ``fix_records``,
+    ``task``, ...) is decoded on first access by running
+    :class:`~aerofiles.igc.Reader` over the lines it depends on and is then
+    cached. The sections are identical to the ones returned by
+    :meth:`aerofiles.igc.Reader.read`.
+
+    Example:
+
+    .. sourcecode:: python
+
+        >>> with open('track.igc', 'rb') as f:
+        ...     flight = LazyFlight(f)
+        >>> flight.header[1]['pilot']
+        'Bloggs Bill D'
+        >>> len(flight['fix_records'][1])
+        10
+
+    :param file_obj: a Python file object, opened in binary or text mode
+    :param skip_duplicates: see :class:`~aerofiles.igc.Reader`
+    :param encoding: the encoding used to decode the lines of a binary file
+    :param integer_coordinates: see :class:`~aerofiles.igc.Reader`
+    """
+
+    # The record types every section is built from. Fix records need the
+    # date and timezone headers and the I record, K records need the J
+    # record to be decoded.
+    SECTIONS = {
+        'logger_id': 'A',
+        'fix_records': 'HIB',
+        'task': 'C',
+        'dgps_records': 'D',
+        'event_records': 'E',
+        'satellite_records': 'F',
+        'security_records': 'G',
+        'header': 'H',
+        'fix_record_extensions': 'I',
+        'k_record_extensions': 'J',
+        'k_records': 'JK',
+        'comment_records': 'L',
+    }
+
+    def __init__(self, file_obj, skip_duplicates=False, encoding='utf-8',
+                 integer_coordinates=False):
+        self.skip_duplicates = skip_duplicates
+        self.integer_coordinates = integer_coordinates
+        self.encoding = encoding
+        self.data = file_obj.read()
+        self.index = self.build_index(self.data)
+        self.sections = {}
+
+    @staticmethod
+    def build_index(data):
+        """
+        Scan the raw file content and return a dictionary that maps every
+        record type to a list of ``(start, end)`` offset ranges. Consecutive
+        lines of the same record type are merged into one range.
+
+        :param data: the file content as ``bytes`` or ``str``
+        """
+        index = {}
+        last_type = None
+        position = 0
+        for line in LazyFlight.split_lines(data):
+            end = position + len(line)
+            record_type = line[0:1]
+            if not isinstance(record_type, str):
+                record_type = record_type.decode('ascii', 'replace')
+
+            ranges = index.get(record_type)
+            if record_type == last_type:
+                ranges[-1] = (ranges[-1][0], end)
+            elif ranges is None:
+                index[record_type] = [(position, end)]
+            else:
+                ranges.append((position, end))
+
+            last_type = record_type
+            position = end
+
+        return index
+
+    @staticmethod
+    def split_lines(data):
+        """
+        Split the content into lines the same way iterating over a file
+        object does, i.e. only at ``\\n`` and keeping the line endings.
+        """
+        if isinstance(data, str):
+            return io.StringIO(data)
+        return io.BytesIO(data)
+
+    def lines(self, record_types):
+        """
+        Return the lines of the given record types in file order.
+
+        :param record_types: a string of record type letters (e.g. ``'HIB'``)
+        """
+        ranges = []
+        for record_type in record_types:
+            ranges.extend(self.index.get(record_type, []))
+        ranges.sort()
+
+        lines = []
+        for start, end in ranges:
+            for line in self.split_lines(self.data[start:end]):
+                if not isinstance(line, str):
+                    line = line.decode(self.encoding, 'replace')
+                lines.append(line)
+
+        return lines
+
+    def section(self, name):
+        """
+        Return the named section, decoding it on first access.
+
+        :param name: one of the keys returned by
+            :meth:`aerofiles.igc.Reader.read`
+        """
+        if name not in self.sections:
+            if name not in self.SECTIONS:
+                raise KeyError(name)
+
+            reader = Reader(skip_duplicates=self.skip_duplicates,
+                            integer_coordinates=self.integer_coordinates)
+            result = reader.read(self.lines(self.SECTIONS[name]))
+            self.sections[name] = result[name]
+
+        return self.sections[name]
+
+    def __getitem__(self, name):
+        return self.section(name)
+
+    def __contains__(self, name):
+        return name in self.SECTIONS
+
+    def keys(self):
+        return self.SECTIONS.keys()
+
+    def to_dict(self):
+        """
+        Decode all sections and return them in the same dictionary format as
+        :meth:`aerofiles.igc.Reader.read`.
+        """
+        return dict((name, self.section(name)) for name in self.SECTIONS)
+
+    @property
+    def logger_id(self):
+        return self.section('logger_id')
+
+    @property
+    def fix_records(self):
+        return self.section('fix_records')
+
+    @property
+    def task(self):
+        return self.section('task')
+
+    @property
+    def dgps_records(self):
+        return self.section('dgps_records')
+
+    @property
+    def event_records(self):
+        return self.section('event_records')
+
+    @property
+    def satellite_records(self):
+        return self.section('satellite_records')
+
+    @property
+    def security_records(self):
+        return self.section('security_records')
+
+    @property
+    def header(self):
+        return self.section('header')
+
+    @property
+    def fix_record_extensions(self):
+        return self.section('fix_record_extensions')
+
+    @property
+    def k_record_extensions(self):
+        return self.section('k_record_extensions')
+
+    @property
+    def k_records(self):
+        return self.section('k_records')
+
+    @property
+    def comment_records(self):
+        return self.section('comment_records')
@@ -0,0 +1,417 @@
+"""
+Convert NMEA 0183 streams of GPS receivers and variometers into IGC fixes.
+
+:class:`NMEAPipeline` parses the sentences incrementally, fuses the
+``GGA`` and ``RMC`` sentences of each GPS epoch with the latest pressure
+altitude and writes the fixes with :meth:`aerofiles.igc.Writer.write_fix`.
+
+The ``bench`` command replays a recorded NMEA file at a multiple of its
+original speed and reports the latency from the last sentence of an epoch
+to the written B record::
+
+    $ python -m aerofiles.igc.nmea bench recording.nmea --speed 10
+"""
+
+import optparse
+import sys
+import time as time_module
+
+from aerofiles.igc.writer import Writer
+from aerofiles.util.units import FEET, KILOMETERS_PER_HOUR, KNOTS, from_SI, to_SI
+
+# The fix extensions that can be filled from the NMEA sentences
+EXTENSIONS = ('SIU', 'GSP', 'TRT')
+
+
+def checksum(data):
+    """
+    Return the NMEA checksum (the XOR of all characters) of a sentence
+    without the ``$`` and the ``*``.
+    """
+    result = 0
+    for char in data:
+        result ^= ord(char)
+    return result
+
+
+def parse_sentence(line):
+    """
+    Split an NMEA sentence into its fields, e.g.
+    ``['GPGGA', '123519', ...]``. Returns ``None`` if the line is not a
+    sentence or its checksum does not match.
+    """
+    line = line.strip()
+    if not line.startswith('$'):
+        return None
+
+    data, _, expected = line[1:].partition('*')
+    if expected:
+        try:
+            if int(expected, 16) != checksum(data):
+                return None
+        except ValueError:
+            return None
+
+    return data.split(',')
+
+
+def decode_coordinate(value, hemisphere, degree_digits):
+    """
+    Decode an NMEA ``(d)ddmm.mmmm`` coordinate into milli-minutes.
+    """
+    if not value:
+        return None
+
+    result = int(value[:degree_digits]) * 60000 + \
+        int(round(float(value[degree_digits:]) * 1000))
+    return -result if hemisphere in ('S', 'W') else result
+
+
+def decode_time(value):
+    """
+    Decode an NMEA ``hhmmss.ss`` time into seconds since midnight.
+    """
+    return int(value[0:2]) * 3600 + int(value[2:4]) * 60 + float(value[4:])
+
+
+def pressure_altitude(pressure):
+    """
+    Return the ICAO ISA pressure altitude in meters of a static pressure in
+    hPa.
+    """
+    return 44330.8 * (1. - (pressure / 1013.25) ** 0.190263)
+
+
+class NMEAPipeline:
+    """
+    A streaming NMEA to IGC converter::
+
+        with open('flight.igc', 'wb') as fp:
+            writer = Writer(fp)
+            writer.write_headers({...})
+            pipeline = NMEAPipeline(writer, extensions=[('SIU', 2)])
+            for chunk in serial_port:
+                pipeline.feed(chunk)
+            pipeline.finish()
+
+    The ``GGA`` and ``RMC`` sentences with the same time form a GPS epoch.
+    An epoch is written as soon as both of its sentences have arrived, or
+    when the first sentence of the next epoch arrives for receivers which
+    only send one of them, so a B record is never delayed by more than one
+    epoch. Epochs less than ``interval`` seconds after the last written
+    fix are skipped.
+
+    The pressure altitude is taken from the latest ``PGRMZ`` (Garmin),
+    ``LXWP0`` (LX Navigation) or ``POV`` (OpenVario) sentence. The GPS
+    altitude is the ``GGA`` altitude above the geoid plus the geoid
+    separation, i.e. the altitude above the WGS84 ellipsoid.
+
+    :param writer: the :class:`~aerofiles.igc.Writer` to write the fixes to
+    :param interval: the minimum time between two fixes in seconds
+    :param extensions: a list of ``(extension, length)`` tuples of the fix
+        extensions, see :data:`EXTENSIONS` for the supported ones. The I
+        record is written before the first fix.
+    """
+
+    def __init__(self, writer, interval=1, extensions=None):
+        extensions = list(extensions or [])
+        for code, _ in extensions:
+            if code not in EXTENSIONS:
+                raise ValueError('Unsupported fix extension: %s' % code)
+
+        self.writer = writer
+        self.interval = interval
+        self.extensions = extensions
+        self.limits = [10 ** length - 1 for _, length in extensions]
+
+        self.buffer = ''
+        self.pressure_alt = None
+        self.last_time = None
+        self.num_fixes = 0
+        self.num_sentences = 0
+        self.num_errors = 0
+
+        # the state of the current epoch
+        self.time = None
+        self.gga = None
+        self.rmc = None
+
+        self.handlers = {
+            'GGA': self.handle_gga,
+            'RMC': self.handle_rmc,
+            'PGRMZ': self.handle_pgrmz,
+            'LXWP0': self.handle_lxwp0,
+            'POV': self.handle_pov,
+        }
+
+    def feed(self, data):
+        """
+        Process a chunk of the NMEA stream, which may end with an incomplete
+        sentence, and return the number of fixes written.
+        """
+        if not isinstance(data, str):
+            data = data.decode('ascii', 'replace')
+
+        lines = (self.buffer + data).split('\n')
+        self.buffer = lines.pop()
+
+        written = 0
+        for line in lines:
+            written += self.feed_sentence(line)
+        return written
+
+    def feed_sentence(self, line):
+        """
+        Process a single NMEA sentence and return the number of fixes
+        written.
+        """
+        fields = parse_sentence(line)
+        if fields is None:
+            if line.strip():
+                self.num_errors += 1
+            return 0
+
+        self.num_sentences += 1
+        # standard sentences are looked up without the talker ID
+        handler = self.handlers.get(fields[0]) or \
+            self.handlers.get(fields[0][2:])
+        if handler is None:
+            return 0
+
+        try:
+            return handler(fields)
+        except (IndexError, ValueError):
+            self.num_errors += 1
+            return 0
+
+    def finish(self):
+        """
+        Process the rest of the stream and write the last epoch. Returns the
+        number of fixes written.
+        """
+        written = self.feed_sentence(self.buffer) if self.buffer else 0
+        self.buffer = ''
+        return written + self.flush()
+
+    def start_epoch(self, time):
+        """
+        Flush the current epoch if ``time`` belongs to a new one.
+        """
+        if time == self.time:
+            return 0
+
+        written = self.flush()
+        self.time = time
+        return written
+
+    def handle_gga(self, fields):
+        if not fields[1]:
+            return 0
+
+        written = self.start_epoch(fields[1])
+        self.gga = fields
+        if self.rmc is not None:
+            written += self.flush()
+        return written
+
+    def handle_rmc(self, fields):
+        if not fields[1]:
+            return 0
+
+        written = self.start_epoch(fields[1])
+        self.rmc = fields
+        if self.gga is not None:
+            written += self.flush()
+        return written
+
+    def handle_pgrmz(self, fields):
+        altitude = float(fields[1])
+        if fields[2] == 'f':
+            altitude = to_SI(altitude, FEET)
+        self.pressure_alt = altitude
+        return 0
+
+    def handle_lxwp0(self, fields):
+        if fields[3]:
+            self.pressure_alt = float(fields[3])
+        return 0
+
+    def handle_pov(self, fields):
+        for key, value in zip(fields[1::2], fields[2::2]):
+            if key == 'P':
+                self.pressure_alt = pressure_altitude(float(value))
+        return 0
+
+    def flush(self):
+        """
+        Write the current epoch if it contains a position and is due.
+        """
+        gga, rmc, time = self.gga, self.rmc, self.time
+        self.gga = self.rmc = self.time = None
+        if time is None:
+            return 0
+
+        try:
+            return self.write_epoch(time, gga, rmc)
+        except (IndexError, ValueError):
+            self.num_errors += 1
+            return 0
+
+    def write_epoch(self, time, gga, rmc):
+        if gga is not None:
+            lat = decode_coordinate(gga[2], gga[3], 2)
+            lon = decode_coordinate(gga[4], gga[5], 3)
+            valid = gga[6] not in ('', '0')
+            if rmc is not None:
+                valid = valid and rmc[2] == 'A'
+        else:
+            lat = decode_coordinate(rmc[3], rmc[4], 2)
+            lon = decode_coordinate(rmc[5], rmc[6], 3)
+            valid = rmc[2] == 'A'
+
+        if lat is None or lon is None:
+            return 0
+
+        seconds = decode_time(time)
+        if self.last_time is not None and \
+                round((seconds - self.last_time) % 86400, 3) < self.interval:
+            return 0
+        self.last_time = seconds
+
+        gps_alt = None
+        if gga is not None and gga[9]:
+            gps_alt = float(gga[9]) + float(gga[11] or 0)
+
+        if self.num_fixes == 0 and self.extensions:
+            self.writer.write_fix_extensions(self.extensions)
+
+        extensions = None
+        if self.extensions:
+            extensions = [
+                min(limit, max(0, value))
+                for limit, value in zip(self.limits, self.extension_values(
+                    gga, rmc))
+            ]
+
+        if not self.writer.integer_coordinates:
+            lat /= 60000.
+            lon /= 60000.
+
+        self.writer.write_fix(
+            time[:6], latitude=lat, longitude=lon, valid=valid,
+            pressure_alt=_round(self.pressure_alt), gps_alt=_round(gps_alt),
+            extensions=extensions)
+        self.num_fixes += 1
+        return 1
+
+    def extension_values(self, gga, rmc):
+        values = []
+        for code, _ in self.extensions:
+            value = 0
+            if code == 'SIU' and gga is not None and gga[7]:
+                value = int(gga[7])
+            elif code == 'GSP' and rmc is not None and rmc[7]:
+                value = int(round(from_SI(
+                    to_SI(float(rmc[7]), KNOTS), KILOMETERS_PER_HOUR)))
+            elif code == 'TRT' and rmc is not None and rmc[8]:
+                value = int(round(float(rmc[8]))) % 360
+            values.append(value)
+        return values
+
+
+def _round(value):
+    return None if value is None else int(round(value))
+
+
+def replay(lines, pipeline, speed=10., clock=time_module.time,
+           sleep=time_module.sleep):
+    """
+    Feed recorded NMEA sentences into a pipeline at ``speed`` times their
+    original rate, derived from the ``GGA`` and ``RMC`` times, and return
+    the number of sentences and fixes, the duration and the latency
+    percentiles in seconds from the sentence which completed an epoch to
+    the written fix.
+    """
+    latencies = []
+    start = first_time = None
+    num_sentences = num_fixes = 0
+
+    for line in lines:
+        fields = parse_sentence(line)
+        if fields is not None and len(fields) > 1 and fields[1] and \
+                fields[0][2:] in ('GGA', 'RMC'):
+            seconds = decode_time(fields[1])
+            if first_time is None:
+                start, first_time = clock(), seconds
+            delay = start + ((seconds - first_time) % 86400) / speed - clock()
+            if delay > 0:
+                sleep(delay)
+
+        received = clock()
+        written = pipeline.feed_sentence(line)
+        if written:
+            latencies.extend([clock() - received] * written)
+        num_sentences += 1
+        num_fixes += written
+
+    received = clock()
+    written = pipeline.finish()
+    latencies.extend([clock() - received] * written)
+    num_fixes += written
+
+    latencies.sort()
+    return {
+        'sentences': num_sentences,
+        'fixes': num_fixes,
+        'duration': clock() - start if start is not None else 0.,
+        'p50': _percentile(latencies, 0.5),
+        'p99': _percentile(latencies, 0.99),
+        'max': latencies[-1] if latencies else None,
+    }
+
+
+def _percentile(values, fraction):
+    if not values:
+        return None
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+class _NullFile:
+    def write(self, data):
+        pass
+
+
+def main(argv=None):
+    parser = optparse.OptionParser(
+        usage='python -m aerofiles.igc.nmea bench RECORDING [options]')
+    parser.add_option('--speed', type='float', default=10.,
+                      help='replay speed factor (default: 10)')
+    parser.add_option('--interval', type='float', default=1.,
+                      help='fix interval in seconds (default: 1)')
+    parser.add_option('--output', help='write the IGC fixes to this file')
+    options, args = parser.parse_args(argv)
+    if len(args) != 2 or args[0] != 'bench':
+        parser.error('expected: bench RECORDING')
+
+    with open(args[1], 'r') as f:
+        lines = f.readlines()
+
+    fp = open(options.output, 'wb') if options.output else _NullFile()
+    try:
+        pipeline = NMEAPipeline(Writer(fp), interval=options.interval)
+        stats = replay(lines, pipeline, speed=options.speed)
+    finally:
+        if options.output:
+            fp.close()
+
+    print('sentences:   %d (%d errors)' % (
+        stats['sentences'], pipeline.num_errors))
+    print('fixes:       %d' % stats['fixes'])
+    print('duration:    %.1f s' % stats['duration'])
+    for key in ('p50', 'p99', 'max'):
+        if stats[key] is not None:
+            print('latency %-4s %.3f ms' % (key + ':', stats[key] * 1000))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
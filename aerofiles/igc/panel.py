@@ -0,0 +1,324 @@
+from aerofiles.igc.columns import (
+    fix_columns, fix_extension_types, import_numpy, scalar,
+)
+from aerofiles.igc.reader import Reader
+
+
+# The header fields that are copied into the flight table by default.
+HEADER_FIELDS = (
+    'utc_date', 'pilot', 'glider_model', 'glider_registration',
+    'competition_id',
+)
+
+REDUCTIONS = ('count', 'sum', 'min', 'max', 'mean', 'first', 'last')
+
+_DTYPES = {
+    'flight_id': 'int64',
+    'time': 'int64',
+    'lat': 'float64',
+    'lon': 'float64',
+    'validity': 'bool',
+    'pressure_alt': 'int64',
+    'gps_alt': 'int64',
+}
+
+
+class PanelBuilder:
+    """
+    Collect the fixes of many flights into one columnar table::
+
+        builder = PanelBuilder()
+        for path in paths:
+            builder.add(path)
+        panel = builder.build()
+
+    The fixes are appended to column buffers which grow by doubling their
+    capacity. Every fix row gets the ``flight_id`` of its flight, which is
+    the position of the flight in :attr:`Panel.flights`. Fix extensions
+    that are only found in some flights are ``nan`` (or ``None`` without
+    NumPy) for the other flights.
+
+    :param extensions: the fix extensions to collect (default: all)
+    :param header_fields: the header fields to copy into the flight table
+    :param capacity: the initial number of rows of the buffers
+    """
+
+    def __init__(self, extensions=None, header_fields=HEADER_FIELDS,
+                 capacity=4096):
+        self.extensions = extensions
+        self.header_fields = header_fields
+        self.capacity = capacity
+        self.size = 0
+        self.flights = []
+        self.columns = {}
+        for name in _DTYPES:
+            self.columns[name] = self._empty(name, capacity)
+        for extension in extensions or []:
+            self.columns[extension] = self._empty(extension, capacity)
+
+    def _empty(self, name, capacity):
+        numpy = import_numpy()
+        if numpy is None:
+            return []
+
+        dtype = _DTYPES.get(name, 'float64')
+        if dtype == 'float64':
+            return numpy.full(capacity, numpy.nan)
+        return numpy.zeros(capacity, dtype=dtype)
+
+    def _reserve(self, rows):
+        numpy = import_numpy()
+        if numpy is None or self.size + rows <= self.capacity:
+            return
+
+        capacity = self.capacity
+        while self.size + rows > capacity:
+            capacity *= 2
+
+        for name, buffer in self.columns.items():
+            grown = self._empty(name, capacity)
+            grown[:self.size] = buffer[:self.size]
+            self.columns[name] = grown
+        self.capacity = capacity
+
+    def add(self, flight, **fields):
+        """
+        Append a flight and return its ``flight_id``.
+
+        :param flight: the path of an IGC file or the result of
+            :meth:`aerofiles.igc.Reader.read`
+        :param fields: additional fields for the flight table
+        """
+        numpy = import_numpy()
+        if not isinstance(flight, dict):
+            fields.setdefault('path', flight)
+            flight = Reader().read_path(flight)
+
+        fixes = flight['fix_records'][1]
+        header = flight['header'][1]
+
+        extensions = self.extensions
+        if extensions is None:
+            extensions = fix_extension_types(fixes)
+            for extension in extensions:
+                if extension not in self.columns:
+                    self.columns[extension] = self._empty(
+                        extension, self.capacity)
+                    if numpy is None:
+                        self.columns[extension].extend([None] * self.size)
+
+        flight_id = len(self.flights)
+        rows = len(fixes)
+        start = self.size
+        end = start + rows
+
+        self._reserve(rows)
+        columns = fix_columns(fixes, extensions=extensions)
+        columns['flight_id'] = [flight_id] * rows
+        for name, buffer in self.columns.items():
+            values = columns.get(name)
+            if numpy is not None:
+                if values is not None:
+                    buffer[start:end] = values
+            elif values is not None:
+                buffer.extend(values)
+            else:
+                buffer.extend([None] * rows)
+
+        self.size = end
+
+        entry = dict((field, header.get(field)) for field in self.header_fields)
+        entry.update(fields)
+        entry.update(flight_id=flight_id, start=start, end=end)
+        self.flights.append(entry)
+
+        return flight_id
+
+    def build(self):
+        """
+        Return a :class:`Panel` of the flights added so far.
+        """
+        numpy = import_numpy()
+        columns = dict(
+            (name, buffer[:self.size]) for name, buffer in self.columns.items())
+        offsets = [flight['start'] for flight in self.flights] + [self.size]
+        if numpy is not None:
+            offsets = numpy.array(offsets, dtype=numpy.int64)
+
+        return Panel(columns, offsets, list(self.flights))
+
+
+def build_panel(flights, **kwargs):
+    """
+    Build a :class:`Panel` from a list of paths or results of
+    :meth:`aerofiles.igc.Reader.read`. The keyword arguments are passed to
+    :class:`PanelBuilder`.
+    """
+    builder = PanelBuilder(**kwargs)
+    for flight in flights:
+        builder.add(flight)
+
+    return builder.build()
+
+
+class Panel:
+    """
+    The fixes of many flights in one columnar table.
+
+    ``columns`` has the same columns as
+    :func:`~aerofiles.igc.columns.fix_columns` plus ``flight_id``. The rows
+    of a flight are contiguous and start at ``offsets[flight_id]``.
+    ``flights`` is the flight table with one dictionary per flight
+    containing the header fields, ``flight_id``, ``start`` and ``end``.
+    """
+
+    def __init__(self, columns, offsets, flights):
+        self.columns = columns
+        self.offsets = offsets
+        self.flights = flights
+
+    def __len__(self):
+        return scalar(self.offsets[-1])
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def flight(self, flight_id):
+        """
+        Return the columns of one flight. With NumPy the columns are views
+        into the panel.
+        """
+        start = self.offsets[flight_id]
+        end = self.offsets[flight_id + 1]
+        return dict(
+            (name, values[start:end]) for name, values in self.columns.items())
+
+    def aggregate(self, column, how='mean'):
+        """
+        Reduce a column per flight::
+
+            panel.aggregate('gps_alt', 'max')  # -> max altitude per flight
+
+        :param column: the name of the column
+        :param how: one of ``count``, ``sum``, ``min``, ``max``, ``mean``,
+            ``first`` and ``last``
+        :return: one value per flight. Flights without fixes get ``nan``
+            (``None`` without NumPy), except for ``count`` and ``sum``.
+        """
+        numpy = import_numpy()
+        if how not in REDUCTIONS:
+            raise ValueError('Invalid reduction: %s' % how)
+
+        values = self.columns[column]
+        if numpy is None:
+            return [
+                _reduce(values[start:end], how)
+                for start, end in zip(self.offsets[:-1], self.offsets[1:])
+            ]
+
+        starts = self.offsets[:-1]
+        ends = self.offsets[1:]
+        counts = ends - starts
+        if how == 'count':
+            return counts
+
+        filled = counts > 0
+        starts = starts[filled]
+        values = values.astype(numpy.float64)
+        result = numpy.full(len(counts), 0. if how == 'sum' else numpy.nan)
+        if not len(starts):
+            return result
+
+        if how == 'first':
+            result[filled] = values[starts]
+        elif how == 'last':
+            result[filled] = values[ends[filled] - 1]
+        elif how == 'min':
+            result[filled] = numpy.minimum.reduceat(values, starts)
+        elif how == 'max':
+            result[filled] = numpy.maximum.reduceat(values, starts)
+        else:
+            result[filled] = numpy.add.reduceat(values, starts)
+            if how == 'mean':
+                result[filled] /= counts[filled]
+
+        return result
+
+    def group_by(self, field, column, how='mean'):
+        """
+        Reduce a column over all fixes of the flights which share the same
+        value of a flight table field::
+
+            panel.group_by('pilot', 'gps_alt', 'max')
+            # -> {'Bloggs Bill D': 2880, ...}
+
+        :param field: the name of the flight table field
+        :param column: the name of the column
+        :param how: one of ``count``, ``sum``, ``min``, ``max`` and ``mean``
+        :return: a dictionary with the reduced value per field value
+        """
+        numpy = import_numpy()
+        if how not in REDUCTIONS[:5]:
+            raise ValueError('Invalid reduction: %s' % how)
+
+        keys = []
+        groups = {}
+        flight_groups = []
+        for flight in self.flights:
+            key = flight[field]
+            if key not in groups:
+                groups[key] = len(keys)
+                keys.append(key)
+            flight_groups.append(groups[key])
+
+        values = self.columns[column]
+        if numpy is None:
+            rows = [[] for _ in keys]
+            for group, start, end in zip(
+                    flight_groups, self.offsets[:-1], self.offsets[1:]):
+                rows[group].extend(values[start:end])
+            return dict(
+                (key, _reduce(group_rows, how))
+                for key, group_rows in zip(keys, rows))
+
+        row_groups = numpy.repeat(
+            numpy.array(flight_groups, dtype=numpy.int64),
+            numpy.diff(self.offsets))
+        values = values.astype(numpy.float64)
+        counts = numpy.bincount(row_groups, minlength=len(keys))
+
+        if how == 'count':
+            result = counts
+        elif how in ('sum', 'mean'):
+            result = numpy.bincount(
+                row_groups, weights=values, minlength=len(keys))
+            if how == 'mean':
+                result = result / numpy.where(counts, counts, numpy.nan)
+        else:
+            if how == 'min':
+                result = numpy.full(len(keys), numpy.inf)
+                numpy.minimum.at(result, row_groups, values)
+            else:
+                result = numpy.full(len(keys), -numpy.inf)
+                numpy.maximum.at(result, row_groups, values)
+            result[counts == 0] = numpy.nan
+
+        return dict((key, scalar(value)) for key, value in zip(keys, result))
+
+
+def _reduce(values, how):
+    if how == 'count':
+        return len(values)
+    if how == 'sum':
+        return None if None in values else sum(values)
+    if not values or None in values:
+        return None
+    if how == 'first':
+        return values[0]
+    if how == 'last':
+        return values[-1]
+    if how == 'min':
+        return min(values)
+    if how == 'max':
+        return max(values)
+    return float(sum(values)) / len(values)
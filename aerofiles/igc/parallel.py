@@ -0,0 +1,201 @@
+import datetime
+import io
+import multiprocessing
+
+from aerofiles.igc.reader import (
+    LowLevelReader, MissingExtensionsError, MissingRecordsError, Reader,
+)
+from aerofiles.util.timezone import TimeZoneFix
+
+
+# The date used to decode chunks before the ``HFDTE`` header is known. The
+# dates of these fixes are corrected while the chunks are stitched together.
+PLACEHOLDER_DATE = datetime.date(2000, 1, 1)
+
+
+def read_parallel(file_obj, workers=None, chunk_size=10000,
+                  skip_duplicates=False, encoding='utf-8', pool=None,
+                  integer_coordinates=False):
+    """
+    Read a large IGC file and decode its B records in parallel::
+
+        with open('expedition.igc', 'rb') as f:
+            parsed = read_parallel(f, workers=8)
+
+    The B records are split into chunks of at most ``chunk_size`` lines,
+    which are decoded in worker processes with the I record extensions, date
+    and timezone that apply at their position in the file. A new chunk is
+    started after every H or I record. The chunks are then stitched
+    together in order and the date rollover at midnight and
+    ``skip_duplicates`` are applied across the chunk boundaries. All other
+    records are read sequentially.
+
+    The result is identical to :meth:`aerofiles.igc.Reader.read`.
+
+    :param file_obj: a Python file object, opened in binary or text mode
+    :param workers: the number of worker processes (default: number of CPUs)
+    :param chunk_size: the maximum number of B records per chunk
+    :param skip_duplicates: see :class:`~aerofiles.igc.Reader`
+    :param encoding: the encoding used to decode a binary file
+    :param pool: a :class:`multiprocessing.pool.Pool` to use instead of
+        creating a new one
+    :param integer_coordinates: see :class:`~aerofiles.igc.Reader`
+    """
+    data = file_obj.read()
+    if not isinstance(data, str):
+        data = data.decode(encoding, 'replace')
+
+    other_lines = []
+    chunks = []
+    states = []
+    chunk = None
+    header = {}
+    extensions = []
+    extension_errors = False
+
+    for line in io.StringIO(data):
+        record_type = line[0]
+        if record_type == 'B':
+            # keep the line numbers of the other records
+            other_lines.append('\n')
+
+            if chunk is None:
+                chunk = []
+                chunks.append((
+                    chunk, extensions,
+                    header.get('utc_date', PLACEHOLDER_DATE),
+                    header.get('time_zone_offset'), skip_duplicates,
+                    integer_coordinates,
+                ))
+                states.append(('utc_date' in header, extension_errors))
+
+            chunk.append(line)
+            if len(chunk) >= chunk_size:
+                chunk = None
+            continue
+
+        other_lines.append(line)
+
+        if record_type == 'H':
+            chunk = None
+            try:
+                header_item = LowLevelReader.decode_H_record(line)
+            except Exception:
+                continue
+            if header_item:
+                del header_item['source']
+                header.update(header_item)
+        elif record_type == 'I':
+            chunk = None
+            try:
+                extension_item = LowLevelReader.decode_I_record(line)
+            except Exception:
+                extension_errors = True
+                continue
+            if extension_item:
+                extensions = extension_item
+
+    result = Reader().read(other_lines)
+
+    if pool is not None:
+        decoded = pool.map(decode_fixes, chunks)
+    elif workers == 1 or len(chunks) < 2:
+        decoded = [decode_fixes(chunk) for chunk in chunks]
+    else:
+        pool = multiprocessing.Pool(workers)
+        try:
+            decoded = pool.map(decode_fixes, chunks)
+        finally:
+            pool.close()
+            pool.join()
+
+    fix_records = result['fix_records']
+    previous = None
+    for (fixes, first_error, first_valid), (has_date, extension_errors) in \
+            zip(decoded, states):
+
+        # add the errors in the order the sequential reader finds them
+        errors = [(first_error, MissingRecordsError)]
+        if extension_errors:
+            errors.append((first_valid, MissingExtensionsError))
+        for index, error in sorted(errors, key=lambda item: item[0]):
+            if index is not None and error not in fix_records[0]:
+                fix_records[0].append(error)
+
+        if not fixes:
+            continue
+
+        if previous is None:
+            if not has_date:
+                raise KeyError('utc_date')
+        else:
+            first = fixes[0]
+            date = previous['datetime'].date()
+            if first['time'] < previous['time']:
+                date = date + datetime.timedelta(days=1)
+
+            shift = date - first['datetime'].date()
+            if shift:
+                for fix in fixes:
+                    fix['datetime'] += shift
+                    if 'datetime_local' in fix:
+                        fix['datetime_local'] += shift
+
+            if first['time'] == previous['time'] and skip_duplicates:
+                fixes = fixes[1:]
+
+        fix_records[1].extend(fixes)
+        previous = fix_records[1][-1]
+
+    return result
+
+
+def decode_fixes(chunk):
+    """
+    Decode a chunk of B records. This runs in the worker processes of
+    :func:`read_parallel`.
+
+    :param chunk: a ``(lines, extensions, date, time_zone_offset,
+        skip_duplicates, integer_coordinates)`` tuple
+    :return: a ``(fixes, first_error, first_valid)`` tuple with the decoded
+        fixes and the indexes of the first invalid and the first valid line
+    """
+    (lines, extensions, date, time_zone_offset, skip_duplicates,
+     integer_coordinates) = chunk
+
+    utc = TimeZoneFix(0)
+    timezone = None
+    if time_zone_offset is not None:
+        timezone = TimeZoneFix(time_zone_offset)
+
+    fixes = []
+    first_error = first_valid = None
+    previous_time = None
+    for index, line in enumerate(lines):
+        try:
+            decoded = LowLevelReader.decode_B_record(
+                line, integer_coordinates=integer_coordinates)
+        except Exception:
+            if first_error is None:
+                first_error = index
+            continue
+
+        if first_valid is None:
+            first_valid = index
+
+        fix = LowLevelReader.process_B_record(decoded, extensions)
+        if previous_time is not None:
+            if fix['time'] < previous_time:
+                date = date + datetime.timedelta(days=1)
+            if fix['time'] == previous_time and skip_duplicates:
+                continue
+
+        fix['datetime'] = datetime.datetime.combine(
+            date, fix['time']).replace(tzinfo=utc)
+        if timezone is not None:
+            fix['datetime_local'] = fix['datetime'].astimezone(timezone)
+
+        fixes.append(fix)
+        previous_time = fix['time']
+
+    return fixes, first_error, first_valid
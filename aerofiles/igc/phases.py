@@ -0,0 +1,350 @@
+import collections
+
+from aerofiles.igc.columns import fix_columns, fix_timestamp, import_numpy
+from aerofiles.util import geo
+
+
+GROUND = 'ground'
+TAKEOFF = 'takeoff'
+CRUISE = 'cruise'
+CIRCLING = 'circling'
+LANDING = 'landing'
+
+LEFT = 'left'
+RIGHT = 'right'
+
+# Steps shorter than this are too noisy to derive a heading from
+MIN_HEADING_DISTANCE = 1.
+
+# Per-fix classification codes, see ``classify()``
+_LABELS = (
+    (GROUND, None),
+    (CRUISE, None),
+    (CIRCLING, LEFT),
+    (CIRCLING, RIGHT),
+)
+
+
+class Phase(collections.namedtuple('Phase', [
+        'type', 'direction', 'start_time', 'end_time',
+        'start_index', 'end_index'])):
+    """
+    A phase of a flight.
+
+    ``type`` is one of ``ground``, ``takeoff``, ``cruise``, ``circling`` or
+    ``landing``. ``direction`` is ``left`` or ``right`` for circling phases
+    and ``None`` otherwise. The times are seconds as returned by
+    :func:`~aerofiles.igc.columns.fix_timestamp`. The fixes of the phase are
+    ``fixes[start_index:end_index]``. Takeoff and landing are reported as
+    phases without duration at the moment the flight state changes.
+    """
+
+    __slots__ = ()
+
+    @property
+    def duration(self):
+        return self.end_time - self.start_time
+
+
+def wrap_angle(angle):
+    """
+    Normalise an angle difference in degrees to ``-180 <= angle < 180``.
+    """
+    return (angle + 180.) % 360. - 180.
+
+
+def classify(speed, turn_rate, flying_speed, circling_rate):
+    if speed < flying_speed:
+        return 0
+    if turn_rate <= -circling_rate:
+        return 2
+    if turn_rate >= circling_rate:
+        return 3
+    return 1
+
+
+class _PhaseBuilder:
+    """
+    Merges runs of equally classified fixes into phases.
+
+    Runs shorter than ``min_duration`` are absorbed into the preceding phase.
+    Only the current phase is kept in memory.
+    """
+
+    def __init__(self, min_duration):
+        self.min_duration = min_duration
+        self.current = None
+        self.run = None
+
+    def start_run(self, label, time, index):
+        """
+        Start a new run and return the phases that were completed by the end
+        of the previous run.
+        """
+        phases = self.end_run(time)
+        self.run = (label, time, index)
+        return phases
+
+    def end_run(self, end_time):
+        if self.run is None:
+            return []
+
+        label, start_time, start_index = self.run
+        self.run = None
+
+        if self.current is None:
+            self.current = self.run_to_phase(label, start_time, start_index)
+            return []
+
+        if end_time - start_time < self.min_duration:
+            return []
+
+        type, direction = _LABELS[label]
+        if (type, direction) == (self.current[0], self.current[1]):
+            return []
+
+        previous = self.current
+        self.current = self.run_to_phase(label, start_time, start_index)
+
+        phases = [previous._replace(
+            end_time=start_time, end_index=start_index)]
+        if previous.type == GROUND:
+            phases.append(Phase(
+                TAKEOFF, None, start_time, start_time,
+                start_index, start_index))
+        elif type == GROUND:
+            phases.append(Phase(
+                LANDING, None, start_time, start_time,
+                start_index, start_index))
+
+        return phases
+
+    @staticmethod
+    def run_to_phase(label, start_time, start_index):
+        type, direction = _LABELS[label]
+        return Phase(type, direction, start_time, None, start_index, None)
+
+    def finish(self, end_time, end_index):
+        phases = self.end_run(end_time)
+        if self.current is not None:
+            phases.append(self.current._replace(
+                end_time=end_time, end_index=end_index))
+            self.current = None
+
+        return phases
+
+
+class PhaseSegmenter:
+    """
+    A streaming segmenter that splits a flight into phases.
+
+    Fixes are fed one at a time and completed phases are returned as soon
+    as they are known. Ground speed and turn rate are averaged over a
+    sliding time window; a fix is ``ground`` below ``flying_speed``,
+    ``circling`` if the turn rate exceeds ``circling_rate`` and ``cruise``
+    otherwise. Runs shorter than ``min_duration`` are merged into the
+    preceding phase. Memory usage only depends on the window size.
+
+    Example:
+
+    .. sourcecode:: python
+
+        >>> segmenter = PhaseSegmenter()
+        >>> for fix in igc['fix_records'][1]:
+        ...     for phase in segmenter.feed(fix):
+        ...         print(phase)
+        >>> for phase in segmenter.finish():
+        ...     print(phase)
+
+    :param window: length of the sliding window in seconds
+    :param flying_speed: minimum ground speed in m/s to be considered flying
+    :param circling_rate: minimum turn rate in degrees per second to be
+        considered circling
+    :param min_duration: minimum duration of a phase in seconds
+    """
+
+    def __init__(self, window=20, flying_speed=5., circling_rate=6.,
+                 min_duration=20):
+        self.window = window
+        self.flying_speed = flying_speed
+        self.circling_rate = circling_rate
+
+        self.builder = _PhaseBuilder(min_duration)
+        self.steps = collections.deque()
+        self.distance_sum = 0.
+        self.time_sum = 0.
+        self.turn_sum = 0.
+
+        self.index = 0
+        self.label = None
+        self.last = None
+        self.heading = None
+
+    def feed(self, fix):
+        """
+        Process the next fix and return a list of completed phases.
+
+        :param fix: a fix record as returned by :class:`~aerofiles.igc.Reader`
+            without ``integer_coordinates``
+        """
+        return self.feed_values(fix_timestamp(fix), fix['lat'], fix['lon'])
+
+    def feed_values(self, time, lat, lon):
+        """
+        Like :meth:`feed`, but takes the time (in seconds), latitude and
+        longitude of the fix directly.
+        """
+        index = self.index
+        self.index += 1
+
+        last = self.last
+        self.last = (time, lat, lon)
+
+        if last is None:
+            return self.builder.start_run(0, time, index)
+
+        dt = time - last[0]
+        distance = turn = 0.
+        if dt > 0:
+            distance = geo.distance(last[1], last[2], lat, lon)
+            if distance >= MIN_HEADING_DISTANCE:
+                heading = geo.bearing(last[1], last[2], lat, lon)
+                if self.heading is not None:
+                    turn = wrap_angle(heading - self.heading)
+                self.heading = heading
+        else:
+            dt = 0
+
+        self.steps.append((time, distance, dt, turn))
+        self.distance_sum += distance
+        self.time_sum += dt
+        self.turn_sum += turn
+
+        while self.steps[0][0] <= time - self.window:
+            _, distance, dt, turn = self.steps.popleft()
+            self.distance_sum -= distance
+            self.time_sum -= dt
+            self.turn_sum -= turn
+
+        if self.time_sum > 0:
+            label = classify(
+                self.distance_sum / self.time_sum,
+                self.turn_sum / self.time_sum,
+                self.flying_speed, self.circling_rate)
+        else:
+            label = 0
+
+        if self.label is None:
+            # the first fix gets the classification of the second one
+            self.builder.run = (label,) + self.builder.run[1:]
+        elif label != self.label:
+            self.label = label
+            return self.builder.start_run(label, time, index)
+
+        self.label = label
+        return []
+
+    def finish(self):
+        """
+        Close the last phase and return the remaining phases.
+        """
+        if self.last is None:
+            return []
+
+        return self.builder.finish(self.last[0], self.index)
+
+
+def segment_phases(fixes, **kwargs):
+    """
+    Split a list of fixes into phases::
+
+        phases = segment_phases(igc['fix_records'][1])
+
+    The result is identical to feeding all fixes into a
+    :class:`PhaseSegmenter`, which accepts the same keyword arguments. If
+    NumPy is installed the speed and turn rate detectors are computed in a
+    vectorized way.
+
+    :param fixes: a list of fix records
+    :return: a list of :class:`Phase` tuples
+    """
+    numpy = import_numpy()
+    if numpy is None:
+        segmenter = PhaseSegmenter(**kwargs)
+        phases = []
+        for fix in fixes:
+            phases.extend(segmenter.feed(fix))
+        return phases + segmenter.finish()
+
+    columns = fix_columns(fixes, extensions=[])
+    return segment_phase_columns(
+        columns['time'], columns['lat'], columns['lon'], **kwargs)
+
+
+def segment_phase_columns(time, lat, lon, window=20, flying_speed=5.,
+                          circling_rate=6., min_duration=20):
+    """
+    Vectorized version of :func:`segment_phases` that takes NumPy arrays of
+    the fix times (in seconds), latitudes and longitudes. Requires NumPy.
+    """
+    numpy = import_numpy()
+    time = numpy.asarray(time)
+    lat = numpy.asarray(lat, dtype=numpy.float64)
+    lon = numpy.asarray(lon, dtype=numpy.float64)
+
+    n = len(time)
+    if n == 0:
+        return []
+
+    dt = numpy.diff(time).astype(numpy.float64)
+    moving = dt > 0
+    dt[~moving] = 0.
+
+    distance = geo.distance_array(lat[:-1], lon[:-1], lat[1:], lon[1:])
+    distance[~moving] = 0.
+
+    # turn between each step with a heading and the previous such step
+    has_heading = distance >= MIN_HEADING_DISTANCE
+    heading = geo.bearing_array(lat[:-1], lon[:-1], lat[1:], lon[1:])
+    heading_steps = numpy.flatnonzero(has_heading)
+    turn = numpy.zeros(n - 1)
+    turn[heading_steps[1:]] = wrap_angle(numpy.diff(heading[heading_steps]))
+
+    # window sums over the steps ending in (t - window, t]
+    step_time = time[1:]
+    low = numpy.searchsorted(step_time, step_time - window, side='right')
+    high = numpy.arange(1, n)
+
+    def window_sum(values):
+        cumsum = numpy.concatenate(([0.], numpy.cumsum(values)))
+        return cumsum[high] - cumsum[low]
+
+    distance_sum = window_sum(distance)
+    time_sum = window_sum(dt)
+    turn_sum = window_sum(turn)
+
+    flying = time_sum > 0
+    speed = numpy.zeros(n - 1)
+    turn_rate = numpy.zeros(n - 1)
+    speed[flying] = distance_sum[flying] / time_sum[flying]
+    turn_rate[flying] = turn_sum[flying] / time_sum[flying]
+
+    labels = numpy.ones(n - 1, dtype=numpy.int8)
+    labels[turn_rate <= -circling_rate] = 2
+    labels[turn_rate >= circling_rate] = 3
+    labels[speed < flying_speed] = 0
+
+    builder = _PhaseBuilder(min_duration)
+    phases = []
+    if n > 1:
+        # the first fix gets the classification of the second one
+        labels = numpy.concatenate((labels[:1], labels))
+        starts = numpy.concatenate(
+            ([0], numpy.flatnonzero(labels[1:] != labels[:-1]) + 1))
+        for start in starts:
+            phases.extend(builder.start_run(
+                int(labels[start]), time[start].item(), int(start)))
+    else:
+        builder.start_run(0, time[0].item(), 0)
+
+    return phases + builder.finish(time[-1].item(), n)
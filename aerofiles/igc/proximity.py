@@ -0,0 +1,352 @@
+import collections
+import math
+
+from aerofiles.igc.align import align_flights
+from aerofiles.igc.columns import import_numpy
+from aerofiles.util import geo
+from aerofiles.util.units import FEET, to_SI
+
+
+# Neighbouring grid cells that have to be checked for every cell. Only half
+# of the neighbourhood is needed because every pair is found from one side.
+NEIGHBOUR_CELLS = ((0, 0), (1, -1), (1, 0), (1, 1), (0, 1))
+
+# The number of time steps that are searched at once with NumPy. The
+# candidate pairs of a chunk are held in memory, which limits the memory use
+# of many flights close to each other, e.g. on a launch grid.
+CHUNK_SIZE = 60
+
+
+class Encounter(collections.namedtuple('Encounter', [
+        'flight1', 'flight2', 'start_time', 'end_time',
+        'min_distance', 'min_distance_time', 'vertical_separation'])):
+    """
+    A period in which two flights were closer than the given separation.
+
+    ``flight1`` and ``flight2`` are the indexes of the flights
+    (``flight1 < flight2``). ``start_time`` and ``end_time`` are the first and
+    last time step of the encounter in seconds (see
+    :func:`~aerofiles.igc.columns.fix_timestamp`). ``min_distance`` is the
+    smallest horizontal distance in meters, reached at ``min_distance_time``
+    with the given ``vertical_separation`` in meters.
+    """
+
+    __slots__ = ()
+
+
+def find_encounters(flights, horizontal=100., vertical=200., step=1,
+                    max_gap=30, altitude='gps_alt', min_speed=None):
+    """
+    Find the encounters between several simultaneous flights::
+
+        encounters = find_encounters(flights, horizontal=100, vertical=200)
+
+    The flights are aligned with :func:`~aerofiles.igc.align.align_flights`.
+    At every time step the positions are sorted into a grid of cells with
+    the size of the horizontal separation, so that only flights in the same
+    or neighbouring cells have to be compared. Consecutive time steps in
+    which two flights are closer than ``horizontal`` meters and ``vertical``
+    feet are combined into one encounter.
+
+    Gliders waiting on the ground are usually closer than any separation,
+    use ``min_speed`` to ignore the positions of flights which are slower
+    than a flying speed (e.g. ``10`` m/s).
+
+    :param flights: a list of flights, each given as the result of
+        :meth:`aerofiles.igc.Reader.read` or as a list of fix records
+    :param horizontal: the horizontal separation in meters
+    :param vertical: the vertical separation in feet
+    :param step: the time step in seconds
+    :param max_gap: see :func:`~aerofiles.igc.align.align_flights`
+    :param altitude: the fix altitude to use (``gps_alt`` or
+        ``pressure_alt``)
+    :param min_speed: the minimum ground speed in m/s, positions of slower
+        flights are ignored (default: all positions are used)
+    :return: a list of :class:`Encounter` tuples sorted by start time
+    """
+    numpy = import_numpy()
+    alignment = align_flights(
+        flights, step=step, max_gap=max_gap, altitude=altitude)
+    vertical = to_SI(vertical, FEET)
+
+    if numpy is not None:
+        if min_speed is not None:
+            alignment = _without_slow_array(alignment, min_speed)
+        encounters = _find_encounters_array(
+            alignment, horizontal, vertical, step)
+    else:
+        if min_speed is not None:
+            alignment = _without_slow(alignment, min_speed)
+        encounters = _find_encounters(alignment, horizontal, vertical, step)
+
+    encounters.sort(key=lambda encounter: (
+        encounter.start_time, encounter.flight1, encounter.flight2))
+    return encounters
+
+
+def _projection(latitudes):
+    """
+    Return the meters per degree of longitude and latitude for an
+    equirectangular projection. The scale of the highest latitude is used,
+    which never overestimates distances, so that no encounter is missed by
+    the grid.
+    """
+    lat = max(abs(value) for value in latitudes) if latitudes else 0.
+    y_scale = math.radians(geo.EARTH_RADIUS)
+    return y_scale * math.cos(math.radians(min(lat, 89.))), y_scale
+
+
+def _without_slow(alignment, min_speed):
+    """
+    Return a copy of an alignment without the positions with a ground
+    speed below ``min_speed``. The speed of a position is taken from the
+    previous position or, if it is missing, from the next one.
+    """
+    times = alignment.times
+    result = []
+    for positions in alignment.positions:
+        speeds = [None] * (len(times) - 1)
+        for t in range(len(times) - 1):
+            if positions[t] is not None and positions[t + 1] is not None:
+                speeds[t] = geo.distance(
+                    positions[t][0], positions[t][1],
+                    positions[t + 1][0], positions[t + 1][1],
+                ) / (times[t + 1] - times[t])
+
+        fast = []
+        for t, position in enumerate(positions):
+            speed = speeds[t - 1] if t > 0 else None
+            if speed is None and t < len(speeds):
+                speed = speeds[t]
+            fast.append(
+                position if speed is not None and speed >= min_speed
+                else None)
+        result.append(fast)
+
+    return alignment._replace(positions=result)
+
+
+def _without_slow_array(alignment, min_speed):
+    """
+    Vectorized version of :func:`_without_slow`.
+    """
+    numpy = import_numpy()
+    positions = alignment.positions
+    speeds = geo.distance_array(
+        positions[:, :-1, 0], positions[:, :-1, 1],
+        positions[:, 1:, 0], positions[:, 1:, 1],
+    ) / numpy.diff(alignment.times)
+
+    speed = numpy.full(positions.shape[:2], numpy.nan)
+    speed[:, 1:] = speeds
+    speed[:, :-1] = numpy.where(
+        numpy.isnan(speed[:, :-1]), speeds, speed[:, :-1])
+
+    positions = positions.copy()
+    positions[~(speed >= min_speed)] = numpy.nan
+    return alignment._replace(positions=positions)
+
+
+def _find_encounters(alignment, horizontal, vertical, step):
+    latitudes = [
+        position[0] for flight in alignment.positions
+        for position in flight if position is not None
+    ]
+    x_scale, y_scale = _projection(latitudes)
+
+    # (flight1, flight2) -> list of [start, end, distance, time, vertical]
+    open_encounters = {}
+    encounters = []
+
+    for t, time in enumerate(alignment.times):
+        grid = {}
+        for flight, positions in enumerate(alignment.positions):
+            position = positions[t]
+            if position is None:
+                continue
+
+            cell = (int(math.floor(position[1] * x_scale / horizontal)),
+                    int(math.floor(position[0] * y_scale / horizontal)))
+            grid.setdefault(cell, []).append((flight, position))
+
+        for (x, y), members in grid.items():
+            for dx, dy in NEIGHBOUR_CELLS:
+                others = grid.get((x + dx, y + dy))
+                if not others:
+                    continue
+
+                for i, (flight1, position1) in enumerate(members):
+                    if (dx, dy) == (0, 0):
+                        candidates = others[i + 1:]
+                    else:
+                        candidates = others
+
+                    for flight2, position2 in candidates:
+                        separation = abs(position1[2] - position2[2])
+                        if separation >= vertical:
+                            continue
+
+                        distance = geo.distance(
+                            position1[0], position1[1],
+                            position2[0], position2[1])
+                        if distance >= horizontal:
+                            continue
+
+                        key = (min(flight1, flight2), max(flight1, flight2))
+                        encounter = open_encounters.get(key)
+                        if encounter is None or encounter[1] < time - step:
+                            if encounter is not None:
+                                encounters.append(Encounter(*(key + tuple(encounter))))
+                            encounter = [time, time, distance, time, separation]
+                            open_encounters[key] = encounter
+                        else:
+                            encounter[1] = time
+                            if distance < encounter[2]:
+                                encounter[2:] = [distance, time, separation]
+
+    for key, encounter in open_encounters.items():
+        encounters.append(Encounter(*(key + tuple(encounter))))
+
+    return encounters
+
+
+def _find_encounters_array(alignment, horizontal, vertical, step):
+    numpy = import_numpy()
+    positions = alignment.positions
+    times = alignment.times
+    if numpy.isnan(positions[:, :, 0]).all():
+        return []
+
+    x_scale, y_scale = _projection([
+        numpy.nanmin(positions[:, :, 0]), numpy.nanmax(positions[:, :, 0])])
+
+    # (flight1, flight2) -> [start, end, distance, time, vertical] of the
+    # encounters which may continue in the next chunk
+    open_encounters = {}
+    encounters = []
+
+    for begin in range(0, len(times), CHUNK_SIZE):
+        chunk = slice(begin, begin + CHUNK_SIZE)
+        for run in _chunk_encounters(
+                positions[:, chunk], times[chunk], horizontal, vertical,
+                step, x_scale, y_scale):
+            key, run = run[:2], list(run[2:])
+            encounter = open_encounters.get(key)
+            if encounter is None or encounter[1] < run[0] - step:
+                if encounter is not None:
+                    encounters.append(Encounter(*(key + tuple(encounter))))
+                open_encounters[key] = run
+            else:
+                encounter[1] = run[1]
+                if run[2] < encounter[2]:
+                    encounter[2:] = run[2:]
+
+        # encounters which ended before the last time step of the chunk
+        # can not continue
+        last = int(times[chunk][-1])
+        for key in [key for key, encounter in open_encounters.items()
+                    if encounter[1] < last]:
+            encounters.append(Encounter(*(key + tuple(open_encounters.pop(key)))))
+
+    for key, encounter in open_encounters.items():
+        encounters.append(Encounter(*(key + tuple(encounter))))
+
+    return encounters
+
+
+def _chunk_encounters(positions, times, horizontal, vertical, step,
+                      x_scale, y_scale):
+    """
+    Return the ``(flight1, flight2, start, end, distance, time, vertical)``
+    tuples of the encounters in a chunk of the time axis, see
+    :class:`Encounter`.
+    """
+    numpy = import_numpy()
+    num_times = positions.shape[1]
+
+    flight, t = numpy.nonzero(~numpy.isnan(positions[:, :, 0]))
+    if len(t) == 0:
+        return []
+
+    lat = positions[flight, t, 0]
+    lon = positions[flight, t, 1]
+    alt = positions[flight, t, 2]
+
+    cx = numpy.floor(lon * x_scale / horizontal).astype(numpy.int64)
+    cy = numpy.floor(lat * y_scale / horizontal).astype(numpy.int64)
+    # one integer key per (time step, cell) with a margin of one cell, so
+    # that neighbouring keys never wrap around
+    cx -= cx.min() - 1
+    cy -= cy.min() - 1
+    width = cx.max() + 2
+    height = cy.max() + 2
+    if num_times * width * height >= 2 ** 62:
+        raise ValueError('Grid too large, increase the horizontal separation')
+
+    keys = (t * width + cx) * height + cy
+    order = numpy.argsort(keys, kind='stable')
+    keys = keys[order]
+
+    pairs1 = []
+    pairs2 = []
+    for dx, dy in NEIGHBOUR_CELLS:
+        query = keys + dx * height + dy
+        low = numpy.searchsorted(keys, query, side='left')
+        high = numpy.searchsorted(keys, query, side='right')
+        if (dx, dy) == (0, 0):
+            low = numpy.maximum(low, numpy.arange(len(keys)) + 1)
+
+        counts = numpy.maximum(high - low, 0)
+        total = counts.sum()
+        if total == 0:
+            continue
+
+        first = numpy.repeat(numpy.arange(len(keys)), counts)
+        offsets = numpy.arange(total) - numpy.repeat(
+            numpy.cumsum(counts) - counts, counts)
+        pairs1.append(first)
+        pairs2.append(numpy.repeat(low, counts) + offsets)
+
+    if not pairs1:
+        return []
+
+    a = order[numpy.concatenate(pairs1)]
+    b = order[numpy.concatenate(pairs2)]
+
+    separation = numpy.abs(alt[a] - alt[b])
+    close = separation < vertical
+    a, b, separation = a[close], b[close], separation[close]
+
+    distance = geo.distance_array(lat[a], lon[a], lat[b], lon[b])
+    close = distance < horizontal
+    a, b = a[close], b[close]
+    distance, separation = distance[close], separation[close]
+    if len(a) == 0:
+        return []
+
+    flight1 = numpy.minimum(flight[a], flight[b])
+    flight2 = numpy.maximum(flight[a], flight[b])
+    times = times[t[a]]
+
+    order = numpy.lexsort((times, flight2, flight1))
+    flight1, flight2, times = flight1[order], flight2[order], times[order]
+    distance, separation = distance[order], separation[order]
+
+    # a new encounter starts with a new pair or after a time step without
+    # contact
+    starts = numpy.flatnonzero(
+        (flight1[1:] != flight1[:-1]) | (flight2[1:] != flight2[:-1]) |
+        (times[1:] - times[:-1] > step)) + 1
+    starts = numpy.concatenate(([0], starts))
+    ends = numpy.concatenate((starts[1:], [len(times)])) - 1
+
+    encounters = []
+    for start, end in zip(starts.tolist(), ends.tolist()):
+        closest = start + int(numpy.argmin(distance[start:end + 1]))
+        encounters.append((
+            int(flight1[start]), int(flight2[start]),
+            int(times[start]), int(times[end]),
+            float(distance[closest]), int(times[closest]),
+            float(separation[closest])))
+
+    return encounters
@@ -0,0 +1,255 @@
+import math
+
+from aerofiles.igc.columns import fix_timestamp, import_numpy
+from aerofiles.util import geo
+
+
+# The tolerances in meters of the default levels, from coarse to fine.
+DEFAULT_TOLERANCES = (2000., 500., 100., 20., 5., 0.)
+
+
+def importances(x, y):
+    """
+    Return the Douglas-Peucker importance of every point of a polyline, i.e.
+    the largest tolerance at which the point is kept by the algorithm. The
+    first and last points are always kept and get ``inf``.
+
+    Every point is given the smaller of its distance to the segment of its
+    parent and the importance of the parent, so that keeping all points
+    with an importance above a tolerance gives exactly the Douglas-Peucker
+    result for that tolerance.
+
+    :param x: the x coordinates in meters
+    :param y: the y coordinates in meters
+    """
+    numpy = import_numpy()
+    n = len(x)
+    result = [0.] * n
+    if n == 0:
+        return result
+
+    result[0] = result[-1] = float('inf')
+    if numpy is not None:
+        x = numpy.asarray(x, dtype=numpy.float64)
+        y = numpy.asarray(y, dtype=numpy.float64)
+
+    stack = [(0, n - 1, float('inf'))]
+    while stack:
+        first, last, limit = stack.pop()
+        if last - first < 2:
+            continue
+
+        index, distance = _farthest(x, y, first, last)
+        distance = min(distance, limit)
+        result[index] = distance
+        stack.append((first, index, distance))
+        stack.append((index, last, distance))
+
+    return result
+
+
+def _farthest(x, y, first, last):
+    """
+    Return the index and distance of the point between ``first`` and
+    ``last`` which is farthest from the segment between them.
+    """
+    numpy = import_numpy()
+    ax, ay = x[first], y[first]
+    dx, dy = x[last] - ax, y[last] - ay
+    length = dx * dx + dy * dy
+
+    if numpy is not None:
+        px = x[first + 1:last] - ax
+        py = y[first + 1:last] - ay
+        if length > 0:
+            t = numpy.clip((px * dx + py * dy) / length, 0., 1.)
+            px = px - t * dx
+            py = py - t * dy
+        distances = numpy.hypot(px, py)
+        index = int(numpy.argmax(distances))
+        return first + 1 + index, float(distances[index])
+
+    best_index, best_distance = first + 1, -1.
+    for i in range(first + 1, last):
+        px, py = x[i] - ax, y[i] - ay
+        if length > 0:
+            t = min(1., max(0., (px * dx + py * dy) / length))
+            px, py = px - t * dx, py - t * dy
+        distance = math.hypot(px, py)
+        if distance > best_distance:
+            best_index, best_distance = i, distance
+
+    return best_index, best_distance
+
+
+class TrackPyramid:
+    """
+    A level of detail pyramid of a track for map viewers::
+
+        pyramid = TrackPyramid.build(igc['fix_records'][1])
+        level = pyramid.level_for(meters_per_pixel)
+        for line in pyramid.lines(level, bbox=viewport):
+            draw(line)
+
+    Each level is the Douglas-Peucker simplification of the track with one
+    of the ``tolerances`` (in meters, from coarse to fine). The levels are
+    computed in one pass and are nested, every point of a level is also part
+    of all finer levels.
+
+    The points of the finest level are stored once in ``time``, ``lat``,
+    ``lon`` and ``alt`` and ``indexes`` are their indexes in the original
+    fix records. ``levels`` contains one sorted list of positions into these
+    lists per level. Each level is divided into blocks of ``block_size``
+    points with a bounding box, so that a viewport query only touches the
+    blocks it intersects.
+    """
+
+    def __init__(self, tolerances, indexes, time, lat, lon, alt, levels,
+                 block_size=64):
+        self.tolerances = list(tolerances)
+        self.indexes = indexes
+        self.time = time
+        self.lat = lat
+        self.lon = lon
+        self.alt = alt
+        self.levels = levels
+        self.block_size = block_size
+        self.blocks = [self._blocks(level) for level in levels]
+
+    @classmethod
+    def build(cls, fixes, tolerances=DEFAULT_TOLERANCES, altitude='gps_alt',
+              block_size=64):
+        """
+        Build the pyramid of a list of fix records.
+
+        :param fixes: a list of fix records
+        :param tolerances: the maximum error of the levels in meters, from
+            coarse to fine
+        :param altitude: the fix altitude to store (``gps_alt`` or
+            ``pressure_alt``)
+        :param block_size: the number of points per block of the viewport
+            index
+        """
+        tolerances = sorted(tolerances, reverse=True)
+
+        lats = [fix['lat'] for fix in fixes]
+        lons = [fix['lon'] for fix in fixes]
+        y_scale = math.radians(geo.EARTH_RADIUS)
+        x_scale = y_scale * math.cos(
+            math.radians(sum(lats) / len(lats) if lats else 0.))
+        point_importances = importances(
+            [lon * x_scale for lon in lons], [lat * y_scale for lat in lats])
+
+        finest = tolerances[-1]
+        indexes = [
+            i for i, importance in enumerate(point_importances)
+            if importance > finest
+        ]
+        levels = [
+            [position for position, i in enumerate(indexes)
+             if point_importances[i] > tolerance]
+            for tolerance in tolerances
+        ]
+
+        return cls(
+            tolerances, indexes,
+            [fix_timestamp(fixes[i]) for i in indexes],
+            [lats[i] for i in indexes],
+            [lons[i] for i in indexes],
+            [fixes[i][altitude] for i in indexes],
+            levels, block_size=block_size)
+
+    def _blocks(self, level):
+        if not level:
+            return []
+
+        blocks = []
+        for start in range(0, max(len(level) - 1, 1), self.block_size):
+            # blocks overlap by one point to contain the segments between them
+            positions = level[start:start + self.block_size + 1]
+            lats = [self.lat[position] for position in positions]
+            lons = [self.lon[position] for position in positions]
+            blocks.append((min(lats), min(lons), max(lats), max(lons)))
+
+        return blocks
+
+    def __len__(self):
+        return len(self.levels)
+
+    def level_for(self, resolution):
+        """
+        Return the coarsest level whose tolerance is at most ``resolution``
+        (e.g. the meters per pixel of a map zoom level).
+        """
+        for level, tolerance in enumerate(self.tolerances):
+            if tolerance <= resolution:
+                return level
+
+        return len(self.levels) - 1
+
+    def ranges(self, level, bbox=None):
+        """
+        Return the ``(start, end)`` ranges of the positions in
+        ``levels[level]`` whose segments may intersect the bounding box.
+
+        :param level: the level number
+        :param bbox: a ``(min_lat, min_lon, max_lat, max_lon)`` tuple or
+            ``None`` for the whole track
+        """
+        size = len(self.levels[level])
+        if bbox is None:
+            return [(0, size)] if size else []
+
+        min_lat, min_lon, max_lat, max_lon = bbox
+        ranges = []
+        for block, (b_min_lat, b_min_lon, b_max_lat, b_max_lon) in \
+                enumerate(self.blocks[level]):
+            if b_min_lat > max_lat or b_max_lat < min_lat or \
+                    b_min_lon > max_lon or b_max_lon < min_lon:
+                continue
+
+            start = block * self.block_size
+            end = min(start + self.block_size + 1, size)
+            if ranges and ranges[-1][1] >= start:
+                ranges[-1] = (ranges[-1][0], end)
+            else:
+                ranges.append((start, end))
+
+        return ranges
+
+    def lines(self, level, bbox=None):
+        """
+        Return the polylines of a level in a bounding box as lists of
+        ``(time, lat, lon, alt)`` tuples.
+        """
+        positions = self.levels[level]
+        return [
+            [(self.time[p], self.lat[p], self.lon[p], self.alt[p])
+             for p in positions[start:end]]
+            for start, end in self.ranges(level, bbox)
+        ]
+
+    def to_dict(self):
+        """
+        Return the pyramid as a dictionary of lists, e.g. for JSON.
+        """
+        return {
+            'tolerances': self.tolerances,
+            'indexes': list(self.indexes),
+            'time': list(self.time),
+            'lat': list(self.lat),
+            'lon': list(self.lon),
+            'alt': list(self.alt),
+            'levels': [list(level) for level in self.levels],
+            'block_size': self.block_size,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Create a pyramid from the result of :meth:`to_dict`.
+        """
+        return cls(
+            data['tolerances'], data['indexes'], data['time'], data['lat'],
+            data['lon'], data['alt'], data['levels'],
+            block_size=data['block_size'])
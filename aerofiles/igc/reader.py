@@ -1,4 +1,5 @@
 import datetime
+import io
 
 from aerofiles.util.timezone import TimeZoneFix
 
@@ -9,6 +10,17 @@ class Reader:
 
     skip_duplicates flag removes trailing duplicate time entries
 
+    integer_coordinates flag returns the ``lat`` and ``lon`` of the fixes as
+    integer milli-minutes (``DDMMmmm`` as stored in the file, negative for
+    south and west) instead of float degrees. Writing them with a
+    :class:`~aerofiles.igc.Writer` using the same flag is lossless. Divide
+    by ``60000`` to get degrees. Task points (C records) are still returned
+    in degrees. The geometric functions of :mod:`aerofiles.igc`, like
+    :class:`~aerofiles.igc.TaskScorer`,
+    :class:`~aerofiles.igc.PhaseSegmenter` or
+    :func:`~aerofiles.igc.align_flights`, expect fixes in degrees and give
+    wrong results for these fixes.
+
     Example:
 
     .. sourcecode:: python
@@ -18,18 +30,64 @@ class Reader:
 
     """
 
-    def __init__(self, skip_duplicates=False):
+    def __init__(self, skip_duplicates=False, integer_coordinates=False):
         self.reader = None
         self.skip_duplicates = skip_duplicates
+        self.integer_coordinates = integer_coordinates
 
-    def read(self, file_obj):
+    def read(self, file_obj, aggregators=None, store_fixes=True):
         """
         Read the specified file object and return a dictionary with the parsed data.
 
+        The ``aggregators`` (see :mod:`aerofiles.igc.aggregators`) are fed
+        with the records while they are parsed. Their results are returned
+        as ``aggregates``, a dictionary keyed by the aggregator names::
+
+            result = Reader().read(f, aggregators=[BoundingBox(), FixCount()],
+                                   store_fixes=False)
+            result['aggregates'][1]['bbox']
+
         :param file_obj: a Python file object
+        :param aggregators: a list of aggregator objects
+        :param store_fixes: if ``False`` the fixes are only passed to the
+            aggregators and ``fix_records`` stays empty
+
+        """
+        self.reader = LowLevelReader(
+            file_obj, integer_coordinates=self.integer_coordinates)
+        return self.read_records(self.reader, aggregators, store_fixes)
+
+    def read_path(self, path, encoding='utf-8', **kwargs):
+        """
+        Read the IGC file at ``path``, see :meth:`read`. The file is decoded
+        with ``encoding`` and undecodable bytes (e.g. a pilot name in
+        another encoding) are replaced instead of raising an error.
+
+        :param path: the path of the IGC file
+        :param encoding: the encoding of the file
+        :param kwargs: passed to :meth:`read`
+        """
+        with open(path, 'rb') as f:
+            data = f.read()
+
+        return self.read(
+            io.StringIO(data.decode(encoding, 'replace')), **kwargs)
 
+    def read_records(self, records, aggregators=None, store_fixes=True):
         """
-        self.reader = LowLevelReader(file_obj)
+        Like :meth:`read`, but takes the decoded records as the
+        ``(record_type, record, error)`` tuples yielded by
+        :class:`LowLevelReader`.
+        """
+        aggregators = aggregators or []
+        if self.integer_coordinates:
+            for aggregator in aggregators:
+                if aggregator.requires_degrees:
+                    raise ValueError(
+                        'The %s aggregator requires degree coordinates' %
+                        aggregator.name)
+
+        previous_fix = None
 
         logger_id = [[], None]
         fix_records = [[], []]
@@ -44,7 +102,11 @@ class Reader:
         k_records = [[], []]
         comment_records = [[], []]
 
-        for record_type, line, error in self.reader:
+        for record_type, line, error in records:
+
+            if record_type != 'B' and not error:
+                for aggregator in aggregators:
+                    aggregator.on_record(record_type, line)
 
             if record_type == 'A':
                 if error:
@@ -65,10 +127,9 @@ class Reader:
                         line, fix_record_extensions[1])
 
                     # To create "datetime" we need a date. Take it from header or previous fix:
-                    if len(fix_records[1]) == 0:
+                    if previous_fix is None:
                         date = header[1]["utc_date"]
                     else:
-                        previous_fix = fix_records[1][-1]
                         date = previous_fix["datetime"].date()
                         time = previous_fix["datetime"].time()
                         # If time of next fix is _before_ last fix, we are now on next day
@@ -84,7 +145,11 @@ class Reader:
                         fix_record["datetime_local"] = fix_record["datetime"].astimezone(
                             timezone)
 
-                    fix_records[1].append(fix_record)
+                    previous_fix = fix_record
+                    if store_fixes:
+                        fix_records[1].append(fix_record)
+                    for aggregator in aggregators:
+                        aggregator.on_fix(fix_record)
             elif record_type == 'C':
                 task_item = line
 
@@ -163,19 +228,26 @@ class Reader:
                 else:
                     comment_records[1].append(line)
 
-        return dict(logger_id=logger_id,                            # A record
-                    fix_records=fix_records,                        # B records
-                    task=task,                                      # C records
-                    dgps_records=dgps_records,                      # D records
-                    event_records=event_records,                    # E records
-                    satellite_records=satellite_records,            # F records
-                    security_records=security_records,              # G records
-                    header=header,                                  # H records
-                    fix_record_extensions=fix_record_extensions,    # I records
-                    k_record_extensions=k_record_extensions,        # J records
-                    k_records=k_records,                            # K records
-                    comment_records=comment_records,                # L records
-                    )
+        result = dict(logger_id=logger_id,                          # A record
+                      fix_records=fix_records,                      # B records
+                      task=task,                                    # C records
+                      dgps_records=dgps_records,                    # D records
+                      event_records=event_records,                  # E records
+                      satellite_records=satellite_records,          # F records
+                      security_records=security_records,            # G records
+                      header=header,                                # H records
+                      fix_record_extensions=fix_record_extensions,  # I records
+                      k_record_extensions=k_record_extensions,      # J records
+                      k_records=k_records,                          # K records
+                      comment_records=comment_records,              # L records
+                      )
+
+        if aggregators:
+            result['aggregates'] = [[], dict(
+                (aggregator.name, aggregator.finish())
+                for aggregator in aggregators)]
+
+        return result
 
 
 class LowLevelReader:
@@ -185,9 +257,10 @@ class LowLevelReader:
     see http://carrier.csi.cam.ac.uk/forsterlewis/soaring/igc_file_format/igc_format_2008.html
     """
 
-    def __init__(self, file_obj):
+    def __init__(self, file_obj, integer_coordinates=False):
         self.file_obj = file_obj
         self.line_number = 0
+        self.integer_coordinates = integer_coordinates
 
     def __iter__(self):
         return self.next()
@@ -209,6 +282,9 @@ class LowLevelReader:
                 yield (record_type, None, e)
 
     def parse_line(self, record_type, line):
+        if record_type == 'B' and self.integer_coordinates:
+            return self.decode_B_record(line, integer_coordinates=True)
+
         decoder = self.get_decoder_method(record_type)
         return decoder(line)
 
@@ -229,11 +305,18 @@ class LowLevelReader:
         }
 
     @staticmethod
-    def decode_B_record(line):
+    def decode_B_record(line, integer_coordinates=False):
+        if integer_coordinates:
+            lat = LowLevelReader.decode_latitude_milliminutes(line[7:15])
+            lon = LowLevelReader.decode_longitude_milliminutes(line[15:24])
+        else:
+            lat = LowLevelReader.decode_latitude(line[7:15])
+            lon = LowLevelReader.decode_longitude(line[15:24])
+
         return {
             'time': LowLevelReader.decode_time(line[1:7]),
-            'lat': LowLevelReader.decode_latitude(line[7:15]),
-            'lon': LowLevelReader.decode_longitude(line[15:24]),
+            'lat': lat,
+            'lon': lon,
             'validity': line[24],
             'pressure_alt': int(line[25:30]),
             'gps_alt': int(line[30:35]),
@@ -790,6 +873,34 @@ class LowLevelReader:
 
         return longitude
 
+    @staticmethod
+    def decode_latitude_milliminutes(lat_string):
+
+        latitude = int(lat_string[0:2]) * 60000 + int(lat_string[2:7])
+        ordinal = lat_string[7]
+
+        if not (0 <= latitude <= 90 * 60000):
+            raise ValueError('Latitude format is invalid')
+
+        if ordinal == 'S':
+            latitude = -latitude
+
+        return latitude
+
+    @staticmethod
+    def decode_longitude_milliminutes(lon_string):
+
+        longitude = int(lon_string[0:3]) * 60000 + int(lon_string[3:8])
+        ordinal = lon_string[8]
+
+        if not (0 <= longitude <= 180 * 60000):
+            raise ValueError('Longitude format is invalid')
+
+        if ordinal == 'W':
+            longitude = -longitude
+
+        return longitude
+
 
 class MissingRecordsError(Exception):
     pass
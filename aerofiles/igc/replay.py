@@ -0,0 +1,318 @@
+"""
+An optional asyncio based replay engine for IGC flights.
+
+:class:`ReplayEngine` emits the fixes of many flights at their recorded
+times, in real time or accelerated, e.g. to drive simulators or to load
+test live tracking servers::
+
+    async def main():
+        engine = ReplayEngine(send_position, speed=10)
+        for path in paths:
+            engine.add(path)
+        await engine.run()
+
+All flights share one heap keyed on the fix time and one task, so replaying
+a thousand flights costs one heap operation per fix.
+
+This module requires Python 3.7 or newer and is not imported by
+:mod:`aerofiles.igc`.
+"""
+
+import asyncio
+import bisect
+import collections
+import heapq
+import itertools
+import time as time_module
+
+from aerofiles.igc.columns import fix_timestamp
+from aerofiles.igc.seek import _read_start, _read_window, _time_range
+
+
+class FixListSource:
+    """
+    A replay source of a list of fix records, e.g. ``fix_records`` of a
+    :meth:`aerofiles.igc.Reader.read` result.
+    """
+
+    def __init__(self, fixes):
+        self.fixes = fixes
+        self.times = [fix_timestamp(fix) for fix in fixes]
+        self.position = 0
+
+    @property
+    def start_time(self):
+        return self.times[0] if self.times else None
+
+    def seek(self, timestamp):
+        """
+        Continue with the first fix at or after ``timestamp``.
+        """
+        self.position = bisect.bisect_left(self.times, timestamp)
+
+    def next(self):
+        """
+        Return the next ``(timestamp, fix)`` tuple or ``None`` at the end.
+        """
+        if self.position >= len(self.fixes):
+            return None
+
+        position = self.position
+        self.position += 1
+        return self.times[position], self.fixes[position]
+
+    def close(self):
+        pass
+
+
+class FixFileSource:
+    """
+    A replay source that reads the fixes of an IGC file lazily in windows of
+    ``window`` seconds with :func:`~aerofiles.igc.read_fixes_between`, so
+    only a small part of every flight is in memory. The headers and day
+    rollovers of the file are only read once.
+
+    :param file_obj: a path or a seekable file object opened in binary mode
+    :param window: the length of the windows in seconds
+    :param encoding: the encoding of the file
+    """
+
+    def __init__(self, file_obj, window=300, encoding='utf-8'):
+        self.owns_file = not hasattr(file_obj, 'read')
+        self.file_obj = open(file_obj, 'rb') if self.owns_file else file_obj
+        self.window = window
+        self.encoding = encoding
+
+        self.flight = _read_start(self.file_obj, encoding)
+        self.start_time = self.end_time = None
+        if self.flight is not None:
+            self.start_time, self.end_time = _time_range(
+                self.file_obj, self.flight)
+        self.buffer = collections.deque()
+        self.next_start = self.start_time
+
+    def seek(self, timestamp):
+        self.buffer.clear()
+        self.next_start = timestamp if self.start_time is None else \
+            max(timestamp, self.start_time)
+
+    def next(self):
+        while not self.buffer:
+            if self.end_time is None or self.next_start > self.end_time:
+                return None
+
+            end = self.next_start + self.window - 1
+            self.buffer.extend(_read_window(
+                self.file_obj, self.flight, self.next_start, end,
+                encoding=self.encoding))
+            self.next_start = end + 1
+
+        fix = self.buffer.popleft()
+        return fix_timestamp(fix), fix
+
+    def close(self):
+        if self.owns_file:
+            self.file_obj.close()
+
+
+class ReplayEngine:
+    """
+    Replays the fixes of many flights at ``speed`` times their recorded
+    rate.
+
+    ``on_fix`` is called with the flight id and the fix record of every fix
+    when the replay clock reaches its time. It may be a coroutine function,
+    the engine waits for it before emitting the next fix. The replay clock
+    starts at the earliest fix of all flights unless :meth:`seek` is used.
+
+    The engine keeps the next fix of every flight in a heap ordered by time
+    and runs in a single task which sleeps until the next fix is due.
+    :meth:`pause`, :meth:`resume`, :meth:`seek` and changing :attr:`speed`
+    take effect immediately, also while the engine is sleeping.
+
+    :param on_fix: the function or coroutine function called for each fix
+    :param speed: the replay speed, ``1`` is real time
+    :param window: the window length in seconds of flights that are read
+        lazily from files, see :class:`FixFileSource`
+    """
+
+    def __init__(self, on_fix, speed=1., window=300):
+        self.on_fix = on_fix
+        self.window = window
+        self.flights = []
+        self.heap = []
+        self.counter = itertools.count()
+        self.paused = False
+        self.running = False
+        self.num_fixes = 0
+
+        self._speed = speed
+        self._clock = None
+        self._wall_time = None
+        self._waiter = None
+        self._generation = 0
+
+    def add(self, flight, flight_id=None, offset=0):
+        """
+        Add a flight to the replay and return its id.
+
+        :param flight: a list of fix records, a
+            :meth:`aerofiles.igc.Reader.read` result, a replay source like
+            :class:`FixListSource`, or the path or binary file object of an
+            IGC file, which is read lazily
+        :param flight_id: the id passed to ``on_fix``, defaults to the index
+            of the flight
+        :param offset: seconds added to the fix times, e.g. to replay
+            flights of different days together
+        """
+        if isinstance(flight, dict):
+            flight = flight['fix_records'][1]
+        if isinstance(flight, list):
+            flight = FixListSource(flight)
+        elif not hasattr(flight, 'next'):
+            flight = FixFileSource(flight, window=self.window)
+
+        if flight_id is None:
+            flight_id = len(self.flights)
+
+        index = len(self.flights)
+        self.flights.append((flight_id, flight, offset))
+        if self._clock is not None:
+            flight.seek(self.time - offset)
+        self._push(index)
+        self._wake()
+        return flight_id
+
+    @property
+    def speed(self):
+        return self._speed
+
+    @speed.setter
+    def speed(self, speed):
+        self._set_clock(self.time)
+        self._speed = speed
+        self._wake()
+
+    @property
+    def time(self):
+        """
+        The current replay time as seconds since the Unix epoch.
+        """
+        if self._clock is None:
+            return self.heap[0][0] if self.heap else None
+        if self.paused or not self.running:
+            return self._clock
+
+        return self._clock + \
+            (time_module.monotonic() - self._wall_time) * self._speed
+
+    def pause(self):
+        """
+        Stop the replay clock until :meth:`resume` is called.
+        """
+        if not self.paused:
+            self._set_clock(self.time)
+            self.paused = True
+            self._wake()
+
+    def resume(self):
+        if self.paused:
+            self.paused = False
+            self._set_clock(self._clock)
+            self._wake()
+
+    def seek(self, timestamp):
+        """
+        Continue the replay of all flights at ``timestamp``.
+        """
+        for _, flight, offset in self.flights:
+            flight.seek(timestamp - offset)
+
+        self.heap = []
+        for index in range(len(self.flights)):
+            self._push(index)
+
+        self._set_clock(timestamp)
+        self._generation += 1
+        self._wake()
+
+    async def run(self):
+        """
+        Replay until all flights are finished and return the number of
+        emitted fixes.
+        """
+        if self._clock is None and self.heap:
+            self._set_clock(self.heap[0][0])
+        elif self._clock is not None:
+            self._set_clock(self._clock)
+
+        self.running = True
+        try:
+            return await self._run()
+        finally:
+            self._set_clock(self.time)
+            self.running = False
+
+    async def _run(self):
+        while self.heap:
+            if self.paused:
+                await self._sleep(None)
+                continue
+
+            now = self.time
+            timestamp = self.heap[0][0]
+            if timestamp > now:
+                await self._sleep((timestamp - now) / self._speed)
+                continue
+
+            generation = self._generation
+            while self.heap and self.heap[0][0] <= now and \
+                    generation == self._generation and not self.paused:
+                _, _, index, fix = heapq.heappop(self.heap)
+                self._push(index)
+
+                self.num_fixes += 1
+                result = self.on_fix(self.flights[index][0], fix)
+                if asyncio.iscoroutine(result):
+                    await result
+
+            # let other tasks run between the batches of due fixes
+            await asyncio.sleep(0)
+
+        return self.num_fixes
+
+    def close(self):
+        """
+        Close the files of lazily read flights.
+        """
+        for _, flight, _ in self.flights:
+            flight.close()
+
+    def _push(self, index):
+        _, flight, offset = self.flights[index]
+        item = flight.next()
+        if item is not None:
+            timestamp, fix = item
+            heapq.heappush(self.heap, (
+                timestamp + offset, next(self.counter), index, fix))
+
+    def _set_clock(self, timestamp):
+        self._clock = timestamp
+        self._wall_time = time_module.monotonic()
+
+    async def _sleep(self, delay):
+        loop = asyncio.get_running_loop()
+        self._waiter = loop.create_future()
+        handle = None
+        if delay is not None:
+            handle = loop.call_later(delay, self._wake)
+        try:
+            await self._waiter
+        finally:
+            self._waiter = None
+            if handle is not None:
+                handle.cancel()
+
+    def _wake(self):
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_result(None)
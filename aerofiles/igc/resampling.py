@@ -0,0 +1,163 @@
+import collections
+
+from aerofiles.igc.align import interpolate_rows, interpolate_rows_array
+from aerofiles.igc.columns import fix_columns, import_numpy, scalar
+
+
+# Columns which are linearly interpolated. All other columns (validity and
+# fix extensions) take the value of the nearest fix.
+INTERPOLATED_COLUMNS = ('lat', 'lon', 'pressure_alt', 'gps_alt')
+
+
+class Gap(collections.namedtuple('Gap', [
+        'start_time', 'end_time', 'start_index', 'end_index'])):
+    """
+    A gap in the recording between the fixes ``start_index`` and
+    ``end_index`` (``end_index == start_index + 1``) at the times
+    ``start_time`` and ``end_time`` in seconds.
+    """
+
+    __slots__ = ()
+
+    @property
+    def duration(self):
+        return self.end_time - self.start_time
+
+
+def find_gaps(fixes, max_interval=10):
+    """
+    Find the gaps in a recording::
+
+        gaps = find_gaps(igc['fix_records'][1], max_interval=10)
+
+    :param fixes: a list of fix records
+    :param max_interval: the longest interval between two fixes in seconds
+        that is not considered a gap
+    :return: a list of :class:`Gap` tuples
+    """
+    return find_gap_columns(
+        fix_columns(fixes, extensions=[])['time'], max_interval)
+
+
+def find_gap_columns(time, max_interval=10):
+    """
+    Column based version of :func:`find_gaps` taking the fix times in
+    seconds.
+    """
+    numpy = import_numpy()
+    if numpy is not None:
+        time = numpy.asarray(time)
+        indexes = numpy.flatnonzero(numpy.diff(time) > max_interval).tolist()
+    else:
+        indexes = [
+            i for i in range(len(time) - 1)
+            if time[i + 1] - time[i] > max_interval
+        ]
+
+    return [
+        Gap(scalar(time[i]), scalar(time[i + 1]), i, i + 1) for i in indexes
+    ]
+
+
+def resample(fixes, interval=1, max_gap=None, extensions=None):
+    """
+    Resample a recording to a fixed interval::
+
+        columns = resample(igc['fix_records'][1], interval=1)
+        columns['lat']  # -> one latitude per second
+
+    The positions and altitudes are linearly interpolated between the fixes,
+    the validity and the fix extensions take the value of the nearest fix.
+    The result has the same columns as
+    :func:`~aerofiles.igc.columns.fix_columns` with a uniform ``time``
+    column starting at the first fix.
+
+    :param fixes: a list of fix records
+    :param interval: the interval of the result in seconds
+    :param max_gap: if given, gaps between fixes of more than ``max_gap``
+        seconds are not interpolated but filled with ``nan`` (``None``
+        without NumPy) and ``False`` validity
+    :param extensions: see :func:`~aerofiles.igc.columns.fix_columns`
+    """
+    return resample_columns(
+        fix_columns(fixes, extensions=extensions), interval, max_gap)
+
+
+def resample_columns(columns, interval=1, max_gap=None):
+    """
+    Column based version of :func:`resample`. Takes and returns a
+    dictionary of columns like :func:`~aerofiles.igc.columns.fix_columns`.
+    """
+    numpy = import_numpy()
+    time = columns['time']
+    if max_gap is None:
+        max_gap = float('inf')
+
+    if len(time) == 0:
+        return dict((key, column[:0]) for key, column in columns.items())
+
+    nearest_columns = [
+        key for key in columns
+        if key != 'time' and key not in INTERPOLATED_COLUMNS
+    ]
+
+    times = list(range(scalar(time[0]), scalar(time[-1]) + 1, interval))
+
+    if numpy is not None:
+        time = numpy.asarray(time)
+        times = numpy.array(times, dtype=numpy.int64)
+
+        rows = numpy.column_stack([time] + [
+            numpy.asarray(columns[key], dtype=numpy.float64)
+            for key in INTERPOLATED_COLUMNS
+        ])
+        values = numpy.full((len(times), len(INTERPOLATED_COLUMNS)), numpy.nan)
+        interpolate_rows_array(rows, times, max_gap, values)
+        missing = numpy.isnan(values[:, 0])
+
+        after = numpy.minimum(
+            numpy.searchsorted(time, times, side='left'), len(time) - 1)
+        before = numpy.maximum(after - 1, 0)
+        nearest = numpy.where(
+            times - time[before] <= time[after] - times, before, after)
+
+        result = {'time': times}
+        for i, key in enumerate(INTERPOLATED_COLUMNS):
+            result[key] = values[:, i]
+        for key in nearest_columns:
+            column = numpy.asarray(columns[key])[nearest]
+            if column.dtype == bool:
+                column[missing] = False
+            else:
+                column = column.astype(numpy.float64)
+                column[missing] = numpy.nan
+            result[key] = column
+
+        return result
+
+    rows = list(zip(time, *[columns[key] for key in INTERPOLATED_COLUMNS]))
+    values = interpolate_rows(rows, times, max_gap)
+
+    result = {'time': times}
+    for i, key in enumerate(INTERPOLATED_COLUMNS):
+        result[key] = [None if v is None else v[i] for v in values]
+    for key in nearest_columns:
+        result[key] = []
+
+    n = len(time)
+    i = 0
+    for t, value in zip(times, values):
+        while i + 1 < n and time[i + 1] <= t:
+            i += 1
+        if i + 1 < n and time[i + 1] - t < t - time[i]:
+            j = i + 1
+        else:
+            j = i
+
+        for key in nearest_columns:
+            if value is None:
+                result[key].append(False if key == 'validity' else None)
+            else:
+                result[key].append(columns[key][j])
+
+    return result
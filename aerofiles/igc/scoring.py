@@ -0,0 +1,232 @@
+import collections
+
+from aerofiles.igc.columns import fix_timestamp
+from aerofiles.util import geo
+
+
+class TaskStatus(collections.namedtuple('TaskStatus', [
+        'time', 'achieved', 'leg', 'distance_remaining', 'speed',
+        'start_time', 'finish_time'])):
+    """
+    The progress of a pilot on a task after a fix.
+
+    ``achieved`` is the number of task points reached so far (the start
+    counts as the first one) and ``leg`` the number of the current leg,
+    ``0`` before the start and ``len(legs)`` after the finish.
+    ``distance_remaining`` is the distance in meters from the last fix
+    via the remaining task points to the finish. ``speed`` is the task
+    speed in m/s since the start, or ``None`` before the start.
+    """
+
+    __slots__ = ()
+
+    @property
+    def started(self):
+        return self.start_time is not None
+
+    @property
+    def finished(self):
+        return self.finish_time is not None
+
+
+class TaskScorer:
+    """
+    An incremental scorer of the progress on a racing task.
+
+    Fixes are fed one at a time and the current :class:`TaskStatus` is
+    returned after each of them. The task points are cylinders: the start
+    is taken when leaving the start cylinder (a later exit before reaching
+    the first turnpoint restarts the task), the turnpoints and the finish
+    are reached by a fix inside their cylinder. Each fix only takes a
+    constant amount of work, the distances of the remaining legs are
+    computed once.
+
+    Example:
+
+    .. sourcecode:: python
+
+        >>> scorer = TaskScorer.from_task(igc['task'][1])
+        >>> for fix in new_fixes:
+        ...     status = scorer.feed(fix)
+        >>> state = scorer.to_dict()  # e.g. stored as JSON
+        >>> scorer = TaskScorer.from_dict(state)
+
+    :param points: the ``(lat, lon)`` tuples of the start, the turnpoints
+        and the finish
+    :param radius: the turnpoint cylinder radius in meters
+    :param start_radius: the start cylinder radius in meters, defaults to
+        ``radius``
+    :param finish_radius: the finish cylinder radius in meters, defaults to
+        ``radius``
+    """
+
+    def __init__(self, points, radius=500., start_radius=None,
+                 finish_radius=None):
+        if len(points) < 2:
+            raise ValueError('A task needs at least a start and a finish')
+
+        self.points = [(float(lat), float(lon)) for lat, lon in points]
+        self.radius = radius
+        self.start_radius = radius if start_radius is None else start_radius
+        self.finish_radius = \
+            radius if finish_radius is None else finish_radius
+
+        # remaining[i] is the distance from point i to the finish
+        self.remaining = [0.] * len(self.points)
+        for i in range(len(self.points) - 2, -1, -1):
+            self.remaining[i] = self.remaining[i + 1] + geo.distance(
+                *(self.points[i] + self.points[i + 1]))
+
+        self.achieved = 0
+        self.inside_start = False
+        self.start_time = None
+        self.finish_time = None
+        self.point_times = []
+        self.last = None
+
+    @classmethod
+    def from_task(cls, task, **kwargs):
+        """
+        Create a scorer from the task declared in the C records, i.e.
+        ``igc['task'][1]`` of a :class:`~aerofiles.igc.Reader` result.
+
+        The takeoff and landing waypoints are ignored. Additional keyword
+        arguments are passed to :class:`TaskScorer`.
+        """
+        waypoints = task['waypoints']
+        if len(waypoints) == task.get('num_turnpoints', -1) + 4:
+            waypoints = waypoints[1:-1]
+        else:
+            waypoints = [
+                waypoint for waypoint in waypoints
+                if waypoint['latitude'] or waypoint['longitude']
+            ]
+
+        return cls([
+            (waypoint['latitude'], waypoint['longitude'])
+            for waypoint in waypoints
+        ], **kwargs)
+
+    @property
+    def legs(self):
+        return len(self.points) - 1
+
+    @property
+    def distance(self):
+        """
+        The task distance in meters between the centers of the points.
+        """
+        return self.remaining[0]
+
+    def feed(self, fix):
+        """
+        Process the next fix and return the :class:`TaskStatus`.
+
+        :param fix: a fix record as returned by :class:`~aerofiles.igc.Reader`,
+            with the coordinates in degrees
+        """
+        return self.feed_values(fix_timestamp(fix), fix['lat'], fix['lon'])
+
+    def feed_values(self, time, lat, lon):
+        """
+        Like :meth:`feed`, but takes the time (in seconds), latitude and
+        longitude of the fix directly.
+        """
+        self.last = (time, lat, lon)
+        if self.finish_time is not None:
+            return self.status()
+
+        if self.achieved <= 1:
+            inside = geo.distance(
+                lat, lon, *self.points[0]) <= self.start_radius
+            if self.inside_start and not inside:
+                self.achieved = 1
+                self.start_time = time
+                self.point_times = [time]
+            self.inside_start = inside
+
+        if self.achieved >= 1:
+            next_point = self.achieved
+            radius = self.finish_radius \
+                if next_point == self.legs else self.radius
+            if geo.distance(lat, lon, *self.points[next_point]) <= radius:
+                self.achieved += 1
+                self.point_times.append(time)
+                if self.achieved == len(self.points):
+                    self.finish_time = time
+
+        return self.status()
+
+    def status(self):
+        """
+        Return the :class:`TaskStatus` after the last fix.
+        """
+        if self.last is None:
+            return TaskStatus(
+                None, 0, 0, self.distance, None, None, None)
+
+        time, lat, lon = self.last
+        if self.finish_time is not None:
+            return TaskStatus(
+                time, self.achieved, self.legs, 0., self.speed(0.),
+                self.start_time, self.finish_time)
+
+        next_point = max(self.achieved, 1)
+        distance_remaining = self.remaining[next_point] + geo.distance(
+            lat, lon, *self.points[next_point])
+        if self.achieved == 0:
+            distance_remaining = self.distance
+
+        return TaskStatus(
+            time, self.achieved, self.achieved, distance_remaining,
+            self.speed(distance_remaining), self.start_time, None)
+
+    def speed(self, distance_remaining):
+        if self.start_time is None:
+            return None
+
+        end_time = self.finish_time
+        if end_time is None:
+            end_time = self.last[0]
+
+        duration = end_time - self.start_time
+        if duration <= 0:
+            return 0.
+
+        return max(0., self.distance - distance_remaining) / duration
+
+    def to_dict(self):
+        """
+        Return the task and the progress as a dictionary, e.g. for JSON.
+        """
+        return {
+            'points': [list(point) for point in self.points],
+            'radius': self.radius,
+            'start_radius': self.start_radius,
+            'finish_radius': self.finish_radius,
+            'achieved': self.achieved,
+            'inside_start': self.inside_start,
+            'start_time': self.start_time,
+            'finish_time': self.finish_time,
+            'point_times': list(self.point_times),
+            'last': None if self.last is None else list(self.last),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Create a scorer from the result of :meth:`to_dict`, feeding the
+        following fixes continues where the original scorer stopped.
+        """
+        scorer = cls(
+            data['points'], radius=data['radius'],
+            start_radius=data['start_radius'],
+            finish_radius=data['finish_radius'])
+        scorer.achieved = data['achieved']
+        scorer.inside_start = data['inside_start']
+        scorer.start_time = data['start_time']
+        scorer.finish_time = data['finish_time']
+        scorer.point_times = list(data['point_times'])
+        if data['last'] is not None:
+            scorer.last = tuple(data['last'])
+        return scorer
@@ -0,0 +1,253 @@
+import bisect
+import calendar
+import datetime
+import re
+
+from aerofiles.igc.columns import to_timestamp
+from aerofiles.igc.reader import LowLevelReader, Reader
+from aerofiles.util.timezone import TimeZoneFix
+
+# The ``HHMMSS`` time of day of a B record after a line break
+FIX_TIME = re.compile(br'\nB(\d{6})')
+
+
+def read_fixes_between(file_obj, start, end, skip_duplicates=False,
+                       encoding='utf-8', integer_coordinates=False):
+    """
+    Read only the fixes between ``start`` and ``end`` (inclusive) of a
+    flight without parsing the whole file::
+
+        with open('track.igc', 'rb') as f:
+            fixes = read_fixes_between(f, event - delta, event + delta)
+
+    The B records are ordered by time, so the first fix of the window is
+    found by bisecting over the byte offsets of the file. After every jump
+    the reader resynchronizes to the start of the next B record and compares
+    its time, which needs ``O(log n)`` reads. Only the headers before the
+    first fix and the B records in the window are decoded.
+
+    The dates of the fixes are derived from the ``HFDTE`` header like in
+    :class:`~aerofiles.igc.Reader`: a fix with a time of day before the
+    previous fix is on the next day. To know the date at any offset, the
+    file is scanned once for these day rollovers, which only matches the
+    times of the B records with a regular expression and is much faster
+    than decoding them. To read several windows of a file use
+    :class:`~aerofiles.igc.replay.FixFileSource`, which scans it only once.
+
+    :param file_obj: a seekable file object opened in binary mode or a
+        :class:`mmap.mmap`
+    :param start: the start of the window as ``datetime`` (naive values are
+        UTC) or as seconds since the Unix epoch
+    :param end: the end of the window, like ``start``
+    :param skip_duplicates: see :class:`~aerofiles.igc.Reader`
+    :param encoding: the encoding used to decode the lines
+    :param integer_coordinates: see :class:`~aerofiles.igc.Reader`
+    :return: a list of fix records like ``fix_records`` of
+        :meth:`aerofiles.igc.Reader.read`
+    """
+    flight = _read_start(file_obj, encoding)
+    if flight is None:
+        return []
+
+    return _read_window(
+        file_obj, flight, to_timestamp(start), to_timestamp(end),
+        skip_duplicates, encoding, integer_coordinates)
+
+
+def _read_window(file_obj, flight, start, end, skip_duplicates=False,
+                 encoding='utf-8', integer_coordinates=False):
+    """
+    Like :func:`read_fixes_between` with the result of :func:`_read_start`
+    and ``start`` and ``end`` as timestamps.
+    """
+    header, extensions, first_fix, rollovers, timestamp = flight
+
+    file_obj.seek(0, 2)
+    low, high = first_fix, file_obj.tell()
+    while low < high:
+        middle = (low + high) // 2
+        position, line = _next_fix_line(file_obj, middle)
+        if line is None or timestamp(position, line) >= start:
+            high = middle
+        else:
+            low = position + 1
+
+    fixes = []
+    position, line = _next_fix_line(file_obj, low)
+    if line is None:
+        return fixes
+
+    date = header['utc_date'] + datetime.timedelta(
+        days=bisect.bisect_right(rollovers, position))
+
+    timezone = None
+    if 'time_zone_offset' in header:
+        timezone = TimeZoneFix(header['time_zone_offset'])
+
+    while line:
+        if line[0:1] == b'B':
+            try:
+                if timestamp(position, line) > end:
+                    break
+
+                fix = LowLevelReader.process_B_record(
+                    LowLevelReader.decode_B_record(
+                        line.decode(encoding, 'replace'),
+                        integer_coordinates=integer_coordinates),
+                    extensions)
+            except ValueError:
+                position, line = file_obj.tell(), file_obj.readline()
+                continue
+
+            if fixes:
+                previous = fixes[-1]['datetime']
+                if fix['time'] < previous.time():
+                    date = date + datetime.timedelta(days=1)
+                if fix['time'] == previous.time() and skip_duplicates:
+                    position, line = file_obj.tell(), file_obj.readline()
+                    continue
+
+            fix['datetime'] = datetime.datetime.combine(
+                date, fix['time']).replace(tzinfo=TimeZoneFix(0))
+            if timezone is not None:
+                fix['datetime_local'] = fix['datetime'].astimezone(timezone)
+
+            fixes.append(fix)
+
+        position, line = file_obj.tell(), file_obj.readline()
+
+    return fixes
+
+
+def read_time_range(file_obj, encoding='utf-8'):
+    """
+    Return the timestamps of the first and the last fix of a flight as
+    seconds since the Unix epoch, or ``None`` if it has no fixes. Only the
+    headers and the B records at the start and the end of the file are
+    decoded, the days are counted like in :func:`read_fixes_between`. The
+    file requirements are the same as for :func:`read_fixes_between`.
+    """
+    flight = _read_start(file_obj, encoding)
+    if flight is None:
+        return None
+
+    return _time_range(file_obj, flight)
+
+
+def _time_range(file_obj, flight):
+    """
+    Like :func:`read_time_range` with the result of :func:`_read_start`.
+    """
+    first_fix, timestamp = flight[2], flight[4]
+    file_obj.seek(0, 2)
+    size = file_obj.tell()
+
+    # search backwards for the last B record in growing steps
+    step = 4096
+    while True:
+        offset = max(first_fix, size - step)
+        position, line = _next_fix_line(file_obj, offset)
+        if line is not None:
+            last = position, line
+            while line:
+                if line[0:1] == b'B':
+                    try:
+                        _time_of_day(line)
+                        last = position, line
+                    except ValueError:
+                        pass
+                position, line = file_obj.tell(), file_obj.readline()
+
+            file_obj.seek(first_fix)
+            return timestamp(first_fix, file_obj.readline()), timestamp(*last)
+
+        step *= 2
+
+
+def _read_start(file_obj, encoding):
+    """
+    Decode the headers of a flight and return them with the fix extensions,
+    the offset of the first fix, the :func:`_day_rollovers` and a function
+    converting the offset and content of a B record to its timestamp, or
+    ``None`` if the flight has no fixes.
+    """
+    file_obj.seek(0)
+    header_lines = []
+    while True:
+        position = file_obj.tell()
+        line = file_obj.readline()
+        if not line or line[0:1] == b'B':
+            break
+        if line[0:1] in (b'H', b'I'):
+            header_lines.append(line.decode(encoding, 'replace'))
+
+    first_fix, line = _next_fix_line(file_obj, position)
+    if line is None:
+        return None
+
+    result = Reader().read(header_lines)
+    header = result['header'][1]
+    extensions = result['fix_record_extensions'][1]
+    if not header.get('utc_date'):
+        raise ValueError('Flight has no HFDTE header')
+
+    rollovers = _day_rollovers(file_obj, first_fix)
+    midnight = calendar.timegm(header['utc_date'].timetuple())
+
+    def timestamp(position, line):
+        days = bisect.bisect_right(rollovers, position)
+        return midnight + days * 86400 + _time_of_day(line)
+
+    return header, extensions, first_fix, rollovers, timestamp
+
+
+def _day_rollovers(file_obj, first_fix):
+    """
+    Return the sorted offsets of the B records whose time of day is before
+    the time of the previous B record, i.e. which start a new day.
+    """
+    file_obj.seek(first_fix)
+    # the line break before the first fix
+    data = b'\n' + file_obj.read()
+
+    rollovers = []
+    previous = None
+    for match in FIX_TIME.finditer(data):
+        # zero padded times compare like numbers
+        time = match.group(1)
+        if previous is not None and time < previous:
+            rollovers.append(first_fix + match.start())
+        previous = time
+
+    return rollovers
+
+
+def _time_of_day(line):
+    return int(line[1:3]) * 3600 + int(line[3:5]) * 60 + int(line[5:7])
+
+
+def _next_fix_line(file_obj, offset):
+    """
+    Return the offset and content of the first valid B record which starts
+    at or after ``offset`` or ``(None, None)`` at the end of the file.
+    """
+    if offset > 0:
+        file_obj.seek(offset - 1)
+        if file_obj.read(1) != b'\n':
+            file_obj.readline()
+    else:
+        file_obj.seek(0)
+
+    while True:
+        position = file_obj.tell()
+        line = file_obj.readline()
+        if not line:
+            return None, None
+
+        if line[0:1] == b'B':
+            try:
+                _time_of_day(line)
+            except ValueError:
+                continue
+
+            return position, line
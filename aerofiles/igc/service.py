@@ -0,0 +1,495 @@
+"""
+An optional asyncio based IGC ingestion service.
+
+Uploaded IGC files are queued, parsed with :class:`aerofiles.igc.Reader` in
+a process pool and answered with a JSON summary of the flight. The service
+only uses the Python standard library and speaks a minimal subset of
+HTTP/1.1::
+
+    $ python -m aerofiles.igc.service serve --port 8080
+    $ curl --data-binary @track.igc http://localhost:8080/
+
+The ``bench`` command is a load generator which uploads files concurrently
+and reports the throughput and latency percentiles::
+
+    $ python -m aerofiles.igc.service bench http://localhost:8080/ track.igc
+
+This module requires Python 3.7 or newer and is not imported by
+:mod:`aerofiles.igc`.
+"""
+
+import argparse
+import asyncio
+import concurrent.futures
+import io
+import json
+import sys
+import time
+import urllib.parse
+
+from aerofiles.igc.aggregators import (
+    AltitudeRange, BoundingBox, FixCount, FixTimes,
+)
+from aerofiles.igc.dedupe import fingerprint
+from aerofiles.igc.reader import Reader
+
+
+STATUS_REASONS = {
+    200: 'OK',
+    400: 'Bad Request',
+    404: 'Not Found',
+    405: 'Method Not Allowed',
+    411: 'Length Required',
+    413: 'Payload Too Large',
+    500: 'Internal Server Error',
+    503: 'Service Unavailable',
+}
+
+
+def summarize(data, encoding='utf-8'):
+    """
+    Parse an IGC file and return a JSON serialisable summary of the flight.
+
+    :param data: the content of the IGC file as ``bytes``
+    """
+    text = data.decode(encoding, 'replace')
+    result = Reader().read(io.StringIO(text), aggregators=[
+        BoundingBox(), AltitudeRange(), FixTimes(), FixCount(),
+    ], store_fixes=False)
+    header = result['header'][1]
+    aggregates = result.pop('aggregates')[1]
+
+    summary = {
+        'fingerprint': fingerprint(io.BytesIO(data)),
+        'logger_id': result['logger_id'][1],
+        'pilot': header.get('pilot'),
+        'glider_model': header.get('glider_model'),
+        'glider_registration': header.get('glider_registration'),
+        'competition_id': header.get('competition_id'),
+        'date': header['utc_date'].isoformat() if header.get('utc_date') else None,
+        'num_fixes': aggregates['num_fixes'],
+        'errors': sorted(key for key, value in result.items() if value[0]),
+    }
+
+    if aggregates['num_fixes']:
+        first, last = aggregates['fix_times']
+        summary.update({
+            'first_fix': first.isoformat(),
+            'last_fix': last.isoformat(),
+            'duration': int((last - first).total_seconds()),
+            'bbox': list(aggregates['bbox']),
+            'min_gps_alt': aggregates['gps_alt_range'][0],
+            'max_gps_alt': aggregates['gps_alt_range'][1],
+        })
+
+    return summary
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message=None):
+        super().__init__(message or STATUS_REASONS[status])
+        self.status = status
+
+
+class ParseError(Exception):
+    """
+    Raised by the workers if an upload can not be summarized.
+    """
+
+
+def _summarize(data):
+    try:
+        return summarize(data)
+    except Exception as e:
+        raise ParseError(str(e))
+
+
+class IngestionService:
+    """
+    An asyncio IGC upload service with a bounded queue and worker pool.
+
+    ``POST`` requests to ``/`` with an IGC file as body are answered with the
+    :func:`summarize` result as JSON. At most ``queue_size`` uploads wait
+    for one of the ``workers``; further uploads are rejected with ``503``
+    until the queue drains again. Parsing happens in ``executor``, which
+    defaults to a process pool with ``workers`` processes, so that the event
+    loop is never blocked.
+
+    Example:
+
+    .. sourcecode:: python
+
+        async def main():
+            service = IngestionService(workers=4)
+            await service.start('127.0.0.1', 8080)
+            await service.serve_forever()
+
+    :param workers: the number of uploads parsed concurrently
+    :param queue_size: the maximum number of uploads waiting to be parsed
+    :param max_upload_size: the maximum size of an upload in bytes
+    :param executor: a :class:`concurrent.futures.Executor` for parsing
+    :param on_summary: an optional callback (function or coroutine function)
+        that is called with every summary, e.g. to store it
+    """
+
+    def __init__(self, workers=4, queue_size=64, max_upload_size=32 << 20,
+                 executor=None, on_summary=None):
+        self.workers = workers
+        self.queue_size = queue_size
+        self.max_upload_size = max_upload_size
+        self.executor = executor
+        self.owns_executor = executor is None
+        self.on_summary = on_summary
+
+        self.queue = None
+        self.server = None
+        self.worker_tasks = []
+        # the connection handler tasks, mapped to ``True`` while they wait
+        # for the next request
+        self.connections = {}
+        self.closing = False
+
+    @property
+    def port(self):
+        """
+        The port the service is listening on.
+        """
+        return self.server.sockets[0].getsockname()[1]
+
+    async def start(self, host='127.0.0.1', port=0):
+        """
+        Start the workers and listen on the given address. Use port ``0`` to
+        pick a free port, see :attr:`port`.
+        """
+        if self.executor is None:
+            self.executor = concurrent.futures.ProcessPoolExecutor(self.workers)
+
+        self.queue = asyncio.Queue(self.queue_size)
+        self.worker_tasks = [
+            asyncio.ensure_future(self.work()) for _ in range(self.workers)
+        ]
+        self.server = await asyncio.start_server(self.handle, host, port)
+
+    async def serve_forever(self):
+        async with self.server:
+            await self.server.serve_forever()
+
+    async def close(self):
+        """
+        Stop accepting connections, cancel the workers and shut down the
+        executor if it was created by the service.
+
+        Uploads which are queued or being parsed are answered with ``503``,
+        idle keep-alive connections are closed.
+        """
+        self.closing = True
+        if self.server is not None:
+            self.server.close()
+
+        for task in self.worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self.worker_tasks, return_exceptions=True)
+        self.worker_tasks = []
+
+        if self.queue is not None:
+            while not self.queue.empty():
+                _, future = self.queue.get_nowait()
+                if not future.done():
+                    future.set_exception(
+                        HTTPError(503, 'Service is shutting down'))
+
+        # the other handlers finish after answering their current request
+        for task, idle in self.connections.items():
+            if idle:
+                task.cancel()
+        await asyncio.gather(*self.connections, return_exceptions=True)
+
+        if self.server is not None:
+            await self.server.wait_closed()
+
+        if self.owns_executor and self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+
+    async def work(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            data, future = await self.queue.get()
+            try:
+                summary = await loop.run_in_executor(
+                    self.executor, _summarize, data)
+                if self.on_summary is not None:
+                    result = self.on_summary(summary)
+                    if asyncio.iscoroutine(result):
+                        await result
+            except asyncio.CancelledError:
+                if not future.done():
+                    future.set_exception(
+                        HTTPError(503, 'Service is shutting down'))
+                raise
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+            else:
+                if not future.done():
+                    future.set_result(summary)
+            finally:
+                self.queue.task_done()
+
+    async def submit(self, data):
+        """
+        Queue an upload and wait for its summary. Raises :class:`HTTPError`
+        with status ``503`` if the queue is full.
+        """
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self.queue.put_nowait((data, future))
+        except asyncio.QueueFull:
+            raise HTTPError(503, 'Upload queue is full')
+
+        return await future
+
+    async def handle(self, reader, writer):
+        task = asyncio.current_task()
+        try:
+            while not self.closing:
+                self.connections[task] = True
+                request = await read_request(reader, self.max_upload_size)
+                self.connections[task] = False
+                if request is None:
+                    break
+
+                method, path, headers, body = request
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                try:
+                    status, payload = 200, await self.dispatch(method, path, body)
+                except HTTPError as e:
+                    status, payload = e.status, {'error': str(e)}
+                except ParseError as e:
+                    status, payload = 400, {'error': 'Invalid IGC file: %s' % e}
+                except Exception:
+                    # e.g. a broken worker pool or a failing on_summary
+                    status, payload = 500, {'error': STATUS_REASONS[500]}
+
+                keep_alive = keep_alive and not self.closing
+                write_response(writer, status, payload, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except HTTPError as e:
+            write_response(writer, e.status, {'error': str(e)}, False)
+            await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        except asyncio.CancelledError:
+            # an idle connection closed by close()
+            pass
+        finally:
+            self.connections.pop(task, None)
+            writer.close()
+
+    async def dispatch(self, method, path, body):
+        if path != '/':
+            raise HTTPError(404)
+        if method != 'POST':
+            raise HTTPError(405)
+
+        return await self.submit(body)
+
+
+async def read_request(reader, max_body_size):
+    """
+    Read one HTTP request and return ``(method, path, headers, body)`` or
+    ``None`` if the connection was closed.
+    """
+    line = await reader.readline()
+    if not line:
+        return None
+
+    try:
+        method, path, _ = line.decode('latin-1').split(' ', 2)
+    except ValueError:
+        raise HTTPError(400)
+
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+
+    body = b''
+    if method in ('POST', 'PUT'):
+        if 'content-length' not in headers:
+            raise HTTPError(411)
+        try:
+            length = int(headers['content-length'])
+            if length < 0:
+                raise ValueError(length)
+        except ValueError:
+            raise HTTPError(400, 'Invalid Content-Length')
+        if length > max_body_size:
+            raise HTTPError(413)
+        body = await reader.readexactly(length)
+
+    return method, path, headers, body
+
+
+def write_response(writer, status, payload, keep_alive=True):
+    body = json.dumps(payload).encode('utf-8')
+    writer.write((
+        'HTTP/1.1 %d %s\r\n'
+        'Content-Type: application/json\r\n'
+        'Content-Length: %d\r\n'
+        'Connection: %s\r\n'
+        '\r\n' % (status, STATUS_REASONS[status], len(body),
+                  'keep-alive' if keep_alive else 'close')
+    ).encode('latin-1') + body)
+
+
+async def post(reader, writer, host, path, body):
+    """
+    Send a POST request over an open keep-alive connection and return
+    ``(status, payload)``.
+    """
+    writer.write((
+        'POST %s HTTP/1.1\r\n'
+        'Host: %s\r\n'
+        'Content-Type: application/octet-stream\r\n'
+        'Content-Length: %d\r\n'
+        '\r\n' % (path, host, len(body))
+    ).encode('latin-1') + body)
+    await writer.drain()
+
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError('Connection closed by server')
+    status = int(status_line.split()[1])
+
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        if name.strip().lower() == 'content-length':
+            length = int(value)
+
+    return status, json.loads((await reader.readexactly(length)).decode('utf-8'))
+
+
+def percentile(values, fraction):
+    """
+    Return the nearest-rank percentile of a sorted list.
+    """
+    if not values:
+        return None
+    index = min(len(values) - 1, max(0, int(round(fraction * len(values))) - 1))
+    return values[index]
+
+
+async def run_load(url, files, requests=100, concurrency=10):
+    """
+    Upload files to a running service and measure the performance.
+
+    :param url: the URL of the service, e.g. ``http://127.0.0.1:8080/``
+    :param files: a list of IGC file contents (``bytes``), which are
+        uploaded round-robin
+    :param requests: the total number of uploads
+    :param concurrency: the number of concurrent connections
+    :return: a dictionary with the number of ``requests``, ``errors``
+        (non-200 responses), the throughput in ``requests_per_second`` and the
+        latencies ``p50``, ``p90``, ``p99`` and ``max`` in seconds
+    """
+    url = urllib.parse.urlsplit(url)
+    host = url.hostname
+    port = url.port or 80
+    path = url.path or '/'
+
+    latencies = []
+    statuses = []
+    counter = iter(range(requests))
+
+    async def client():
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            for i in counter:
+                started = time.perf_counter()
+                status, _ = await post(
+                    reader, writer, host, path, files[i % len(files)])
+                latencies.append(time.perf_counter() - started)
+                statuses.append(status)
+        finally:
+            writer.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*[client() for _ in range(concurrency)])
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        'requests': len(statuses),
+        'errors': sum(1 for status in statuses if status != 200),
+        'requests_per_second': len(statuses) / elapsed if elapsed else None,
+        'p50': percentile(latencies, 0.5),
+        'p90': percentile(latencies, 0.9),
+        'p99': percentile(latencies, 0.99),
+        'max': latencies[-1] if latencies else None,
+    }
+
+
+async def _serve(args):
+    service = IngestionService(
+        workers=args.workers, queue_size=args.queue_size)
+    await service.start(args.host, args.port)
+    print('Listening on http://%s:%d/' % (args.host, service.port))
+    try:
+        await service.serve_forever()
+    finally:
+        await service.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m aerofiles.igc.service',
+        description='IGC ingestion service and load generator')
+    commands = parser.add_subparsers(dest='command')
+    commands.required = True
+
+    serve = commands.add_parser('serve', help='run the ingestion service')
+    serve.add_argument('--host', default='127.0.0.1')
+    serve.add_argument('--port', type=int, default=8080)
+    serve.add_argument('--workers', type=int, default=4)
+    serve.add_argument('--queue-size', type=int, default=64)
+
+    bench = commands.add_parser('bench', help='run the load generator')
+    bench.add_argument('url')
+    bench.add_argument('files', nargs='+')
+    bench.add_argument('--requests', type=int, default=1000)
+    bench.add_argument('--concurrency', type=int, default=16)
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'serve':
+        try:
+            asyncio.run(_serve(args))
+        except KeyboardInterrupt:
+            pass
+        return
+
+    files = []
+    for filename in args.files:
+        with open(filename, 'rb') as f:
+            files.append(f.read())
+
+    stats = asyncio.run(run_load(
+        args.url, files, requests=args.requests, concurrency=args.concurrency))
+    print('requests:    %d (%d errors)' % (stats['requests'], stats['errors']))
+    print('throughput:  %.1f requests/s' % stats['requests_per_second'])
+    for key in ('p50', 'p90', 'p99', 'max'):
+        print('latency %-4s %.1f ms' % (key + ':', stats[key] * 1000))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,256 @@
+import multiprocessing
+
+from aerofiles.igc.columns import fix_columns, import_numpy
+from aerofiles.igc.reader import Reader
+
+try:
+    from multiprocessing import resource_tracker, shared_memory  # novermin
+except ImportError:
+    resource_tracker = shared_memory = None
+
+
+# The columns are aligned to this many bytes in the shared memory block.
+ALIGNMENT = 8
+
+
+class SharedColumns:
+    """
+    A handle to fix columns in a :mod:`multiprocessing.shared_memory` block.
+
+    The handle only contains the name of the block and the layout of the
+    columns, so it is cheap to pickle. :meth:`open` maps the block and
+    returns the columns as NumPy arrays without copying them. The block
+    exists until :meth:`unlink` is called, by any process.
+
+    :param name: the name of the shared memory block
+    :param size: the size of the block in bytes
+    :param layout: a list of ``(column, dtype, offset, length)`` tuples
+    """
+
+    def __init__(self, name, size, layout):
+        self.name = name
+        self.size = size
+        self.layout = layout
+        self._memory = None
+
+    @classmethod
+    def create(cls, columns):
+        """
+        Copy a dictionary of NumPy arrays into a new shared memory block and
+        return its handle. The block is not mapped in the calling process
+        afterwards.
+        """
+        numpy = import_numpy()
+        layout = []
+        size = 0
+        for name, values in sorted(columns.items()):
+            values = numpy.ascontiguousarray(values)
+            layout.append((name, values.dtype.str, size, len(values)))
+            size += -(-values.nbytes // ALIGNMENT) * ALIGNMENT
+
+        # blocks can not be empty
+        memory = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        try:
+            for name, dtype, offset, length in layout:
+                array = numpy.ndarray(
+                    length, dtype=dtype, buffer=memory.buf, offset=offset)
+                array[:] = columns[name]
+                del array
+        except Exception:
+            memory.close()
+            memory.unlink()
+            raise
+
+        memory.close()
+        return cls(memory.name, size, layout)
+
+    def __getstate__(self):
+        return self.name, self.size, self.layout
+
+    def __setstate__(self, state):
+        self.__init__(*state)
+
+    def open(self):
+        """
+        Map the block and return the columns as a dictionary of NumPy arrays
+        backed by the shared memory.
+        """
+        numpy = import_numpy()
+        if self._memory is None:
+            self._memory = shared_memory.SharedMemory(self.name)
+
+        buffer = self._memory.buf
+        return dict(
+            (name, numpy.ndarray(
+                length, dtype=dtype, buffer=buffer, offset=offset))
+            for name, dtype, offset, length in self.layout)
+
+    def close(self):
+        """
+        Unmap the block in this process. If arrays returned by :meth:`open`
+        are still referenced, the mapping is released when they are garbage
+        collected.
+        """
+        if self._memory is not None:
+            try:
+                self._memory.close()
+            except BufferError:
+                pass
+            self._memory = None
+
+    def unlink(self):
+        """
+        Unmap and destroy the block. Arrays that are still referenced stay
+        valid until they are garbage collected. Calling this more than once
+        is safe.
+        """
+        try:
+            if self._memory is None:
+                self._memory = shared_memory.SharedMemory(self.name)
+            self._memory.unlink()
+        except OSError:
+            # already destroyed
+            pass
+        finally:
+            self.close()
+
+
+class SharedFlight:
+    """
+    A flight parsed by :func:`read_shared`.
+
+    ``result`` is the result of :meth:`aerofiles.igc.Reader.read` without
+    the fix records (``result['fix_records'][1]`` is ``None``, the errors
+    are kept), :attr:`columns` are the fix columns like
+    :func:`~aerofiles.igc.columns.fix_columns` in shared memory.
+    """
+
+    def __init__(self, path, result, handle):
+        self.path = path
+        self.result = result
+        self.handle = handle
+        self._columns = None
+
+    @property
+    def columns(self):
+        if self._columns is None:
+            self._columns = self.handle.open()
+        return self._columns
+
+    def __getitem__(self, key):
+        return self.result[key]
+
+    def close(self):
+        """
+        Release the columns and destroy their shared memory block.
+        """
+        self._columns = None
+        self.handle.unlink()
+
+
+class SharedFlights(list):
+    """
+    A list of :class:`SharedFlight` objects that destroys the shared memory
+    blocks of all flights on :meth:`close` or at the end of a ``with``
+    block.
+    """
+
+    def close(self):
+        for flight in self:
+            flight.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def _read_to_shared_memory(args):
+    path, kwargs = args
+    result = Reader(**kwargs).read_path(path)
+    columns = fix_columns(result['fix_records'][1])
+    result['fix_records'] = [result['fix_records'][0], None]
+
+    # nothing can fail after the block is created, create() destroys it
+    # if copying the columns fails
+    return path, result, SharedColumns.create(columns)
+
+
+def read_shared(paths, workers=None, pool=None, **kwargs):
+    """
+    Parse many IGC files in a process pool and pass their fix columns back
+    through shared memory::
+
+        with read_shared(paths, workers=8) as flights:
+            for flight in flights:
+                print(flight['header'][1]['pilot'],
+                      flight.columns['gps_alt'].max())
+
+    Returning the list of fix records of a flight from a worker process
+    means pickling a dictionary per fix, which takes about as long as
+    parsing the file. Instead, every worker writes the typed fix columns of
+    a flight into a :mod:`multiprocessing.shared_memory` block and only
+    returns a small :class:`SharedColumns` handle together with the other,
+    small sections of the result. The parent maps the blocks as NumPy
+    arrays without copying.
+
+    The blocks are destroyed by :meth:`SharedFlights.close` (or the
+    ``with`` block). If parsing one of the files fails, the blocks of all
+    other files are destroyed before the error is raised. Requires NumPy
+    and Python 3.8 or newer.
+
+    :param paths: a list of IGC file paths
+    :param workers: the number of worker processes (default: number of
+        CPUs)
+    :param pool: a :class:`multiprocessing.pool.Pool` to use instead of
+        creating a new one. It must be created after
+        ``multiprocessing.resource_tracker.ensure_running()`` was called.
+    :param kwargs: passed to :class:`~aerofiles.igc.Reader`
+    :return: a :class:`SharedFlights` list in the order of ``paths``
+    """
+    numpy = import_numpy()
+    if numpy is None or shared_memory is None:
+        raise ImportError(
+            'read_shared() requires NumPy and multiprocessing.shared_memory')
+
+    jobs = [(path, kwargs) for path in paths]
+    own_pool = None
+    if pool is None and workers != 1 and len(jobs) > 1:
+        # the workers must share the resource tracker of this process, or
+        # their trackers destroy the blocks when the workers exit
+        resource_tracker.ensure_running()
+        pool = own_pool = multiprocessing.Pool(workers)
+
+    flights = SharedFlights()
+    error = None
+    try:
+        if pool is None:
+            results = (_read_to_shared_memory(job) for job in jobs)
+        else:
+            results = pool.imap(_read_to_shared_memory, jobs)
+
+        # collect all results, also after an error, to clean them up
+        while True:
+            try:
+                path, result, handle = next(results)
+            except StopIteration:
+                break
+            except Exception as e:
+                if error is None:
+                    error = e
+                if pool is None:
+                    break
+                continue
+
+            flights.append(SharedFlight(path, result, handle))
+    finally:
+        if own_pool is not None:
+            own_pool.close()
+            own_pool.join()
+
+    if error is not None:
+        flights.close()
+        raise error
+
+    return flights
@@ -0,0 +1,210 @@
+import collections
+import math
+
+from aerofiles.igc.columns import fix_columns, import_numpy, scalar
+from aerofiles.igc.phases import CIRCLING, segment_phases
+from aerofiles.util import geo
+
+
+class Thermal(collections.namedtuple('Thermal', [
+        'start_time', 'end_time', 'start_index', 'end_index', 'direction',
+        'altitude_gain', 'climb_rate', 'lat', 'lon', 'drift',
+        'wind_speed', 'wind_direction', 'airspeed'])):
+    """
+    A thermal, i.e. a circling phase of a flight.
+
+    The times and indexes are the same as for
+    :class:`~aerofiles.igc.phases.Phase`. ``altitude_gain`` is in meters and
+    ``climb_rate`` in m/s. ``lat`` and ``lon`` are the mean position and
+    ``drift`` is the ``(east, north)`` velocity of the thermal in m/s.
+
+    The wind is estimated from the ground speed vectors while circling,
+    which lie on a circle around the wind vector with the airspeed as
+    radius. ``wind_speed`` and ``airspeed`` are in m/s and
+    ``wind_direction`` is the direction the wind is blowing from in degrees.
+    The wind fields are ``None`` if the fit was not possible.
+    """
+
+    __slots__ = ()
+
+    @property
+    def duration(self):
+        return self.end_time - self.start_time
+
+
+def fit_circle(xs, ys):
+    """
+    Fit a circle through the given points with an algebraic least-squares
+    fit and return ``(center_x, center_y, radius)`` or ``None`` if the
+    points are degenerate. Works on lists and on NumPy arrays.
+    """
+    numpy = import_numpy()
+    n = len(xs)
+    if n < 3:
+        return None
+
+    if numpy is not None:
+        xs = numpy.asarray(xs, dtype=numpy.float64)
+        ys = numpy.asarray(ys, dtype=numpy.float64)
+        zs = xs * xs + ys * ys
+        sums = [float(value.sum()) for value in (
+            xs, ys, xs * xs, xs * ys, ys * ys, xs * zs, ys * zs, zs)]
+    else:
+        zs = [x * x + y * y for x, y in zip(xs, ys)]
+        sums = [
+            sum(xs), sum(ys),
+            sum(x * x for x in xs),
+            sum(x * y for x, y in zip(xs, ys)),
+            sum(y * y for y in ys),
+            sum(x * z for x, z in zip(xs, zs)),
+            sum(y * z for y, z in zip(ys, zs)),
+            sum(zs),
+        ]
+
+    sx, sy, sxx, sxy, syy, sxz, syz, sz = sums
+
+    # normal equations of x * D + y * E + F = -(x^2 + y^2)
+    a = [[sxx, sxy, sx], [sxy, syy, sy], [sx, sy, n]]
+    b = [-sxz, -syz, -sz]
+
+    determinant = _det3(a)
+    if abs(determinant) < 1e-12 * max(1., abs(sxx * syy * n)):
+        return None
+
+    d, e, f = [
+        _det3([[b[i] if j == k else a[i][j] for j in range(3)]
+               for i in range(3)]) / determinant
+        for k in range(3)
+    ]
+
+    center_x = -d / 2.
+    center_y = -e / 2.
+    radius_squared = center_x * center_x + center_y * center_y - f
+    if radius_squared <= 0:
+        return None
+
+    return center_x, center_y, math.sqrt(radius_squared)
+
+
+def _det3(m):
+    return (m[0][0] * (m[1][1] * m[2][2] - m[1][2] * m[2][1]) -
+            m[0][1] * (m[1][0] * m[2][2] - m[1][2] * m[2][0]) +
+            m[0][2] * (m[1][0] * m[2][1] - m[1][1] * m[2][0]))
+
+
+def _slope(ts, values):
+    """
+    Return the least-squares slope of ``values`` over ``ts``.
+    """
+    n = len(ts)
+    mean_t = sum(ts) / float(n)
+    mean_v = sum(values) / float(n)
+    numerator = sum((t - mean_t) * (v - mean_v) for t, v in zip(ts, values))
+    denominator = sum((t - mean_t) ** 2 for t in ts)
+    return numerator / denominator if denominator else 0.
+
+
+def detect_thermals(fixes, altitude='pressure_alt', **kwargs):
+    """
+    Find the thermals of a flight and estimate the wind in each of them::
+
+        for thermal in detect_thermals(igc['fix_records'][1]):
+            print(thermal.climb_rate, thermal.wind_speed)
+
+    The thermals are the circling phases found by
+    :func:`~aerofiles.igc.phases.segment_phases`, which takes the same
+    keyword arguments. If NumPy is installed the velocities and fits are
+    computed in a vectorized way.
+
+    :param fixes: a list of fix records
+    :param altitude: the fix altitude to use (``pressure_alt`` or
+        ``gps_alt``)
+    :return: a list of :class:`Thermal` tuples
+    """
+    columns = fix_columns(fixes, extensions=[])
+    phases = [
+        phase for phase in segment_phases(fixes, **kwargs)
+        if phase.type == CIRCLING
+    ]
+    return thermals_from_columns(
+        phases, columns['time'], columns['lat'], columns['lon'],
+        columns[altitude])
+
+
+def thermals_from_columns(phases, time, lat, lon, alt):
+    """
+    Column based version of :func:`detect_thermals` taking the circling
+    phases and the fix columns.
+    """
+    numpy = import_numpy()
+    if not phases:
+        return []
+
+    # local equirectangular projection in meters
+    y_scale = math.radians(geo.EARTH_RADIUS)
+
+    if numpy is not None:
+        x_scale = y_scale * math.cos(math.radians(float(numpy.mean(lat))))
+        time = numpy.asarray(time, dtype=numpy.float64)
+        x = numpy.asarray(lon, dtype=numpy.float64) * x_scale
+        y = numpy.asarray(lat, dtype=numpy.float64) * y_scale
+        dt = numpy.diff(time)
+        dt[dt <= 0] = numpy.nan
+        vx = numpy.diff(x) / dt
+        vy = numpy.diff(y) / dt
+    else:
+        x_scale = y_scale * math.cos(math.radians(sum(lat) / len(lat)))
+        x = [value * x_scale for value in lon]
+        y = [value * y_scale for value in lat]
+        vx = []
+        vy = []
+        for i in range(len(time) - 1):
+            dt = time[i + 1] - time[i]
+            vx.append((x[i + 1] - x[i]) / dt if dt > 0 else None)
+            vy.append((y[i + 1] - y[i]) / dt if dt > 0 else None)
+
+    thermals = []
+    for phase in phases:
+        start = phase.start_index
+        end = min(phase.end_index, len(time) - 1)
+
+        ts = time[start:end + 1]
+        xs = x[start:end + 1]
+        ys = y[start:end + 1]
+        duration = phase.end_time - phase.start_time
+        gain = scalar(alt[end] - alt[start])
+
+        if numpy is not None:
+            velocities = numpy.column_stack((vx[start:end], vy[start:end]))
+            velocities = velocities[~numpy.isnan(velocities).any(axis=1)]
+            velocity_x, velocity_y = velocities[:, 0], velocities[:, 1]
+            if len(ts) > 1:
+                drift = tuple(
+                    float(value) for value in
+                    numpy.polyfit(ts - ts[0], numpy.column_stack((xs, ys)), 1)[0])
+            else:
+                drift = (0., 0.)
+            center = (float(ys.mean()) / y_scale, float(xs.mean()) / x_scale)
+        else:
+            velocity_x = [v for v in vx[start:end] if v is not None]
+            velocity_y = [v for v in vy[start:end] if v is not None]
+            drift = (_slope(ts, xs), _slope(ts, ys)) if len(ts) > 1 else (0., 0.)
+            center = (sum(ys) / len(ys) / y_scale, sum(xs) / len(xs) / x_scale)
+
+        circle = fit_circle(velocity_x, velocity_y)
+        if circle is None:
+            wind_speed = wind_direction = airspeed = None
+        else:
+            wind_x, wind_y, airspeed = circle
+            wind_speed = math.hypot(wind_x, wind_y)
+            wind_direction = math.degrees(math.atan2(-wind_x, -wind_y)) % 360.
+
+        thermals.append(Thermal(
+            phase.start_time, phase.end_time, phase.start_index,
+            phase.end_index, phase.direction, gain,
+            float(gain) / duration if duration else 0.,
+            center[0], center[1], drift,
+            wind_speed, wind_direction, airspeed,
+        ))
+
+    return thermals
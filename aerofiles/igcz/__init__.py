@@ -0,0 +1,9 @@
+"""
+A compact binary format for IGC files. The B records are stored as delta
+encoded integer columns and all other records unchanged, so the original
+file can be restored byte by byte.
+"""
+# flake8: noqa
+
+from .reader import Reader
+from .writer import Writer
@@ -0,0 +1,112 @@
+import datetime
+import io
+
+from aerofiles.igc.writer import Writer as IGCWriter
+
+
+MAGIC = b'IGCZ'
+VERSION = 1
+
+COMPRESSION_NONE = 0
+COMPRESSION_ZLIB = 1
+
+# The fix columns in the order they are stored.
+COLUMNS = ('time', 'lat', 'lon', 'pressure_alt', 'gps_alt')
+
+
+def zigzag(value):
+    """
+    Map a signed integer to an unsigned one (0, -1, 1, -2, ... to
+    0, 1, 2, 3, ...) so that small negative values stay small.
+    """
+    return value * 2 if value >= 0 else -value * 2 - 1
+
+
+def unzigzag(value):
+    return (value >> 1) ^ -(value & 1)
+
+
+def write_varint(buffer, value):
+    """
+    Append an unsigned integer to a ``bytearray`` as LEB128 varint.
+    """
+    while value > 0x7f:
+        buffer.append((value & 0x7f) | 0x80)
+        value >>= 7
+    buffer.append(value)
+
+
+def read_varint(data, position):
+    """
+    Read a varint from a ``bytearray`` and return it with the position
+    after it.
+    """
+    result = 0
+    shift = 0
+    while True:
+        byte = data[position]
+        position += 1
+        result |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return result, position
+        shift += 7
+
+
+def write_bytes(buffer, value):
+    write_varint(buffer, len(value))
+    buffer.extend(value)
+
+
+def read_bytes(data, position):
+    length, position = read_varint(data, position)
+    return bytes(data[position:position + length]), position + length
+
+
+def write_deltas(buffer, values):
+    """
+    Append a column of integers as zigzag varints of the differences
+    between consecutive values.
+    """
+    previous = 0
+    for value in values:
+        write_varint(buffer, zigzag(value - previous))
+        previous = value
+
+
+def read_deltas(data, position, count):
+    values = []
+    value = 0
+    for _ in range(count):
+        delta, position = read_varint(data, position)
+        value += unzigzag(delta)
+        values.append(value)
+
+    return values, position
+
+
+class FixFormatter:
+    """
+    Formats B records with :class:`aerofiles.igc.Writer` from integer
+    values: the time in seconds since midnight, the coordinates in
+    milli-minutes and the extension values.
+    """
+
+    def __init__(self, extensions):
+        self.buffer = io.BytesIO()
+        self.writer = IGCWriter(self.buffer, integer_coordinates=True)
+        if extensions:
+            self.writer.write_fix_extensions(extensions)
+
+    def format(self, time, lat, lon, valid, pressure_alt, gps_alt,
+               extensions):
+        self.buffer.seek(0)
+        self.buffer.truncate()
+
+        self.writer.write_fix(
+            datetime.time(time // 3600, time // 60 % 60, time % 60),
+            latitude=lat, longitude=lon, valid=valid,
+            pressure_alt=pressure_alt, gps_alt=gps_alt,
+            extensions=extensions or None)
+
+        # strip the line ending added by the writer
+        return self.buffer.getvalue()[:-2]
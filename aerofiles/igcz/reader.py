@@ -0,0 +1,232 @@
+import datetime
+import zlib
+
+from aerofiles.igc.reader import LowLevelReader, Reader as IGCReader
+from aerofiles.igcz.format import (
+    COLUMNS, COMPRESSION_NONE, COMPRESSION_ZLIB, MAGIC, VERSION, FixFormatter,
+    read_bytes, read_deltas, read_varint,
+)
+
+
+class Reader:
+    """
+    A reader for the compact IGC track format written by
+    :class:`aerofiles.igcz.Writer`::
+
+        with open('track.igcz', 'rb') as fp:
+            igc = Reader().read(fp)
+
+    :meth:`read` returns the same result as :class:`aerofiles.igc.Reader`
+    for the original file. The fix records are built from the columns
+    directly, only the lines stored unchanged are parsed as text.
+    :meth:`read_columns` returns the fix columns without building fix
+    records.
+
+    :param skip_duplicates: passed to :class:`aerofiles.igc.Reader`
+    :param integer_coordinates: passed to :class:`aerofiles.igc.Reader`
+    :param encoding: the encoding of the original IGC file, undecodable
+        bytes are replaced
+    """
+
+    def __init__(self, skip_duplicates=False, integer_coordinates=False,
+                 encoding='utf-8'):
+        self.skip_duplicates = skip_duplicates
+        self.integer_coordinates = integer_coordinates
+        self.encoding = encoding
+
+    def read(self, file_obj, **kwargs):
+        """
+        Read a compact file and return the result of
+        :meth:`aerofiles.igc.Reader.read`, additional keyword arguments are
+        passed to it.
+        """
+        reader = IGCReader(
+            skip_duplicates=self.skip_duplicates,
+            integer_coordinates=self.integer_coordinates)
+        return reader.read_records(
+            self.records(decode(file_obj.read())), **kwargs)
+
+    def records(self, track):
+        """
+        Yield the ``(record_type, record, error)`` tuples of
+        :class:`aerofiles.igc.reader.LowLevelReader` for a decoded track.
+        """
+        integer_coordinates = self.integer_coordinates
+        widths = [width for _, width in track['extensions']]
+        time_type = datetime.time
+
+        raw_lines = track['raw_lines']
+        raw_index = 0
+        fixes = zip(*(
+            track['columns'] +
+            [track['validity']] +
+            track['extension_columns']))
+
+        for index, fix in enumerate(fixes):
+            if raw_index < len(raw_lines) and raw_lines[raw_index][0] == index:
+                raw_index, records = self.raw_records(
+                    raw_lines, raw_index, index)
+                for record in records:
+                    yield record
+
+            time, lat, lon, pressure_alt, gps_alt, valid = fix[:6]
+            if not integer_coordinates:
+                lat = _degrees(lat)
+                lon = _degrees(lon)
+
+            yield 'B', {
+                'time': time_type(time // 3600, time // 60 % 60, time % 60),
+                'lat': lat,
+                'lon': lon,
+                'validity': 'A' if valid else 'V',
+                'pressure_alt': pressure_alt,
+                'gps_alt': gps_alt,
+                'start_index_extensions': 35,
+                'extensions_string': ''.join(
+                    '%0*d' % (width, value)
+                    for width, value in zip(widths, fix[6:])),
+            }, None
+
+        _, records = self.raw_records(
+            raw_lines, raw_index, len(track['validity']))
+        for record in records:
+            yield record
+
+    def raw_records(self, raw_lines, start, num_fixes):
+        """
+        Parse the unchanged lines before fix number ``num_fixes`` as text and
+        return the index of the next line and the records.
+        """
+        end = start
+        while end < len(raw_lines) and raw_lines[end][0] <= num_fixes:
+            end += 1
+
+        reader = LowLevelReader(
+            [line.decode(self.encoding, 'replace')
+             for _, line in raw_lines[start:end]],
+            integer_coordinates=self.integer_coordinates)
+        # count the lines of the original file for the error line numbers
+        reader.line_number = num_fixes + start
+        return end, list(reader)
+
+    def read_columns(self, file_obj):
+        """
+        Return the B records stored as columns as a dictionary of lists:
+        ``time`` in seconds since midnight, ``lat`` and ``lon`` in
+        milli-minutes, ``valid``, ``pressure_alt``, ``gps_alt`` and one list
+        per fix extension.
+
+        B records that are stored unchanged (see
+        :class:`aerofiles.igcz.Writer`) are not included.
+        """
+        track = decode(file_obj.read())
+        result = dict(zip(COLUMNS, track['columns']))
+        for (name, _), column in zip(
+                track['extensions'], track['extension_columns']):
+            result[name] = column
+        result['valid'] = track['validity']
+        return result
+
+    def lines(self, file_obj):
+        """
+        Yield the lines of the original IGC file as bytes.
+        """
+        track = decode(file_obj.read())
+        formatter = FixFormatter(track['extensions'])
+        ending = track['ending']
+
+        raw_lines = iter(track['raw_lines'])
+        raw = next(raw_lines, None)
+        fixes = zip(*(
+            track['columns'] +
+            [track['validity']] +
+            track['extension_columns']))
+
+        for index, fix in enumerate(fixes):
+            while raw is not None and raw[0] == index:
+                yield raw[1]
+                raw = next(raw_lines, None)
+
+            time, lat, lon, pressure_alt, gps_alt, valid = fix[:6]
+            yield formatter.format(
+                time, lat, lon, valid, pressure_alt, gps_alt,
+                list(fix[6:])) + ending
+
+        while raw is not None:
+            yield raw[1]
+            raw = next(raw_lines, None)
+
+    def decompress(self, file_obj, fp):
+        """
+        Write the original IGC file to the binary file pointer ``fp``.
+        """
+        for line in self.lines(file_obj):
+            fp.write(line)
+
+
+def _degrees(milliminutes):
+    # the same arithmetic as LowLevelReader.decode_latitude()
+    degrees, minutes = divmod(abs(milliminutes), 60000)
+    value = degrees + minutes / 1000. / 60.
+    return -value if milliminutes < 0 else value
+
+
+def decode(data):
+    """
+    Decode the contents of a compact file into a dictionary with the line
+    ending, the fix extensions, the unchanged lines with the number of
+    fixes before them and the fix columns.
+    """
+    if data[:len(MAGIC)] != MAGIC:
+        raise ValueError('Not an IGCZ file')
+
+    data = bytearray(data)
+    version, position = read_varint(data, len(MAGIC))
+    if version != VERSION:
+        raise ValueError('Unsupported IGCZ version: %d' % version)
+
+    compression, position = read_varint(data, position)
+    if compression == COMPRESSION_ZLIB:
+        data = bytearray(zlib.decompress(bytes(data[position:])))
+    elif compression == COMPRESSION_NONE:
+        data = data[position:]
+    else:
+        raise ValueError('Unsupported IGCZ compression: %d' % compression)
+
+    ending, position = read_bytes(data, 0)
+
+    extensions = []
+    count, position = read_varint(data, position)
+    for _ in range(count):
+        name, position = read_bytes(data, position)
+        width, position = read_varint(data, position)
+        extensions.append((name.decode('ascii'), width))
+
+    raw_lines = []
+    count, position = read_varint(data, position)
+    index = 0
+    for _ in range(count):
+        delta, position = read_varint(data, position)
+        line, position = read_bytes(data, position)
+        index += delta
+        raw_lines.append((index, line))
+
+    num_fixes, position = read_varint(data, position)
+    columns = []
+    for _ in range(len(COLUMNS) + len(extensions)):
+        column, position = read_deltas(data, position, num_fixes)
+        columns.append(column)
+
+    validity = [
+        bool(data[position + i // 8] & (1 << (i % 8)))
+        for i in range(num_fixes)
+    ]
+
+    return {
+        'ending': ending,
+        'extensions': extensions,
+        'raw_lines': raw_lines,
+        'columns': columns[:len(COLUMNS)],
+        'extension_columns': columns[len(COLUMNS):],
+        'validity': validity,
+    }
@@ -0,0 +1,172 @@
+import zlib
+
+from aerofiles.igc.reader import LowLevelReader
+from aerofiles.igcz.format import (
+    COMPRESSION_NONE, COMPRESSION_ZLIB, MAGIC, VERSION, FixFormatter,
+    write_bytes, write_deltas, write_varint,
+)
+
+
+class Writer:
+    """
+    A writer for the compact IGC track format::
+
+        with open('track.igc', 'rb') as igc, open('track.igcz', 'wb') as fp:
+            Writer(fp).write(igc)
+
+    The B records are stored as columns of the time, the coordinates in
+    milli-minutes, the altitudes and the fix extension values. Every column
+    is delta encoded as zigzag varints, so a typical fix needs a few bytes
+    instead of more than 35. All other records are stored unchanged and
+    the result is compressed with zlib.
+
+    B records that would not be written identically by
+    :class:`aerofiles.igc.Writer` from their decoded values (e.g. invalid
+    records or records after a second I record) are stored unchanged as
+    well, so the conversion is always lossless.
+
+    :param fp: file pointer to write to
+    :param compress: ``False`` to skip the zlib compression
+    """
+
+    def __init__(self, fp=None, compress=True):
+        self.fp = fp
+        self.compress = compress
+
+    def write(self, igc_file):
+        """
+        Convert an IGC file and write it to :attr:`fp`.
+
+        :param igc_file: an IGC file object opened in binary mode
+        """
+        raw_lines = []
+        columns = [[] for _ in range(5)]
+        validity = []
+        extension_columns = []
+        # the extensions of the I record before the first B record, fixes
+        # after another I record are stored unchanged
+        plan = []
+        extensions = []
+        ending = None
+        formatter = None
+
+        for line in igc_file:
+            values = None
+            if line[:1] == b'I':
+                plan = None if formatter else self.decode_extensions(line)
+            elif line[:1] == b'B' and plan is not None:
+                body = line.rstrip(b'\r\n')
+                if formatter is None:
+                    extensions = plan
+                    extension_columns = [[] for _ in extensions]
+                    ending = line[len(body):]
+                    formatter = FixFormatter(extensions)
+                if line[len(body):] == ending:
+                    values = self.encode_fix(body, extensions, formatter)
+
+            if values is None:
+                raw_lines.append((len(validity), line))
+            else:
+                time, lat, lon, valid, pressure_alt, gps_alt, ext = values
+                for column, value in zip(
+                        columns, (time, lat, lon, pressure_alt, gps_alt)):
+                    column.append(value)
+                validity.append(valid)
+                for column, value in zip(extension_columns, ext):
+                    column.append(value)
+
+        body = bytearray()
+        write_bytes(body, ending or b'\r\n')
+
+        write_varint(body, len(extensions))
+        for name, width in extensions:
+            write_bytes(body, name.encode('ascii'))
+            write_varint(body, width)
+
+        write_varint(body, len(raw_lines))
+        previous = 0
+        for position, line in raw_lines:
+            write_varint(body, position - previous)
+            write_bytes(body, line)
+            previous = position
+
+        write_varint(body, len(validity))
+        for column in columns + extension_columns:
+            write_deltas(body, column)
+
+        bits = bytearray((len(validity) + 7) // 8)
+        for i, valid in enumerate(validity):
+            if valid:
+                bits[i // 8] |= 1 << (i % 8)
+        body.extend(bits)
+
+        header = bytearray(MAGIC)
+        write_varint(header, VERSION)
+        if self.compress:
+            write_varint(header, COMPRESSION_ZLIB)
+            body = zlib.compress(bytes(body))
+        else:
+            write_varint(header, COMPRESSION_NONE)
+
+        self.fp.write(bytes(header))
+        self.fp.write(bytes(body))
+
+    @staticmethod
+    def decode_extensions(line):
+        """
+        Return the ``(type, width)`` tuples of an I record, or ``None`` if the
+        extensions are not contiguous after the fixed part of the B record
+        and can not be stored as columns.
+        """
+        try:
+            extensions = LowLevelReader.decode_I_record(
+                line.decode('ascii').rstrip('\r\n'))
+        except Exception:
+            return None
+
+        result = []
+        start = 36
+        for extension in extensions:
+            start_byte, end_byte = extension['bytes']
+            if start_byte != start or end_byte < start_byte:
+                return None
+            result.append(
+                (extension['extension_type'], end_byte - start_byte + 1))
+            start = end_byte + 1
+
+        return result
+
+    @staticmethod
+    def encode_fix(body, extensions, formatter):
+        """
+        Decode a B record into integer values or return ``None`` if it can
+        not be reproduced exactly from them.
+        """
+        try:
+            decoded = LowLevelReader.decode_B_record(
+                body.decode('ascii'), integer_coordinates=True)
+            if decoded['validity'] not in 'AV':
+                return None
+
+            extension_string = body[35:].decode('ascii')
+            values = []
+            start = 0
+            for _, width in extensions:
+                value = extension_string[start:start + width]
+                if not value.isdigit():
+                    return None
+                values.append(int(value))
+                start += width
+
+            time = decoded['time']
+            time = time.hour * 3600 + time.minute * 60 + time.second
+            fix = (time, decoded['lat'], decoded['lon'],
+                   decoded['validity'] == 'A', decoded['pressure_alt'],
+                   decoded['gps_alt'], values)
+
+            if formatter.format(*fix) != body:
+                return None
+        except Exception:
+            return None
+
+        return fix
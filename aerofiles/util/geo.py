@@ -0,0 +1,66 @@
+import math
+
+# Radius of the FAI sphere in meters
+EARTH_RADIUS = 6371000.
+
+
+def distance(lat1, lon1, lat2, lon2):
+    """
+    Return the great circle distance in meters between two points given in
+    decimal degrees.
+    """
+    lat1 = math.radians(lat1)
+    lat2 = math.radians(lat2)
+    d_lat = lat2 - lat1
+    d_lon = math.radians(lon2 - lon1)
+
+    a = math.sin(d_lat / 2) ** 2 + \
+        math.cos(lat1) * math.cos(lat2) * math.sin(d_lon / 2) ** 2
+    return 2 * EARTH_RADIUS * math.asin(min(1., math.sqrt(a)))
+
+
+def bearing(lat1, lon1, lat2, lon2):
+    """
+    Return the initial true bearing in degrees (``0 <= bearing < 360``) from
+    the first to the second point.
+    """
+    lat1 = math.radians(lat1)
+    lat2 = math.radians(lat2)
+    d_lon = math.radians(lon2 - lon1)
+
+    x = math.sin(d_lon) * math.cos(lat2)
+    y = math.cos(lat1) * math.sin(lat2) - \
+        math.sin(lat1) * math.cos(lat2) * math.cos(d_lon)
+    return math.degrees(math.atan2(x, y)) % 360.
+
+
+def distance_array(lat1, lon1, lat2, lon2):
+    """
+    Vectorized version of :func:`distance` for NumPy arrays.
+    """
+    import numpy
+
+    lat1 = numpy.radians(lat1)
+    lat2 = numpy.radians(lat2)
+    d_lat = lat2 - lat1
+    d_lon = numpy.radians(numpy.subtract(lon2, lon1))
+
+    a = numpy.sin(d_lat / 2) ** 2 + \
+        numpy.cos(lat1) * numpy.cos(lat2) * numpy.sin(d_lon / 2) ** 2
+    return 2 * EARTH_RADIUS * numpy.arcsin(numpy.minimum(1., numpy.sqrt(a)))
+
+
+def bearing_array(lat1, lon1, lat2, lon2):
+    """
+    Vectorized version of :func:`bearing` for NumPy arrays.
+    """
+    import numpy
+
+    lat1 = numpy.radians(lat1)
+    lat2 = numpy.radians(lat2)
+    d_lon = numpy.radians(numpy.subtract(lon2, lon1))
+
+    x = numpy.sin(d_lon) * numpy.cos(lat2)
+    y = numpy.cos(lat1) * numpy.sin(lat2) - \
+        numpy.sin(lat1) * numpy.cos(lat2) * numpy.cos(d_lon)
+    return numpy.degrees(numpy.arctan2(x, y)) % 360.
@@ -5,6 +5,14 @@ KILOMETER = ('km', 1000.)
 STATUTE_MILE = ('ml', 1609.344)
 NAUTICAL_MILE = ('NM', 1852.)
 
+METERS_PER_SECOND = ('m/s', 1.)
+KILOMETERS_PER_HOUR = ('km/h', 1000. / 3600.)
+KNOTS = ('kt', 1852. / 3600.)
+
 
 def to_SI(value, unit):
     return value * unit[1]
+
+
+def from_SI(value, unit):
+    return value / unit[1]
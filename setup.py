@@ -30,4 +30,7 @@ setup(
         'Topic :: Scientific/Engineering :: GIS',
     ],
     packages=find_packages(exclude=['tests*']),
+    extras_require={
+        'numpy': ['numpy'],
+    },
 )
@@ -0,0 +1,45 @@
+import os
+
+import aerofiles.igc.columns
+
+import pytest
+
+
+@pytest.fixture(params=[True, False], ids=['numpy', 'python'])
+def use_numpy(request, monkeypatch):
+    """
+    Run a test with and without NumPy. The value is ``True`` if NumPy is
+    used.
+    """
+    if request.param:
+        pytest.importorskip('numpy')
+    else:
+        monkeypatch.setattr(aerofiles.igc.columns, 'numpy_missing', True)
+    return request.param
+
+
+@pytest.fixture
+def latin1_path(tmpdir):
+    """
+    The path of an IGC file with a Latin-1 encoded site name.
+    """
+    path = os.path.join(
+        os.path.dirname(__file__), 'data', 'xctrack-2020-09-04.igc')
+    with open(path, 'rb') as f:
+        data = f.read()
+
+    latin1 = tmpdir.join('latin1.igc')
+    latin1.write_binary(data.replace(b'Teufelsm\xc3\xbchle', b'Teufelsm\xfchle'))
+    return str(latin1)
+
+
+@pytest.fixture
+def broken_path(tmpdir):
+    """
+    The path of an IGC file without date header, which the
+    :class:`~aerofiles.igc.Reader` can not read.
+    """
+    broken = tmpdir.join('broken.igc')
+    broken.write_binary(
+        b'AXXX\r\nB1602405407121N00249342WA002800042120509950\r\n')
+    return str(broken)
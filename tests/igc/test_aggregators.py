@@ -0,0 +1,115 @@
+import datetime
+import os
+
+from aerofiles.igc import (
+    Aggregator, AltitudeRange, BoundingBox, Distance, FixCount, FixTimes,
+    Reader,
+)
+from aerofiles.util import geo
+from aerofiles.util.timezone import TimeZoneFix
+
+import pytest
+
+
+def read_example(**kwargs):
+    path = os.path.join(os.path.dirname(__file__), 'data', 'example.igc')
+    with open(path) as f:
+        return Reader().read(f, **kwargs)
+
+
+def all_aggregators():
+    return [
+        BoundingBox(), AltitudeRange(), AltitudeRange('pressure_alt'),
+        FixTimes(), FixCount(), Distance(),
+    ]
+
+
+class RecordTypes(Aggregator):
+    name = 'record_types'
+
+    def __init__(self):
+        self.types = []
+
+    def on_record(self, record_type, record):
+        if record_type not in self.types:
+            self.types.append(record_type)
+
+    def finish(self):
+        return ''.join(self.types)
+
+
+def test_aggregates():
+    result = read_example(aggregators=all_aggregators())
+    fixes = result['fix_records'][1]
+    aggregates = result['aggregates'][1]
+
+    lats = [fix['lat'] for fix in fixes]
+    lons = [fix['lon'] for fix in fixes]
+    assert aggregates['bbox'] == (min(lats), min(lons), max(lats), max(lons))
+
+    gps_alts = [fix['gps_alt'] for fix in fixes]
+    pressure_alts = [fix['pressure_alt'] for fix in fixes]
+    assert aggregates['gps_alt_range'] == (min(gps_alts), max(gps_alts))
+    assert aggregates['pressure_alt_range'] == \
+        (min(pressure_alts), max(pressure_alts))
+
+    assert aggregates['fix_times'] == \
+        (fixes[0]['datetime'], fixes[-1]['datetime'])
+    assert aggregates['num_fixes'] == len(fixes)
+
+    distance = sum(
+        geo.distance(a['lat'], a['lon'], b['lat'], b['lon'])
+        for a, b in zip(fixes, fixes[1:]))
+    assert abs(aggregates['distance'] - distance) < 1e-6
+
+
+def test_without_fixes():
+    expected = read_example(aggregators=all_aggregators())
+    result = read_example(aggregators=all_aggregators(), store_fixes=False)
+
+    assert result['fix_records'] == [[], []]
+    assert result['aggregates'] == expected['aggregates']
+    assert result['header'] == expected['header']
+
+
+def test_midnight_without_fixes():
+    lines = [
+        'HFDTE150320\r\n',
+        'B2359585107126N00149300WA002880042919509020\r\n',
+        'B0000035107126N00149300WA002880042919509020\r\n',
+    ]
+    result = Reader().read(lines, aggregators=[FixTimes()], store_fixes=False)
+
+    assert result['aggregates'][1]['fix_times'] == (
+        datetime.datetime(2020, 3, 15, 23, 59, 58, tzinfo=TimeZoneFix(0)),
+        datetime.datetime(2020, 3, 16, 0, 0, 3, tzinfo=TimeZoneFix(0)),
+    )
+
+
+def test_empty():
+    result = Reader().read([], aggregators=all_aggregators())
+
+    assert result['aggregates'][1] == {
+        'bbox': None, 'gps_alt_range': None, 'pressure_alt_range': None,
+        'fix_times': None, 'num_fixes': 0, 'distance': 0.,
+    }
+
+
+def test_on_record():
+    result = read_example(aggregators=[RecordTypes()])
+
+    assert result['aggregates'][1]['record_types'] == 'AHIJCFDEKLG'
+
+
+def test_no_aggregators():
+    assert 'aggregates' not in read_example()
+
+
+def test_integer_coordinates():
+    reader = Reader(integer_coordinates=True)
+    result = reader.read([], aggregators=[BoundingBox(), FixCount()])
+    assert result['aggregates'][1] == {'bbox': None, 'num_fixes': 0}
+
+    with pytest.raises(ValueError) as ex:
+        reader.read([], aggregators=[FixCount(), Distance()])
+    assert 'distance aggregator requires degree' in str(ex)
@@ -0,0 +1,82 @@
+import datetime
+import math
+
+from aerofiles.igc.align import align_flights, merged_times
+
+import pytest
+
+
+START = datetime.datetime(2020, 5, 1, 12, 0, 0)
+T0 = 1588334400
+
+
+def make_flight(offsets, lat0=50.):
+    return [{
+        'datetime': START + datetime.timedelta(seconds=offset),
+        'lat': lat0 + offset / 1000., 'lon': 8., 'gps_alt': 1000 + offset,
+    } for offset in offsets]
+
+
+def tolist(positions):
+    return [[None if p is None or math.isnan(p[0]) else list(p) for p in f]
+            for f in positions]
+
+
+def test_merged_times():
+    assert merged_times([[1, 3, 5], [2, 3, 6], []]) == [1, 2, 3, 5, 6]
+
+
+def test_align_flights(use_numpy):
+    flights = [
+        make_flight([0, 4, 8, 12]),
+        {'fix_records': [[], make_flight([2, 3, 50, 51], lat0=51.)]},
+    ]
+    alignment = align_flights(flights, step=2, max_gap=10)
+
+    assert list(alignment.times) == [T0 + i for i in range(0, 52, 2)]
+
+    positions = tolist(alignment.positions)
+    assert len(positions) == 2
+    assert len(positions[0]) == 26
+
+    assert positions[0][0] == [50., 8., 1000.]
+    assert positions[0][1] == pytest.approx([50.002, 8., 1002.])
+    assert positions[0][6] == [50.012, 8., 1012.]
+    assert positions[0][7] is None
+
+    assert positions[1][0] is None
+    assert positions[1][1] == [51.002, 8., 1002.]
+    # gap between 3 s and 50 s is larger than max_gap
+    assert positions[1][2] is None
+    assert positions[1][24] is None
+    assert positions[1][25] == [51.050, 8., 1050.]
+
+
+def test_align_flights_union(use_numpy):
+    flights = [make_flight([0, 4]), make_flight([2, 4, 6])]
+    alignment = align_flights(flights, step=None)
+
+    assert list(alignment.times) == [T0, T0 + 2, T0 + 4, T0 + 6]
+    positions = tolist(alignment.positions)
+    assert positions[0][1] == pytest.approx([50.002, 8., 1002.])
+    assert positions[0][3] is None
+    assert positions[1][0] is None
+
+
+def test_align_flights_range(use_numpy):
+    alignment = align_flights(
+        [make_flight([0, 10]), []], step=5, start=T0 + 5, end=T0 + 15)
+
+    assert list(alignment.times) == [T0 + 5, T0 + 10, T0 + 15]
+    positions = tolist(alignment.positions)
+    assert positions[0][0] == pytest.approx([50.005, 8., 1005.])
+    assert positions[0][1] == [50.01, 8., 1010.]
+    assert positions[0][2] is None
+    assert positions[1] == [None, None, None]
+
+
+def test_align_flights_shape():
+    pytest.importorskip('numpy')
+
+    alignment = align_flights([make_flight(range(100))] * 3)
+    assert alignment.positions.shape == (3, 100, 3)
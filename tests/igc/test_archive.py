@@ -0,0 +1,168 @@
+import datetime
+import multiprocessing.pool
+import os
+import shutil
+
+from aerofiles.igc import Reader
+from aerofiles.igc.archive import (
+    ArchiveIndex, Match, _overlaps_time_of_day, cell_visits,
+)
+from aerofiles.igc.columns import fix_timestamp
+from aerofiles.util import geo
+
+import pytest
+
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), 'data')
+NAMES = [
+    'xctrack-2020-09-04.igc', 'skydrop-2019-04-15.igc',
+    'xctrack-2022-04-07.igc', 'xctrack-2023-04-28.igc',
+]
+START = datetime.datetime(2020, 5, 1, 12, 0, 0)
+
+
+def read_fixes(path):
+    with open(path, 'r') as f:
+        return Reader().read(f)['fix_records'][1]
+
+
+@pytest.fixture
+def paths(tmpdir):
+    result = []
+    for name in NAMES:
+        path = str(tmpdir.join(name))
+        shutil.copy(os.path.join(DATA_DIR, name), path)
+        result.append(path)
+    return result
+
+
+def test_cell_visits():
+    fixes = [{
+        'datetime': START + datetime.timedelta(seconds=offset),
+        'lat': lat, 'lon': lon,
+    } for offset, lat, lon in [
+        (0, 50.01, 8.01), (1, 50.02, 8.02), (2, 50.12, 8.02),
+        (3, 50.02, 8.03), (4, -0.01, -0.01),
+    ]]
+    t0 = fix_timestamp(fixes[0])
+
+    assert cell_visits(fixes, 0.1) == [
+        (500, 80, t0, t0 + 1),
+        (501, 80, t0 + 2, t0 + 2),
+        (500, 80, t0 + 3, t0 + 3),
+        (-1, -1, t0 + 4, t0 + 4),
+    ]
+
+
+def test_overlaps_time_of_day():
+    day = 1588291200
+    window = (14 * 3600, 15 * 3600)
+    assert _overlaps_time_of_day(day + 14 * 3600, day + 14 * 3600, window)
+    assert _overlaps_time_of_day(day + 13 * 3600, day + 16 * 3600, window)
+    assert not _overlaps_time_of_day(day + 15 * 3600 + 1, day + 86400 + 14 * 3600 - 1, window)
+    assert _overlaps_time_of_day(day + 15 * 3600 + 1, day + 86400 + 14 * 3600, window)
+    assert _overlaps_time_of_day(day, day + 86400, window)
+    assert not _overlaps_time_of_day(day, day + 3600, window)
+
+    # a window across midnight
+    window = (23 * 3600, 3600)
+    assert _overlaps_time_of_day(day + 23 * 3600 + 1, day + 23 * 3600 + 1, window)
+    assert _overlaps_time_of_day(day + 1800, day + 1800, window)
+    assert _overlaps_time_of_day(day + 86400, day + 86400, window)
+    assert not _overlaps_time_of_day(day + 22 * 3600, day + 22 * 3600 + 3599, window)
+    assert not _overlaps_time_of_day(day + 3601, day + 23 * 3600 - 1, window)
+    assert _overlaps_time_of_day(day + 3601, day + 23 * 3600, window)
+
+
+def test_query(paths):
+    index = ArchiveIndex(':memory:', cell_size=0.02)
+    assert index.add(paths, workers=1) == len(paths)
+    assert index.paths() == paths
+
+    fixes = read_fixes(paths[1])
+    fix = fixes[len(fixes) // 2]
+    time = fix_timestamp(fix)
+
+    matches = index.query(fix['lat'], fix['lon'], 500)
+    expected = [
+        (i + 1, path) for i, path in enumerate(paths)
+        if any(geo.distance(fix['lat'], fix['lon'], f['lat'], f['lon']) <= 500
+               for f in read_fixes(path))
+    ]
+    assert [(match.flight_id, match.path) for match in matches] == expected
+
+    match = [m for m in matches if m.path == paths[1]][0]
+    assert isinstance(match, Match)
+    assert match.min_distance == 0
+    assert match.start_time <= time <= match.end_time
+
+    matches = index.query(
+        fix['lat'], fix['lon'], 500, start=time - 10, end=time + 10)
+    assert [match.path for match in matches] == [paths[1]]
+    assert matches[0].start_time >= time - 10
+    assert matches[0].end_time <= time + 10
+
+    window = (time % 86400 - 10, time % 86400 + 10)
+    matches = index.query(fix['lat'], fix['lon'], 500, time_of_day=window)
+    assert paths[1] in [match.path for match in matches]
+
+    assert index.query(fix['lat'], fix['lon'], 500, start=time + 10 ** 8) == []
+    assert index.query(0., 0., 500) == []
+
+
+def test_candidates_are_complete(paths):
+    index = ArchiveIndex(':memory:', cell_size=0.01)
+    index.add(paths, workers=1)
+
+    for path in paths:
+        fixes = read_fixes(path)
+        for fix in fixes[::200]:
+            candidates = [
+                p for _, p in index.candidates(fix['lat'], fix['lon'], 100)]
+            assert path in candidates
+
+
+def test_incremental_and_persistent(paths, tmpdir):
+    database = str(tmpdir.join('index.sqlite'))
+    pool = multiprocessing.pool.ThreadPool(2)
+    try:
+        index = ArchiveIndex(database, cell_size=0.05)
+        assert index.add(paths[:2], pool=pool) == 2
+        assert index.add(paths, pool=pool) == 2
+        index.close()
+
+        index = ArchiveIndex(database, cell_size=1.)
+        assert index.cell_size == 0.05
+        assert len(index) == len(paths)
+        assert index.add(paths, pool=pool) == 0
+
+        os.utime(paths[0], (0, 0))
+        assert index.add(paths, pool=pool) == 1
+        assert len(index) == len(paths)
+        index.close()
+    finally:
+        pool.close()
+
+
+def test_failed(paths, latin1_path, broken_path):
+    index = ArchiveIndex(':memory:', cell_size=0.05)
+    assert index.add([latin1_path, broken_path] + paths[1:2], workers=2) == 2
+    assert index.paths() == [latin1_path, paths[1]]
+    assert [(path, type(e)) for path, e in index.failed] == \
+        [(broken_path, KeyError)]
+
+    fix = read_fixes(paths[0])[0]
+    assert [m.path for m in index.query(fix['lat'], fix['lon'], 10)] == \
+        [latin1_path]
+
+    # files that disappeared after indexing are skipped
+    os.remove(latin1_path)
+    assert index.query(fix['lat'], fix['lon'], 10) == []
+
+
+def test_processes(paths):
+    index = ArchiveIndex(':memory:')
+    assert index.add(paths, workers=2) == len(paths)
+    fix = read_fixes(paths[0])[0]
+    assert [m.path for m in index.query(fix['lat'], fix['lon'], 10)][:1] == \
+        [paths[0]]
@@ -0,0 +1,66 @@
+import datetime
+import os
+
+from aerofiles.igc import Reader
+from aerofiles.igc.columns import (
+    fix_columns, fix_extension_types, fix_timestamp, to_timestamp,
+)
+import aerofiles.igc.columns
+
+import pytest
+
+
+def read_example():
+    path = os.path.join(os.path.dirname(__file__), 'data', 'example.igc')
+    with open(path, 'r') as f:
+        return Reader().read(f)
+
+
+def test_fix_timestamp():
+    fixes = read_example()['fix_records'][1]
+    assert fix_timestamp(fixes[0]) == 995299360
+    # the next day
+    assert fix_timestamp(fixes[8]) - fix_timestamp(fixes[7]) == 18 * 3600 + 4
+
+    assert fix_timestamp({'time': datetime.time(1, 2, 3)}) == 3723
+
+
+def test_to_timestamp():
+    assert to_timestamp(datetime.datetime(2001, 7, 16, 16, 2, 40)) == 995299360
+    assert to_timestamp(995299360) == 995299360
+
+
+def test_fix_extension_types():
+    fixes = read_example()['fix_records'][1]
+    assert fix_extension_types(fixes) == ['FXA', 'SIU', 'ENL']
+
+
+def test_fix_columns():
+    pytest.importorskip('numpy')
+
+    fixes = read_example()['fix_records'][1]
+    columns = fix_columns(fixes)
+
+    assert sorted(columns.keys()) == [
+        'ENL', 'FXA', 'SIU', 'gps_alt', 'lat', 'lon', 'pressure_alt', 'time',
+        'validity',
+    ]
+    assert columns['time'][0] == 995299360
+    assert columns['lat'][0] == fixes[0]['lat']
+    assert columns['gps_alt'].tolist() == [fix['gps_alt'] for fix in fixes]
+    assert columns['ENL'].tolist() == [fix['ENL'] for fix in fixes]
+    assert columns['validity'].all()
+
+
+def test_fix_columns_without_numpy(monkeypatch):
+    monkeypatch.setattr(aerofiles.igc.columns, 'numpy_missing', True)
+
+    fixes = read_example()['fix_records'][1]
+    fixes[1] = dict(fixes[1])
+    del fixes[1]['ENL']
+
+    columns = fix_columns(fixes, extensions=['ENL'])
+    assert sorted(columns.keys()) == [
+        'ENL', 'gps_alt', 'lat', 'lon', 'pressure_alt', 'time', 'validity',
+    ]
+    assert columns['ENL'][:3] == [950, None, 15]
@@ -0,0 +1,88 @@
+import os
+from io import BytesIO
+
+from aerofiles.igc import fingerprint, minhash, similarity
+import aerofiles.igc.dedupe
+import aerofiles.igc.columns
+
+import pytest
+
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), 'data')
+
+
+def example_lines():
+    with open(os.path.join(DATA_DIR, 'example.igc'), 'rb') as f:
+        return f.read().splitlines(True)
+
+
+def test_iter_fix_keys():
+    lines = [
+        b'HFDTE160701\r\n',
+        b'B1602405407121N00249342WA002800042120509950\r\n',
+        b'E160245PEV\r\n',
+        'B1602455107126N00149300WV002880042919509020\n',
+    ]
+    assert list(aerofiles.igc.dedupe.iter_fix_keys(lines)) == [
+        b'1602405407121N00249342W0028000421',
+        b'1602455107126N00149300W0028800429',
+    ]
+
+
+def test_fingerprint_ignores_headers_and_security():
+    lines = example_lines()
+    stripped = [line.rstrip() + b'\n' for line in lines
+                if not line.startswith((b'G', b'L', b'HFPLT'))]
+
+    assert fingerprint(BytesIO(b''.join(lines))) == \
+        fingerprint(BytesIO(b''.join(stripped)))
+
+
+def test_fingerprint_text_and_binary():
+    with open(os.path.join(DATA_DIR, 'example.igc'), 'r') as f:
+        text = fingerprint(f)
+
+    assert text == fingerprint(BytesIO(b''.join(example_lines())))
+
+
+def test_fingerprint_detects_changed_fix():
+    lines = example_lines()
+    changed = [line.replace(b'B1603055107180N', b'B1603055107181N')
+               for line in lines]
+
+    assert fingerprint(lines) != fingerprint(changed)
+
+
+def test_minhash_similarity():
+    with open(os.path.join(DATA_DIR, 'skytraxx21-2023-04-15.igc'), 'rb') as f:
+        lines = f.readlines()
+
+    fixes = [i for i, line in enumerate(lines) if line.startswith(b'B')]
+    # drop the last quarter of the fixes
+    cut = lines[:fixes[len(fixes) * 3 // 4]]
+
+    signature = minhash(lines)
+    assert len(signature) == 64
+    assert similarity(signature, minhash(lines)) == 1.0
+    assert 0.5 < similarity(signature, minhash(cut)) < 1.0
+    assert similarity(signature, minhash(example_lines())) == 0.0
+
+
+def test_minhash_without_numpy(monkeypatch):
+    pytest.importorskip('numpy')
+
+    lines = example_lines()
+    expected = minhash(lines, num_perm=16)
+
+    monkeypatch.setattr(aerofiles.igc.columns, 'numpy_missing', True)
+    assert minhash(lines, num_perm=16) == expected
+
+
+def test_minhash_empty():
+    assert minhash([b'HFDTE160701\r\n'], num_perm=4) == \
+        minhash([], num_perm=4)
+
+
+def test_similarity_length_mismatch():
+    with pytest.raises(ValueError):
+        similarity((1, 2), (1, 2, 3))
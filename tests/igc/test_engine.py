@@ -0,0 +1,68 @@
+import datetime
+import os
+
+from aerofiles.igc import Reader
+from aerofiles.igc.engine import (
+    EngineRun, detect_engine_run_columns, detect_engine_runs, engine_sensor,
+)
+
+
+def motor_glider_fixes():
+    start = datetime.datetime(2020, 5, 1, 10, 0, 0)
+    levels = [20] * 30 + [600] * 10 + [300] * 50 + [100] * 30 + \
+        [900] * 10 + [50] * 30
+    fixes = []
+    for i, level in enumerate(levels):
+        fixes.append({
+            'datetime': start + datetime.timedelta(seconds=i * 2),
+            'lat': 50., 'lon': 8., 'validity': 'A',
+            'pressure_alt': 500 + (2 * i - 60 if 30 <= i <= 90 else 0),
+            'gps_alt': 500, 'ENL': level,
+        })
+    return fixes
+
+
+def test_engine_sensor():
+    assert engine_sensor(motor_glider_fixes()) == 'ENL'
+    assert engine_sensor([{'ENL': 1, 'MOP': 2}]) == 'MOP'
+    assert engine_sensor([{'lat': 1.}]) is None
+
+
+def test_detect_engine_runs(use_numpy):
+    runs = detect_engine_runs(motor_glider_fixes())
+
+    assert runs == [
+        EngineRun(1588327260, 1588327380, 30, 90, 120, 600),
+    ]
+    assert runs[0].duration == 120
+
+
+def test_detect_engine_runs_min_duration(use_numpy):
+    runs = detect_engine_runs(motor_glider_fixes(), min_duration=10)
+    assert [(run.start_index, run.end_index) for run in runs] == [
+        (30, 90), (120, 130),
+    ]
+
+
+def test_detect_engine_runs_missing_values(use_numpy):
+    time = [0, 10, 20, 30, 40, 50]
+    level = [0, 800, None, None, 100, 0]
+    runs = detect_engine_run_columns(time, level, [0] * 6, min_duration=0)
+    assert [(run.start_index, run.end_index) for run in runs] == [(1, 4)]
+
+
+def test_detect_engine_runs_until_end(use_numpy):
+    time = [0, 10, 20, 30]
+    runs = detect_engine_run_columns(
+        time, [0, 800, 800, 800], [0, 10, 20, 30], min_duration=0)
+    assert runs == [EngineRun(10, 30, 1, 4, 20, 800)]
+
+
+def test_without_extension():
+    path = os.path.join(
+        os.path.dirname(__file__), 'data', 'xctrack-2023-04-28.igc')
+    with open(path, 'r') as f:
+        fixes = Reader().read(f)['fix_records'][1]
+
+    assert engine_sensor(fixes) is None
+    assert detect_engine_runs(fixes) == []
@@ -0,0 +1,124 @@
+import datetime
+import multiprocessing.pool
+import os
+
+from aerofiles.igc import Reader
+from aerofiles.igc.heatmap import Grid, Heatmap, build_heatmap
+
+import pytest
+
+numpy = pytest.importorskip('numpy')
+
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), 'data')
+PATHS = [
+    os.path.join(DATA_DIR, name) for name in (
+        'xctrack-2020-09-04.igc', 'skydrop-2019-04-15.igc',
+        'xctrack-2022-04-07.igc',
+    )
+]
+START = datetime.datetime(2020, 5, 1, 12, 0, 0)
+
+
+def make_fixes(rows):
+    return [{
+        'datetime': START + datetime.timedelta(seconds=offset),
+        'lat': lat, 'lon': lon, 'validity': 'A',
+        'pressure_alt': alt, 'gps_alt': alt,
+    } for offset, lat, lon, alt in rows]
+
+
+def test_grid():
+    grid = Grid(45., 5., 46., 7., 0.1)
+    assert grid.shape == (10, 20)
+
+    row, col, inside = grid.cells([45.05, 45.95, 44.99], [5.0, 6.99, 6.])
+    assert row[:2].tolist() == [0, 9]
+    assert col[:2].tolist() == [0, 19]
+    assert inside.tolist() == [True, True, False]
+
+
+def test_add_fixes():
+    heatmap = Heatmap(Grid(45., 5., 46., 6., 0.5), max_gap=10)
+    heatmap.add_fixes(make_fixes([
+        (0, 45.1, 5.1, 1000),
+        (2, 45.1, 5.2, 1004),
+        (4, 45.6, 5.2, 1006),
+        (20, 45.6, 5.7, 1000),
+        (21, 47.0, 5.7, 1000),
+    ]))
+
+    assert heatmap.counts.tolist() == [[2, 0], [1, 1]]
+    assert heatmap.time.tolist() == [[4, 0], [0, 1]]
+    assert heatmap.climb.tolist() == [[6, 0], [0, 0]]
+    vario = heatmap.vario
+    assert vario[0, 0] == 1.5
+    assert numpy.isnan(vario[0, 1])
+
+    heatmap.add_fixes([])
+    assert heatmap.counts.sum() == 4
+
+
+def test_invalid_grid():
+    with pytest.raises(ValueError):
+        Heatmap(Grid(45., 5., 45., 6., 0.5))
+
+    with pytest.raises(ValueError):
+        Heatmap(Grid(45., 5., 46., 6., 0.))
+
+
+def test_build_heatmap(tmpdir):
+    lats = []
+    lons = []
+    for path in PATHS:
+        with open(path, 'r') as f:
+            fixes = Reader().read(f)['fix_records'][1]
+        lats.extend(fix['lat'] for fix in fixes)
+        lons.extend(fix['lon'] for fix in fixes)
+
+    grid = Grid(min(lats), min(lons), max(lats) + 0.01, max(lons) + 0.01, 0.01)
+    expected = Heatmap(grid)
+    for path in PATHS:
+        expected.add_file(path)
+    assert expected.counts.sum() == len(lats)
+
+    pool = multiprocessing.pool.ThreadPool(2)
+    try:
+        heatmap = build_heatmap(PATHS, grid, workers=2, pool=pool)
+    finally:
+        pool.close()
+
+    assert (heatmap.counts == expected.counts).all()
+    assert numpy.allclose(heatmap.time, expected.time)
+    assert numpy.allclose(heatmap.climb, expected.climb)
+
+    assert (build_heatmap(PATHS, grid, workers=2).counts ==
+            expected.counts).all()
+
+    path = str(tmpdir.join('heatmap.npz'))
+    heatmap.save(path)
+    loaded = Heatmap.load(path)
+    assert loaded.grid == grid
+    assert loaded.max_gap == 30
+    assert loaded.altitude == 'gps_alt'
+    assert (loaded.counts == heatmap.counts).all()
+    assert (loaded.climb == heatmap.climb).all()
+
+
+def test_build_heatmap_failed(latin1_path, broken_path):
+    with open(PATHS[0], 'r') as f:
+        fixes = Reader().read(f)['fix_records'][1]
+    lats = [fix['lat'] for fix in fixes]
+    lons = [fix['lon'] for fix in fixes]
+    grid = Grid(min(lats), min(lons), max(lats) + 0.01, max(lons) + 0.01, 0.01)
+
+    heatmap = build_heatmap([latin1_path, broken_path], grid, workers=2)
+    assert heatmap.counts.sum() == len(fixes)
+    assert [(path, type(e)) for path, e in heatmap.failed] == \
+        [(broken_path, KeyError)]
+
+
+def test_merge_different_grids():
+    heatmap = Heatmap(Grid(45., 5., 46., 6., 0.5))
+    with pytest.raises(ValueError):
+        heatmap.merge(Heatmap(Grid(45., 5., 46., 6., 0.25)))
@@ -0,0 +1,55 @@
+import os
+
+from aerofiles.igc import LazyFlight, Reader
+
+import pytest
+
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), 'data')
+
+
+def read_example(filename, **kwargs):
+    with open(os.path.join(DATA_DIR, filename), 'r') as f:
+        return Reader(**kwargs).read(f)
+
+
+def test_build_index():
+    data = b'AXXXABC\r\nHFDTE160701\r\nHFFXA035\r\nB1\r\nE1\r\nB2\r\n'
+    assert LazyFlight.build_index(data) == {
+        'A': [(0, 9)],
+        'H': [(9, 32)],
+        'B': [(32, 36), (40, 44)],
+        'E': [(36, 40)],
+    }
+
+
+def test_sections_are_decoded_lazily():
+    with open(os.path.join(DATA_DIR, 'example.igc'), 'rb') as f:
+        flight = LazyFlight(f)
+
+    assert flight.sections == {}
+    assert len(flight.fix_records[1]) == 10
+    assert list(flight.sections.keys()) == ['fix_records']
+    assert flight['fix_records'] is flight.fix_records
+
+
+def test_unknown_section():
+    with open(os.path.join(DATA_DIR, 'example.igc'), 'rb') as f:
+        flight = LazyFlight(f)
+
+    with pytest.raises(KeyError):
+        flight['unknown']
+
+
+@pytest.mark.parametrize('mode', ['r', 'rb'])
+@pytest.mark.parametrize('skip_duplicates', [False, True])
+def test_matches_reader(mode, skip_duplicates):
+    for entry in os.listdir(DATA_DIR):
+        if not entry.endswith('.igc') or entry == 'bad-line.igc':
+            continue
+
+        expected = read_example(entry, skip_duplicates=skip_duplicates)
+        with open(os.path.join(DATA_DIR, entry), mode) as f:
+            flight = LazyFlight(f, skip_duplicates=skip_duplicates)
+
+        assert flight.to_dict() == expected, entry
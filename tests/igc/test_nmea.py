@@ -0,0 +1,179 @@
+import io
+import os
+
+from aerofiles.igc import Reader, Writer
+from aerofiles.igc.nmea import (
+    NMEAPipeline, checksum, decode_coordinate, main, parse_sentence,
+    pressure_altitude, replay,
+)
+
+import pytest
+
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), 'data')
+
+
+def sentence(*fields):
+    data = ','.join(str(field) for field in fields)
+    return '$%s*%02X\r\n' % (data, checksum(data))
+
+
+def nmea_coordinate(value, degree_digits):
+    degrees, milliminutes = divmod(abs(value), 60000)
+    return '%0*d%06.3f' % (degree_digits, degrees, milliminutes / 1000.)
+
+
+def to_nmea(fixes, epochs_per_second=5):
+    """
+    Return the NMEA stream of a list of fixes with integer coordinates at
+    ``epochs_per_second``, each epoch with a GGA, an RMC and a PGRMZ
+    sentence.
+    """
+    lines = []
+    for fix in fixes:
+        for epoch in range(epochs_per_second):
+            time = '%s.%02d' % (
+                fix['time'].strftime('%H%M%S'), epoch * 100 // epochs_per_second)
+            lat = nmea_coordinate(fix['lat'], 2)
+            lon = nmea_coordinate(fix['lon'], 3)
+            ns = 'S' if fix['lat'] < 0 else 'N'
+            ew = 'W' if fix['lon'] < 0 else 'E'
+            lines.append(sentence(
+                'PGRMZ', int(round(fix['pressure_alt'] / 0.3048)), 'f', 3))
+            lines.append(sentence(
+                'GPGGA', time, lat, ns, lon, ew, 1, 8, '0.9',
+                '%.1f' % (fix['gps_alt'] - 47.5), 'M', '47.5', 'M', '', ''))
+            lines.append(sentence(
+                'GPRMC', time, 'A', lat, ns, lon, ew, '12.5', '270.4',
+                '280423', '', ''))
+    return lines
+
+
+@pytest.fixture
+def fixes():
+    with open(os.path.join(DATA_DIR, 'xctrack-2023-04-28.igc'), 'r') as f:
+        return Reader(integer_coordinates=True).read(f)['fix_records'][1]
+
+
+def test_parse_sentence():
+    line = '$GPGGA,123519,4807.038,N,01131.000,E,1,08,0.9,545.4,M,46.9,M,,*47'
+    assert parse_sentence(line)[:3] == ['GPGGA', '123519', '4807.038']
+    assert parse_sentence(line.replace('545', '546')) is None
+    assert parse_sentence(line[:-3]) == parse_sentence(line)
+    assert parse_sentence('GPGGA,123519') is None
+    assert parse_sentence('$GPGGA,1*XY') is None
+
+    assert decode_coordinate('4807.038', 'N', 2) == 48 * 60000 + 7038
+    assert decode_coordinate('01131.000', 'W', 3) == -(11 * 60000 + 31000)
+    assert decode_coordinate('', 'N', 2) is None
+
+    assert pressure_altitude(1013.25) == 0.
+    assert pressure_altitude(898.75) == pytest.approx(1000., abs=1.)
+
+
+def test_round_trip(fixes):
+    fixes = fixes[:200]
+    output = io.BytesIO()
+    pipeline = NMEAPipeline(
+        Writer(output, integer_coordinates=True),
+        extensions=[('SIU', 2), ('GSP', 3), ('TRT', 3)])
+
+    data = ''.join(to_nmea(fixes))
+    for start in range(0, len(data), 37):
+        pipeline.feed(data[start:start + 37])
+    pipeline.finish()
+
+    assert pipeline.num_errors == 0
+    assert pipeline.num_fixes == len(fixes)
+
+    output.seek(0)
+    lines = output.getvalue().decode('ascii').splitlines()
+    assert lines[0] == 'I033637SIU3840GSP4143TRT'
+
+    written = Reader(integer_coordinates=True).read(
+        io.StringIO(u'HFDTE280423\r\n' + u'\r\n'.join(lines)))
+    for expected, fix in zip(fixes, written['fix_records'][1]):
+        assert fix['time'] == expected['time']
+        assert fix['lat'] == expected['lat']
+        assert fix['lon'] == expected['lon']
+        assert fix['pressure_alt'] == expected['pressure_alt']
+        assert fix['gps_alt'] == expected['gps_alt']
+        assert fix['validity'] == 'A'
+        assert (fix['SIU'], fix['GSP'], fix['TRT']) == (8, 23, 270)
+
+
+def test_interval_and_latency(fixes):
+    lines = to_nmea(fixes[:20])
+
+    output = io.BytesIO()
+    pipeline = NMEAPipeline(Writer(output), interval=0.4)
+    written = [pipeline.feed_sentence(line) for line in lines]
+    # each fix is written by the RMC sentence completing its epoch
+    assert written[:15] == [0, 0, 1, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 1]
+    assert pipeline.finish() == 0
+
+    # receivers sending only GGA are written with the next epoch
+    pipeline = NMEAPipeline(Writer(io.BytesIO()), interval=0.2)
+    gga = [line for line in lines if 'GGA' in line]
+    assert [pipeline.feed_sentence(line) for line in gga[:3]] == [0, 1, 1]
+    assert pipeline.finish() == 1
+
+
+def test_invalid_input():
+    output = io.BytesIO()
+    pipeline = NMEAPipeline(Writer(output))
+    pipeline.feed(b'garbage\r\n$GPGGA,1*00\r\n$GPGGA,123518,48*\r\n')
+    pipeline.feed(sentence('GPGGA', '123519', '', '', '', '', 0, 0, '', '', '', '', '', '', ''))
+    pipeline.feed(sentence('GPRMC', '123519', 'V', '', '', '', '', '', '', '', '', ''))
+    pipeline.feed(sentence('GPGGA', '123520', 'xx', 'N'))
+    pipeline.feed(sentence('GPVTG', '270.4', 'T'))
+    assert pipeline.finish() == 0
+    assert pipeline.num_errors == 4
+    assert output.getvalue() == b''
+
+    with pytest.raises(ValueError):
+        NMEAPipeline(Writer(output), extensions=[('ENL', 3)])
+
+
+def test_pressure_sentences():
+    pipeline = NMEAPipeline(Writer(io.BytesIO()))
+    pipeline.feed_sentence(sentence('PGRMZ', 1000, 'm', 3))
+    assert pipeline.pressure_alt == 1000.
+    pipeline.feed_sentence(sentence('LXWP0', 'Y', '120.0', '1500.5', '1.2'))
+    assert pipeline.pressure_alt == 1500.5
+    pipeline.feed_sentence(sentence('POV', 'E', '2.1', 'P', '1013.25'))
+    assert pipeline.pressure_alt == 0.
+
+
+def test_replay(fixes):
+    lines = to_nmea(fixes[:30], epochs_per_second=5)
+
+    now = [0.]
+    sleeps = []
+
+    def sleep(seconds):
+        sleeps.append(seconds)
+        now[0] += seconds
+
+    pipeline = NMEAPipeline(Writer(io.BytesIO()))
+    stats = replay(lines, pipeline, speed=10., clock=lambda: now[0],
+                   sleep=sleep)
+    assert stats['sentences'] == len(lines)
+    assert stats['fixes'] == len(set(fix['time'] for fix in fixes[:30]))
+    expected = (fixes[29]['time'].hour * 3600 + fixes[29]['time'].minute * 60 +
+                fixes[29]['time'].second + 0.8 -
+                fixes[0]['time'].hour * 3600 - fixes[0]['time'].minute * 60 -
+                fixes[0]['time'].second) / 10.
+    assert stats['duration'] == pytest.approx(expected)
+    assert stats['max'] == 0.
+
+
+def test_bench(fixes, tmpdir, capsys):
+    recording = tmpdir.join('recording.nmea')
+    recording.write(''.join(to_nmea(fixes[:5], epochs_per_second=2)))
+    output = tmpdir.join('output.igc')
+
+    main(['bench', str(recording), '--speed', '1000',
+          '--output', str(output)])
+    assert 'fixes:       5' in capsys.readouterr().out
+    assert output.read().count('B') == 5
@@ -0,0 +1,121 @@
+import datetime
+import os
+
+from aerofiles.igc import Reader, PanelBuilder, build_panel
+
+import pytest
+
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), 'data')
+START = datetime.datetime(2020, 5, 1, 12, 0, 0)
+T0 = 1588334400
+
+
+def make_flight(pilot, offsets, extension=None):
+    fixes = []
+    for offset in offsets:
+        fix = {
+            'datetime': START + datetime.timedelta(seconds=offset),
+            'lat': 50. + offset, 'lon': 8., 'validity': 'A',
+            'pressure_alt': 1000 + offset, 'gps_alt': 1100 + offset,
+        }
+        if extension:
+            fix[extension] = offset * 10
+        fixes.append(fix)
+
+    return {
+        'fix_records': [[], fixes],
+        'header': [[], {'pilot': pilot}],
+    }
+
+
+def tolist(column):
+    return [None if value is None or value != value else value
+            for value in list(column)]
+
+
+@pytest.fixture
+def panel(use_numpy):
+    builder = PanelBuilder(capacity=2)
+    builder.add(make_flight('A', [0, 1, 2]), name='first')
+    builder.add(make_flight('B', [], 'ENL'))
+    builder.add(make_flight('A', [5, 6], 'ENL'))
+    builder.add(make_flight('C', [10]))
+    return builder.build()
+
+
+def test_columns(panel):
+    assert len(panel) == 6
+    assert list(panel['flight_id']) == [0, 0, 0, 2, 2, 3]
+    assert list(panel['time']) == [T0, T0 + 1, T0 + 2, T0 + 5, T0 + 6, T0 + 10]
+    assert list(panel['gps_alt']) == [1100, 1101, 1102, 1105, 1106, 1110]
+    assert tolist(panel['ENL']) == [None, None, None, 50, 60, None]
+    assert list(panel.offsets) == [0, 3, 3, 5, 6]
+
+
+def test_flights(panel):
+    assert [flight['pilot'] for flight in panel.flights] == ['A', 'B', 'A', 'C']
+    assert panel.flights[0]['name'] == 'first'
+    assert panel.flights[0]['utc_date'] is None
+    assert [(flight['start'], flight['end']) for flight in panel.flights] == \
+        [(0, 3), (3, 3), (3, 5), (5, 6)]
+
+
+def test_flight(panel):
+    flight = panel.flight(2)
+    assert list(flight['time']) == [T0 + 5, T0 + 6]
+    assert list(flight['flight_id']) == [2, 2]
+    assert len(panel.flight(1)['time']) == 0
+
+
+def test_aggregate(panel):
+    assert list(panel.aggregate('gps_alt', 'count')) == [3, 0, 2, 1]
+    assert list(panel.aggregate('gps_alt', 'sum')) == [3303, 0, 2211, 1110]
+    assert tolist(panel.aggregate('gps_alt', 'min')) == [1100, None, 1105, 1110]
+    assert tolist(panel.aggregate('gps_alt', 'max')) == [1102, None, 1106, 1110]
+    assert tolist(panel.aggregate('gps_alt', 'mean')) == [1101, None, 1105.5, 1110]
+    assert tolist(panel.aggregate('time', 'first')) == [T0, None, T0 + 5, T0 + 10]
+    assert tolist(panel.aggregate('time', 'last')) == [T0 + 2, None, T0 + 6, T0 + 10]
+
+    with pytest.raises(ValueError):
+        panel.aggregate('gps_alt', 'median')
+
+
+def test_group_by(panel):
+    assert panel.group_by('pilot', 'gps_alt', 'count') == {'A': 5, 'B': 0, 'C': 1}
+    assert panel.group_by('pilot', 'gps_alt', 'sum') == \
+        {'A': 5514, 'B': 0, 'C': 1110}
+    assert panel.group_by('pilot', 'gps_alt', 'max')['A'] == 1106
+    assert panel.group_by('pilot', 'gps_alt', 'min')['A'] == 1100
+    assert panel.group_by('pilot', 'gps_alt', 'mean')['A'] == 5514 / 5.
+    assert tolist([panel.group_by('pilot', 'gps_alt', 'mean')['B']]) == [None]
+
+    with pytest.raises(ValueError):
+        panel.group_by('pilot', 'gps_alt', 'first')
+
+
+def test_build_panel_from_paths(use_numpy):
+    paths = [
+        os.path.join(DATA_DIR, name)
+        for name in ('xctrack-2020-09-04.igc', 'skydrop-2019-04-15.igc')
+    ]
+    panel = build_panel(paths, extensions=[])
+
+    for flight_id, path in enumerate(paths):
+        with open(path, 'r') as f:
+            fixes = Reader().read(f)['fix_records'][1]
+
+        flight = panel.flight(flight_id)
+        assert panel.flights[flight_id]['path'] == path
+        assert list(flight['lat']) == [fix['lat'] for fix in fixes]
+        assert list(flight['gps_alt']) == [fix['gps_alt'] for fix in fixes]
+
+    assert sorted(panel.columns) == [
+        'flight_id', 'gps_alt', 'lat', 'lon', 'pressure_alt', 'time',
+        'validity']
+
+
+def test_build_panel_latin1(latin1_path):
+    panel = build_panel([latin1_path], extensions=[])
+    assert panel.flights[0]['path'] == latin1_path
+    assert len(panel.flight(0)['lat']) > 0
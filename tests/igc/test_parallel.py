@@ -0,0 +1,110 @@
+import io
+import multiprocessing.pool
+import os
+
+from aerofiles.igc import Reader
+from aerofiles.igc.parallel import read_parallel
+
+import pytest
+
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), 'data')
+
+MIDNIGHT_FLIGHT = (
+    'AXXXABC FLIGHT:1\r\n'
+    'HFDTE150320\r\n'
+    'HFTZNTIMEZONE:+2.00\r\n'
+    'I013638FXA\r\n'
+    'B2359505107126N00149300WA002880042900\r\n'
+    'B2359555107127N00149301WA002890043001\r\n'
+    'B2359555107127N00149301WA002890043001\r\n'
+    'E2359560PEV\r\n'
+    'B0000005107128N00149302WA002900043102\r\n'
+    'B0000005107128N00149302WA002900043102\r\n'
+    'I013638ENL\r\n'
+    'B0000055107129N00149303WA002910043203\r\n'
+    'BXXXXXX\r\n'
+    'HFDTE010120\r\n'
+    'B0000105107130N00149304WA002920043304\r\n'
+    'B2359505107126N00149300WA002880042900\r\n'
+    'B0000105107130N00149304WA002920043304\r\n'
+    'GABCDEF\r\n'
+)
+
+
+def comparable(result):
+    # errors are compared by type because exception instances never match
+    return dict(
+        (key, ([getattr(error, '__name__', type(error).__name__)
+                for error in errors], value))
+        for key, (errors, value) in result.items())
+
+
+def read_both(data, skip_duplicates, **kwargs):
+    expected = Reader(skip_duplicates=skip_duplicates).read(io.StringIO(data))
+    result = read_parallel(
+        io.StringIO(data), skip_duplicates=skip_duplicates, **kwargs)
+    return comparable(result), comparable(expected)
+
+
+@pytest.mark.parametrize('skip_duplicates', [False, True])
+@pytest.mark.parametrize('chunk_size', [1, 2, 3, 1000])
+def test_matches_reader(skip_duplicates, chunk_size):
+    for entry in sorted(os.listdir(DATA_DIR)) + [None]:
+        if entry is None:
+            data = MIDNIGHT_FLIGHT
+        else:
+            with open(os.path.join(DATA_DIR, entry), 'rb') as f:
+                data = f.read().decode('utf-8')
+
+        result, expected = read_both(
+            data, skip_duplicates, chunk_size=chunk_size, workers=1)
+        assert result == expected, entry
+
+
+def test_midnight():
+    result, expected = read_both(
+        MIDNIGHT_FLIGHT, True, chunk_size=2, workers=1)
+    fixes = result['fix_records'][1]
+
+    assert [fix['datetime'].day for fix in fixes] == [15, 15, 16, 16, 16, 16, 17]
+    assert result['fix_records'][0] == ['MissingRecordsError']
+
+
+def test_pool():
+    with open(os.path.join(DATA_DIR, 'skytraxx21-2023-04-15.igc'), 'rb') as f:
+        data = f.read().decode('utf-8')
+
+    pool = multiprocessing.pool.ThreadPool(3)
+    try:
+        result, expected = read_both(data, False, chunk_size=100, pool=pool)
+    finally:
+        pool.close()
+
+    assert result == expected
+
+
+def test_processes():
+    with open(os.path.join(DATA_DIR, 'xctrack-2023-04-28.igc'), 'rb') as f:
+        result = read_parallel(f, workers=2, chunk_size=500)
+    with open(os.path.join(DATA_DIR, 'xctrack-2023-04-28.igc'), 'r') as f:
+        expected = Reader().read(f)
+
+    assert result['fix_records'] == expected['fix_records']
+
+
+def test_without_date():
+    with pytest.raises(KeyError):
+        read_parallel(io.StringIO(
+            'B0000105107130N00149304WA002920043304\r\n'), workers=1)
+
+
+def test_integer_coordinates():
+    expected = Reader(integer_coordinates=True).read(
+        io.StringIO(MIDNIGHT_FLIGHT))
+    result = read_parallel(
+        io.StringIO(MIDNIGHT_FLIGHT), chunk_size=2, workers=1,
+        integer_coordinates=True)
+
+    assert result['fix_records'][1] == expected['fix_records'][1]
+    assert result['fix_records'][1][0]['lat'] == 51 * 60000 + 7126
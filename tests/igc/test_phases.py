@@ -0,0 +1,125 @@
+import datetime
+import math
+
+from aerofiles.igc.phases import (
+    Phase, PhaseSegmenter, segment_phases, wrap_angle,
+)
+import aerofiles.igc.phases
+from aerofiles.util.timezone import TimeZoneFix
+import aerofiles.igc.columns
+
+import pytest
+
+
+def synthetic_flight():
+    """
+    Return 1 Hz fixes of a flight that stands on the ground for 60 s,
+    cruises north for 100 s, circles right for 120 s, circles left for
+    120 s, cruises east for 100 s and lands.
+    """
+    start = datetime.datetime(2020, 5, 1, 10, 0, 0, tzinfo=TimeZoneFix(0))
+    # meters per degree latitude
+    m_per_deg = 111195.
+    lat, lon = 50., 8.
+    fixes = []
+
+    def add(t):
+        fixes.append({
+            'datetime': start + datetime.timedelta(seconds=t),
+            'lat': lat, 'lon': lon, 'validity': 'A',
+            'pressure_alt': 500, 'gps_alt': 500,
+        })
+
+    def move(north, east):
+        return (lat + north / m_per_deg,
+                lon + east / (m_per_deg * math.cos(math.radians(lat))))
+
+    t = 0
+    for _ in range(60):
+        add(t)
+        t += 1
+    for _ in range(100):
+        add(t)
+        lat, lon = move(25., 0.)
+        t += 1
+    for direction in (1, -1):
+        heading = 0.
+        for _ in range(120):
+            add(t)
+            # 20 s per circle, 25 m/s
+            heading += direction * 18.
+            lat, lon = move(25. * math.cos(math.radians(heading)),
+                            25. * math.sin(math.radians(heading)))
+            t += 1
+    for _ in range(100):
+        add(t)
+        lat, lon = move(0., 25.)
+        t += 1
+    for _ in range(60):
+        add(t)
+        t += 1
+
+    return fixes
+
+
+def test_wrap_angle():
+    assert wrap_angle(350.) == -10.
+    assert wrap_angle(-190.) == 170.
+    assert wrap_angle(180.) == -180.
+
+
+def test_segment_phases():
+    fixes = synthetic_flight()
+    phases = segment_phases(fixes)
+
+    types = [(p.type, p.direction) for p in phases]
+    assert types == [
+        ('ground', None),
+        ('takeoff', None),
+        ('cruise', None),
+        ('circling', 'right'),
+        ('circling', 'left'),
+        ('cruise', None),
+        ('landing', None),
+        ('ground', None),
+    ]
+
+    # phases are contiguous and cover the whole flight
+    intervals = [p for p in phases if p.type not in ('takeoff', 'landing')]
+    assert intervals[0].start_index == 0
+    assert intervals[-1].end_index == len(fixes)
+    for a, b in zip(intervals, intervals[1:]):
+        assert a.end_index == b.start_index
+        assert a.end_time == b.start_time
+
+    assert phases[1].duration == 0
+    assert 100 <= phases[3].duration <= 140
+
+
+def test_streaming_matches_vectorized():
+    pytest.importorskip('numpy')
+
+    fixes = synthetic_flight()
+    segmenter = PhaseSegmenter()
+    streamed = []
+    for fix in fixes:
+        streamed.extend(segmenter.feed(fix))
+    streamed.extend(segmenter.finish())
+
+    assert streamed == segment_phases(fixes)
+
+
+def test_segment_phases_without_numpy(monkeypatch):
+    fixes = synthetic_flight()
+    expected = segment_phases(fixes)
+
+    monkeypatch.setattr(aerofiles.igc.columns, 'numpy_missing', True)
+    assert segment_phases(fixes) == expected
+
+
+def test_short_flight():
+    fixes = synthetic_flight()[:1]
+    assert segment_phases(fixes) == [
+        Phase('ground', None, 1588327200, 1588327200, 0, 1)
+    ]
+    assert segment_phases([]) == []
@@ -0,0 +1,107 @@
+import datetime
+import math
+
+from aerofiles.igc.proximity import Encounter, find_encounters
+import aerofiles.igc.proximity
+from aerofiles.util import geo
+
+import pytest
+
+
+START = datetime.datetime(2020, 5, 1, 12, 0, 0)
+T0 = 1588334400
+# meters per degree latitude
+M_PER_DEG = math.radians(geo.EARTH_RADIUS)
+
+
+def make_flight(positions):
+    """
+    :param positions: a list of ``(north, alt)`` tuples in meters, one per
+        second, relative to 50N 8E
+    """
+    return [{
+        'datetime': START + datetime.timedelta(seconds=i),
+        'lat': 50. + north / M_PER_DEG, 'lon': 8., 'gps_alt': alt,
+    } for i, (north, alt) in enumerate(positions)]
+
+
+def flights():
+    return [
+        # flies north with 10 m/s
+        make_flight([(10. * i, 1000) for i in range(60)]),
+        # stays at 300 m north and the same altitude
+        make_flight([(304., 1000)] * 60),
+        # stays at 300 m north but 300 m higher
+        make_flight([(304., 1300)] * 60),
+        # stays at 900 m north, close to flight 1 from 10 s to 20 s
+        make_flight([(900., 1000)] * 10 + [(350., 1020)] * 10 +
+                    [(900., 1000)] * 40),
+    ]
+
+
+def test_find_encounters(use_numpy):
+    encounters = find_encounters(flights(), horizontal=100., vertical=200.)
+
+    assert [e[:4] for e in encounters] == [
+        (1, 3, T0 + 10, T0 + 19),
+        (0, 1, T0 + 21, T0 + 40),
+    ]
+
+    encounter = encounters[1]
+    assert encounter.min_distance == pytest.approx(4.)
+    assert encounter.min_distance_time == T0 + 30
+    assert encounter.vertical_separation == 0
+
+    encounter = encounters[0]
+    assert encounter.min_distance == pytest.approx(46.)
+    assert encounter.vertical_separation == 20
+
+
+def test_find_encounters_vertical(use_numpy):
+    encounters = find_encounters(flights(), horizontal=100., vertical=1000.)
+
+    pairs = set((e.flight1, e.flight2) for e in encounters)
+    assert pairs == set([(0, 1), (0, 2), (1, 2), (1, 3), (2, 3)])
+
+
+def test_find_encounters_split(use_numpy):
+    positions = [(0., 1000)] * 5 + [(500., 1000)] * 5 + [(0., 1000)] * 5
+    encounters = find_encounters([
+        make_flight(positions), make_flight([(20., 1000)] * 15),
+    ])
+
+    assert encounters == [
+        Encounter(0, 1, T0, T0 + 4, pytest.approx(20.), T0, 0),
+        Encounter(0, 1, T0 + 10, T0 + 14, pytest.approx(20.), T0 + 10, 0),
+    ]
+
+
+def test_find_encounters_chunks(use_numpy, monkeypatch):
+    expected = find_encounters(flights(), horizontal=100., vertical=1000.)
+
+    # encounters continue across the chunk boundaries
+    monkeypatch.setattr(aerofiles.igc.proximity, 'CHUNK_SIZE', 7)
+    assert find_encounters(
+        flights(), horizontal=100., vertical=1000.) == expected
+
+
+def test_find_encounters_min_speed(use_numpy):
+    flights = [
+        # two gliders flying north with 10 m/s, 50 m apart
+        make_flight([(10. * i, 1000) for i in range(60)]),
+        make_flight([(10. * i + 50., 1000) for i in range(60)]),
+        # a glider parked at 300 m north
+        make_flight([(300., 1000)] * 60),
+    ]
+
+    pairs = set((e.flight1, e.flight2) for e in find_encounters(flights))
+    assert pairs == set([(0, 1), (0, 2), (1, 2)])
+
+    assert find_encounters(flights, min_speed=5.) == [
+        Encounter(0, 1, T0, T0 + 59, pytest.approx(50.), T0, 0),
+    ]
+
+
+def test_find_no_encounters(use_numpy):
+    assert find_encounters([make_flight([(0., 1000)] * 5), []]) == []
+    assert find_encounters([]) == []
@@ -0,0 +1,141 @@
+import json
+import math
+import os
+
+from aerofiles.igc import Reader, TrackPyramid
+from aerofiles.igc.pyramid import importances
+
+import pytest
+
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), 'data')
+
+
+@pytest.fixture
+def fixes():
+    with open(os.path.join(DATA_DIR, 'xctrack-2023-04-28.igc'), 'r') as f:
+        return Reader().read(f)['fix_records'][1]
+
+
+def segment_distance(px, py, ax, ay, bx, by):
+    dx, dy = bx - ax, by - ay
+    length = dx * dx + dy * dy
+    t = 0. if length == 0 else \
+        min(1., max(0., ((px - ax) * dx + (py - ay) * dy) / length))
+    return math.hypot(px - ax - t * dx, py - ay - t * dy)
+
+
+def douglas_peucker(x, y, tolerance, first, last):
+    if last - first < 2:
+        return [first, last]
+
+    distances = [
+        segment_distance(x[i], y[i], x[first], y[first], x[last], y[last])
+        for i in range(first + 1, last)
+    ]
+    distance = max(distances)
+    if distance <= tolerance:
+        return [first, last]
+
+    index = first + 1 + distances.index(distance)
+    return douglas_peucker(x, y, tolerance, first, index)[:-1] + \
+        douglas_peucker(x, y, tolerance, index, last)
+
+
+def test_importances(use_numpy):
+    x = [0., 1., 2., 3., 4., 5., 6.]
+    y = [0., 0.5, 0., 3., 0., 0.1, 0.]
+
+    assert importances(x, y)[0] == float('inf')
+    assert importances(x, y)[-1] == float('inf')
+    assert importances(x, y)[3] == 3.
+    for tolerance in (0., 0.1, 0.4, 1., 5.):
+        kept = [i for i, value in enumerate(importances(x, y))
+                if value > tolerance]
+        assert kept == douglas_peucker(x, y, tolerance, 0, len(x) - 1)
+
+    assert importances([], []) == []
+    assert importances([1.], [1.]) == [float('inf')]
+
+
+def test_levels(use_numpy, fixes):
+    pyramid = TrackPyramid.build(fixes, tolerances=(5, 500, 50))
+    assert pyramid.tolerances == [500, 50, 5]
+    assert len(pyramid) == 3
+
+    sizes = [len(level) for level in pyramid.levels]
+    assert sizes[0] < sizes[1] < sizes[2] == len(pyramid.indexes)
+    assert len(pyramid.indexes) < len(fixes)
+    assert pyramid.indexes[0] == 0
+    assert pyramid.indexes[-1] == len(fixes) - 1
+
+    # the levels are nested
+    for coarse, fine in zip(pyramid.levels, pyramid.levels[1:]):
+        assert set(coarse) <= set(fine)
+
+    # every fix is within the tolerance of the simplified track
+    y_scale = math.radians(6371000.)
+    x_scale = y_scale * math.cos(math.radians(
+        sum(fix['lat'] for fix in fixes) / len(fixes)))
+    for level, tolerance in zip(pyramid.levels, pyramid.tolerances):
+        kept = [pyramid.indexes[position] for position in level]
+        for a, b in zip(kept, kept[1:]):
+            for fix in fixes[a + 1:b]:
+                assert segment_distance(
+                    fix['lon'] * x_scale, fix['lat'] * y_scale,
+                    fixes[a]['lon'] * x_scale, fixes[a]['lat'] * y_scale,
+                    fixes[b]['lon'] * x_scale, fixes[b]['lat'] * y_scale,
+                ) <= tolerance + 1e-6
+
+
+def test_level_for(fixes):
+    pyramid = TrackPyramid.build(fixes[:100], tolerances=(500, 50, 5))
+    assert pyramid.level_for(1000) == 0
+    assert pyramid.level_for(500) == 0
+    assert pyramid.level_for(100) == 1
+    assert pyramid.level_for(1) == 2
+
+
+def test_lines(fixes):
+    pyramid = TrackPyramid.build(fixes, block_size=8)
+    level = len(pyramid) - 1
+    positions = pyramid.levels[level]
+
+    whole = pyramid.lines(level)
+    assert len(whole) == 1
+    assert [point[0] for point in whole[0]] == \
+        [pyramid.time[p] for p in positions]
+
+    fix = fixes[len(fixes) // 2]
+    bbox = (fix['lat'] - 0.001, fix['lon'] - 0.001,
+            fix['lat'] + 0.001, fix['lon'] + 0.001)
+    ranges = pyramid.ranges(level, bbox)
+    assert 0 < sum(end - start for start, end in ranges) < len(positions)
+
+    # all points inside the bounding box are returned
+    inside = set(
+        p for p in positions
+        if bbox[0] <= pyramid.lat[p] <= bbox[2] and
+        bbox[1] <= pyramid.lon[p] <= bbox[3])
+    returned = set()
+    for start, end in ranges:
+        returned.update(positions[start:end])
+    assert inside and inside <= returned
+
+    assert pyramid.ranges(level, (0., 0., 1., 1.)) == []
+
+
+def test_serialization(fixes):
+    pyramid = TrackPyramid.build(fixes, tolerances=(100, 10))
+    data = json.loads(json.dumps(pyramid.to_dict()))
+    loaded = TrackPyramid.from_dict(data)
+
+    assert loaded.to_dict() == pyramid.to_dict()
+    assert loaded.blocks == pyramid.blocks
+
+
+def test_empty():
+    pyramid = TrackPyramid.build([])
+    assert pyramid.levels == [[]] * len(pyramid)
+    assert pyramid.lines(0) == []
+    assert pyramid.ranges(0, (0., 0., 1., 1.)) == []
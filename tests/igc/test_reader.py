@@ -2,10 +2,12 @@
 
 import copy
 import datetime
+import io
 import os
 
 from aerofiles.igc.reader import LowLevelReader
 from aerofiles.igc.reader import Reader
+from aerofiles.igc.writer import Writer
 
 import pytest
 
@@ -644,6 +646,51 @@ def test_decode_longitude():
     assert LowLevelReader.decode_longitude('09942706W') == -99.71176666666666
 
 
+def test_decode_latitude_milliminutes():
+    assert LowLevelReader.decode_latitude_milliminutes('5117983N') == 3077983
+    assert LowLevelReader.decode_latitude_milliminutes('3356767S') == -2036767
+
+    with pytest.raises(ValueError):
+        LowLevelReader.decode_latitude_milliminutes('9000001N')
+
+
+def test_decode_longitude_milliminutes():
+    assert LowLevelReader.decode_longitude_milliminutes('00657383E') == 417383
+    assert LowLevelReader.decode_longitude_milliminutes('09942706W') == -5982706
+
+    with pytest.raises(ValueError):
+        LowLevelReader.decode_longitude_milliminutes('18000001E')
+
+
+def test_integer_coordinates_round_trip():
+    cur_dir = os.path.dirname(__file__)
+    directory = os.path.join(cur_dir, 'data')
+    for entry in os.listdir(directory):
+        if not entry.endswith('.igc') or entry == 'bad-line.igc':
+            continue
+
+        with open(os.path.join(directory, entry), 'r') as f:
+            lines = [line for line in f if line.startswith('B')]
+            f.seek(0)
+            result = Reader(integer_coordinates=True).read(f)
+            f.seek(0)
+            expected = Reader().read(f)
+
+        output = io.BytesIO()
+        writer = Writer(output, integer_coordinates=True)
+        for fix, expected_fix in zip(result['fix_records'][1],
+                                     expected['fix_records'][1]):
+            assert isinstance(fix['lat'], int)
+            assert fix['lat'] / 60000. == pytest.approx(expected_fix['lat'])
+            assert fix['lon'] / 60000. == pytest.approx(expected_fix['lon'])
+            writer.write_fix(
+                fix['time'], fix['lat'], fix['lon'], fix['validity'] == 'A',
+                fix['pressure_alt'], fix['gps_alt'])
+
+        written = output.getvalue().decode('ascii').splitlines()
+        assert written == [line[:35] for line in lines], entry
+
+
 def test_highlevel_reader():
     reader = Reader()
 
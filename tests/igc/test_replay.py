@@ -0,0 +1,180 @@
+import asyncio
+import datetime
+import os
+import time
+
+from aerofiles.igc import Reader
+from aerofiles.igc.columns import fix_timestamp
+from aerofiles.igc.replay import FixFileSource, FixListSource, ReplayEngine
+
+import pytest
+
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), 'data')
+START = datetime.datetime(2020, 5, 1, 12, 0, 0)
+
+
+def read_fixes(name):
+    with open(os.path.join(DATA_DIR, name), 'r') as f:
+        return Reader().read(f)['fix_records'][1]
+
+
+def synthetic_flight(count, step=1, start=START):
+    return [{'datetime': start + datetime.timedelta(seconds=i * step)}
+            for i in range(count)]
+
+
+def replay(engine):
+    return asyncio.run(engine.run())
+
+
+def test_merged_order():
+    first = read_fixes('skydrop-2019-04-15.igc')
+    second = read_fixes('xctrack-2020-09-04.igc')
+    offset = fix_timestamp(first[0]) - fix_timestamp(second[0]) + 30
+
+    emitted = []
+    engine = ReplayEngine(
+        lambda flight_id, fix: emitted.append((flight_id, fix_timestamp(fix) + (
+            offset if flight_id == 'second' else 0))),
+        speed=1e6)
+    assert engine.add(first) == 0
+    assert engine.add({'fix_records': [[], second]}, 'second', offset) == \
+        'second'
+    assert engine.add(os.path.join(DATA_DIR, 'skydrop-2019-04-15.igc'),
+                      'file') == 'file'
+
+    assert replay(engine) == 2 * len(first) + len(second)
+    engine.close()
+
+    assert [t for _, t in emitted] == sorted(t for _, t in emitted)
+    assert [t for i, t in emitted if i == 0] == \
+        [fix_timestamp(fix) for fix in first]
+    assert [t for i, t in emitted if i == 'second'] == \
+        [fix_timestamp(fix) + offset for fix in second]
+    assert [t for i, t in emitted if i == 'file'] == \
+        [fix_timestamp(fix) for fix in first]
+
+
+@pytest.mark.parametrize('window', [1, 60, 10000])
+def test_file_source(window):
+    path = os.path.join(DATA_DIR, 'xctrack-2023-04-28.igc')
+    fixes = read_fixes('xctrack-2023-04-28.igc')
+
+    source = FixFileSource(path, window=window)
+    result = []
+    item = source.next()
+    while item is not None:
+        result.append(item[1])
+        item = source.next()
+    assert result == fixes
+
+    middle = fix_timestamp(fixes[len(fixes) // 2])
+    source.seek(middle)
+    assert source.next()[0] == middle
+    source.close()
+
+
+def test_file_source_next_day():
+    # wraps twice: 16:03 -> 22:02 -> 16:02 on the next day
+    fixes = read_fixes('example.igc')
+
+    source = FixFileSource(
+        os.path.join(DATA_DIR, 'example.igc'), window=3600)
+    assert (source.start_time, source.end_time) == \
+        (fix_timestamp(fixes[0]), fix_timestamp(fixes[-1]))
+
+    result = []
+    item = source.next()
+    while item is not None:
+        result.append(item[1])
+        item = source.next()
+    source.close()
+    assert result == fixes
+
+
+def test_speed():
+    emitted = []
+    engine = ReplayEngine(
+        lambda flight_id, fix: emitted.append(time.monotonic()), speed=100.)
+    engine.add(synthetic_flight(11))
+
+    start = time.monotonic()
+    replay(engine)
+    assert len(emitted) == 11
+    assert emitted[-1] - start >= 0.1 - 0.01
+    assert emitted[-1] - start < 1.
+
+
+def test_pause_and_resume():
+    emitted = []
+
+    async def on_fix(flight_id, fix):
+        emitted.append(fix_timestamp(fix))
+        if len(emitted) == 3:
+            engine.pause()
+            clock = engine.time
+            await asyncio.sleep(0.05)
+            assert engine.time == clock
+            asyncio.get_running_loop().call_later(0.05, engine.resume)
+
+    engine = ReplayEngine(on_fix, speed=1e6)
+    engine.add(synthetic_flight(10))
+
+    start = time.monotonic()
+    assert replay(engine) == 10
+    assert time.monotonic() - start >= 0.1 - 0.01
+
+
+def test_seek_and_speed_change():
+    fixes = synthetic_flight(10)
+    times = [fix_timestamp(fix) for fix in fixes]
+    emitted = []
+
+    def on_fix(flight_id, fix):
+        emitted.append(fix_timestamp(fix))
+        if len(emitted) == 5:
+            engine.seek(times[2])
+        elif len(emitted) == 8:
+            engine.seek(times[9])
+            engine.speed = 1e6
+
+    engine = ReplayEngine(on_fix, speed=1000.)
+    engine.add(FixListSource(fixes))
+    replay(engine)
+
+    assert emitted == times[:5] + times[2:5] + times[9:]
+    assert engine.time >= times[9]
+
+
+def test_seek_before_run_and_add_while_running():
+    emitted = []
+
+    def on_fix(flight_id, fix):
+        emitted.append((flight_id, fix_timestamp(fix)))
+        if len(emitted) == 1:
+            later = START + datetime.timedelta(seconds=5)
+            engine.add(synthetic_flight(3, start=later), 'late')
+
+    engine = ReplayEngine(on_fix, speed=100.)
+    engine.add(synthetic_flight(10))
+    engine.seek(fix_timestamp({'datetime': START}) + 4)
+    replay(engine)
+
+    t0 = fix_timestamp({'datetime': START})
+    assert [t - t0 for i, t in emitted if i == 0] == [4, 5, 6, 7, 8, 9]
+    assert [t - t0 for i, t in emitted if i == 'late'] == [5, 6, 7]
+
+
+def test_many_flights():
+    emitted = [0]
+
+    def on_fix(flight_id, fix):
+        emitted[0] += 1
+
+    engine = ReplayEngine(on_fix, speed=1e6)
+    for i in range(1000):
+        engine.add(synthetic_flight(20, step=2), offset=i % 7)
+
+    assert replay(engine) == 20000
+    assert emitted[0] == 20000
@@ -0,0 +1,84 @@
+import datetime
+import math
+
+from aerofiles.igc.resampling import Gap, find_gaps, resample
+
+import pytest
+
+
+START = datetime.datetime(2020, 5, 1, 12, 0, 0)
+T0 = 1588334400
+
+
+def make_fixes(offsets):
+    return [{
+        'datetime': START + datetime.timedelta(seconds=offset),
+        'lat': 50. + offset / 100., 'lon': 8. - offset / 100.,
+        'validity': 'A' if offset % 2 == 0 else 'V',
+        'pressure_alt': 1000 + offset, 'gps_alt': 1100 + offset,
+        'ENL': offset,
+    } for offset in offsets]
+
+
+def tolist(column):
+    return [None if value is None or value != value else value
+            for value in list(column)]
+
+
+def test_find_gaps(use_numpy):
+    fixes = make_fixes([0, 1, 2, 20, 21, 40])
+    assert find_gaps(fixes, max_interval=10) == [
+        Gap(T0 + 2, T0 + 20, 2, 3),
+        Gap(T0 + 21, T0 + 40, 4, 5),
+    ]
+    assert find_gaps(fixes, max_interval=18)[0].duration == 19
+    assert find_gaps(make_fixes([0])) == []
+
+
+def test_resample(use_numpy):
+    columns = resample(make_fixes([0, 4, 5, 7]), interval=1)
+
+    assert tolist(columns['time']) == [T0 + i for i in range(8)]
+    assert columns['lat'][2] == pytest.approx(50.02)
+    assert columns['lon'][6] == pytest.approx(7.94)
+    assert tolist(columns['pressure_alt']) == [
+        1000, 1001, 1002, 1003, 1004, 1005, 1006, 1007,
+    ]
+    assert tolist(columns['gps_alt'])[3] == 1103
+    # nearest value, ties go to the earlier fix
+    assert tolist(columns['ENL']) == [0, 0, 0, 4, 4, 5, 5, 7]
+    assert tolist(columns['validity']) == [
+        True, True, True, True, True, False, False, False,
+    ]
+
+
+def test_resample_interval(use_numpy):
+    columns = resample(make_fixes([0, 1, 2, 3, 4, 5]), interval=2)
+    assert tolist(columns['time']) == [T0, T0 + 2, T0 + 4]
+    assert tolist(columns['ENL']) == [0, 2, 4]
+
+
+def test_resample_max_gap(use_numpy):
+    columns = resample(make_fixes([0, 2, 10, 11]), max_gap=5)
+
+    assert len(columns['time']) == 12
+    assert tolist(columns['gps_alt']) == [
+        1100, 1101, 1102, None, None, None, None, None, None, None, 1110,
+        1111,
+    ]
+    assert tolist(columns['ENL'])[3] is None
+    assert not columns['validity'][3]
+
+
+def test_resample_empty(use_numpy):
+    columns = resample([])
+    assert len(columns['time']) == 0
+    assert len(columns['lat']) == 0
+
+
+def test_resample_nan_free():
+    numpy = pytest.importorskip('numpy')
+
+    columns = resample(make_fixes(range(0, 100, 3)))
+    assert not numpy.isnan(columns['lat']).any()
+    assert not any(math.isnan(value) for value in columns['ENL'])
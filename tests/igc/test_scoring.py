@@ -0,0 +1,123 @@
+import json
+import os
+
+from aerofiles.igc import Reader, TaskScorer, TaskStatus
+
+import pytest
+
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), 'data')
+
+# start, one turnpoint and the finish, 0.1 degrees (about 11 km) apart
+POINTS = [(50., 8.), (50.1, 8.), (50., 8.)]
+
+
+def track():
+    """
+    Return ``(time, lat, lon)`` tuples of a flight around the task: leaving
+    the start, returning to it, restarting, reaching the turnpoint and
+    finishing.
+    """
+    lats = [50., 50.002, 50.01, 50.002, 50.01, 50.05, 50.1, 50.05, 50.]
+    return [(1000 + 100 * i, lat, 8.) for i, lat in enumerate(lats)]
+
+
+def feed(scorer, fixes):
+    return [scorer.feed_values(*fix) for fix in fixes]
+
+
+def test_progress():
+    scorer = TaskScorer(POINTS, radius=500.)
+    assert 22000 < scorer.distance < 22500
+    assert scorer.status() == \
+        TaskStatus(None, 0, 0, scorer.distance, None, None, None)
+
+    statuses = feed(scorer, track())
+
+    assert [s.achieved for s in statuses] == [0, 0, 1, 1, 1, 1, 2, 2, 3]
+    assert [s.leg for s in statuses] == [0, 0, 1, 1, 1, 1, 2, 2, 2]
+    assert [s.start_time for s in statuses] == \
+        [None, None, 1200, 1200, 1400, 1400, 1400, 1400, 1400]
+    assert not statuses[1].started
+    assert statuses[2].started and not statuses[7].finished
+    assert statuses[-1].finished
+    assert statuses[-1].finish_time == 1800
+    assert scorer.point_times == [1400, 1600, 1800]
+
+    # the remaining distance decreases after the restart
+    remaining = [s.distance_remaining for s in statuses[4:]]
+    assert remaining == sorted(remaining, reverse=True)
+    assert remaining[-1] == 0.
+    assert statuses[1].distance_remaining == scorer.distance
+    assert statuses[5].distance_remaining == pytest.approx(
+        scorer.distance * 0.75, rel=1e-3)
+
+    assert statuses[1].speed is None
+    assert statuses[-1].speed == pytest.approx(scorer.distance / 400)
+
+    # fixes after the finish do not change the result
+    status = scorer.feed_values(2000, 50.05, 8.)
+    assert status.finish_time == 1800
+    assert status.speed == statuses[-1].speed
+
+
+def test_radii():
+    scorer = TaskScorer(POINTS, radius=100., finish_radius=2000.)
+    statuses = feed(scorer, track()[:-1] + [(1800, 50.015, 8.)])
+    assert statuses[6].achieved == 2
+    assert statuses[-1].finished
+
+    scorer = TaskScorer(POINTS, start_radius=2000.)
+    statuses = feed(scorer, track())
+    assert statuses[2].start_time is None
+    assert statuses[5].start_time == 1500
+
+
+def test_resume():
+    fixes = track()
+    scorer = TaskScorer(POINTS)
+    expected = feed(scorer, fixes)
+
+    for split in range(len(fixes)):
+        scorer = TaskScorer(POINTS)
+        feed(scorer, fixes[:split])
+        data = json.loads(json.dumps(scorer.to_dict()))
+        resumed = TaskScorer.from_dict(data)
+        assert resumed.to_dict() == scorer.to_dict()
+        assert feed(resumed, fixes[split:]) == expected[split:]
+
+
+def test_from_task():
+    with open(os.path.join(DATA_DIR, 'example.igc'), 'r') as f:
+        task = Reader().read(f)['task'][1]
+
+    scorer = TaskScorer.from_task(task, radius=1000.)
+    assert scorer.legs == 3
+    assert scorer.points[0] == scorer.points[-1] == \
+        (task['waypoints'][1]['latitude'], task['waypoints'][1]['longitude'])
+    assert 500000 < scorer.distance < 520000
+
+    scorer = TaskScorer.from_task({'waypoints': [
+        {'latitude': 0., 'longitude': 0.},
+        {'latitude': 50., 'longitude': 8.},
+        {'latitude': 50.1, 'longitude': 8.},
+        {'latitude': 0., 'longitude': 0.},
+    ]})
+    assert scorer.points == [(50., 8.), (50.1, 8.)]
+
+    with pytest.raises(ValueError):
+        TaskScorer([(50., 8.)])
+
+
+def test_feed_fix_records():
+    with open(os.path.join(DATA_DIR, 'xctrack-2023-04-28.igc'), 'r') as f:
+        fixes = Reader().read(f)['fix_records'][1]
+
+    first, middle, last = fixes[0], fixes[len(fixes) // 2], fixes[-1]
+    scorer = TaskScorer([
+        (first['lat'], first['lon']), (middle['lat'], middle['lon']),
+        (last['lat'], last['lon'])], radius=50.)
+
+    statuses = [scorer.feed(fix) for fix in fixes]
+    assert statuses[-1].achieved >= 1
+    assert all(a.achieved <= b.achieved for a, b in zip(statuses, statuses[1:]))
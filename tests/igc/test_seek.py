@@ -0,0 +1,153 @@
+import datetime
+import io
+import mmap
+import os
+
+from aerofiles.igc import Reader, read_fixes_between, read_time_range
+from aerofiles.igc.columns import fix_timestamp
+
+import pytest
+
+
+DATA = os.path.join(os.path.dirname(__file__), 'data')
+
+MIDNIGHT_FLIGHT = (
+    b'AXXXABC FLIGHT:1\r\n'
+    b'HFDTE150320\r\n'
+    b'HFTZNTIMEZONE:+2.00\r\n'
+    b'I013638FXA\r\n'
+    b'B2359505107126N00149300WA002880042900\r\n'
+    b'B2359555107127N00149301WA002890043001\r\n'
+    b'E2359560PEV\r\n'
+    b'B0000005107128N00149302WA002900043102\r\n'
+    b'B0000055107129N00149303WA002910043203\r\n'
+    b'B0000105107130N00149304WA002920043304\r\n'
+    b'GABCDEF\r\n'
+)
+
+
+def read_fixes(data):
+    return Reader().read(io.StringIO(data.decode('utf-8')))['fix_records'][1]
+
+
+def expected_fixes(fixes, start, end):
+    return [fix for fix in fixes if start <= fix_timestamp(fix) <= end]
+
+
+@pytest.mark.parametrize('filename', [
+    'skydrop-2019-04-15.igc', 'xctrack-2020-09-04.igc', 'skytraxx21-2023-04-15.igc',
+    # wraps twice: 16:03 -> 22:02 -> 16:02 on the next day
+    'example.igc',
+])
+def test_windows(filename):
+    with open(os.path.join(DATA, filename), 'rb') as f:
+        data = f.read()
+
+    fixes = read_fixes(data)
+    times = [fix_timestamp(fix) for fix in fixes]
+    windows = [
+        (times[0] - 100, times[0] - 1),
+        (times[0] - 100, times[0]),
+        (times[0], times[-1]),
+        (times[len(times) // 3], times[len(times) // 2]),
+        (times[len(times) // 2] + 1, times[len(times) // 2] + 1),
+        (times[-1], times[-1] + 100),
+        (times[-1] + 1, times[-1] + 100),
+    ]
+    for start, end in windows:
+        assert read_fixes_between(io.BytesIO(data), start, end) == \
+            expected_fixes(fixes, start, end)
+
+
+def test_midnight():
+    fixes = read_fixes(MIDNIGHT_FLIGHT)
+    start = datetime.datetime(2020, 3, 15, 23, 59, 55)
+    end = datetime.datetime(2020, 3, 16, 0, 0, 5)
+
+    result = read_fixes_between(io.BytesIO(MIDNIGHT_FLIGHT), start, end)
+
+    assert [fix['datetime'].replace(tzinfo=None) for fix in result] == [
+        datetime.datetime(2020, 3, 15, 23, 59, 55),
+        datetime.datetime(2020, 3, 16, 0, 0, 0),
+        datetime.datetime(2020, 3, 16, 0, 0, 5),
+    ]
+    assert result == fixes[1:4]
+    assert result[0]['FXA'] == 1
+    assert 'datetime_local' in result[0]
+
+    after_midnight = read_fixes_between(
+        io.BytesIO(MIDNIGHT_FLIGHT), end, end + datetime.timedelta(hours=1))
+    assert after_midnight == fixes[3:]
+
+
+def test_mmap(tmpdir):
+    path = str(tmpdir.join('flight.igc'))
+    with open(path, 'wb') as f:
+        f.write(MIDNIGHT_FLIGHT)
+
+    fixes = read_fixes(MIDNIGHT_FLIGHT)
+    with open(path, 'rb') as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            start = fix_timestamp(fixes[2])
+            result = read_fixes_between(mapped, start, start + 5)
+        finally:
+            mapped.close()
+
+    assert result == fixes[2:4]
+
+
+def test_without_fixes():
+    data = b'AXXXABC FLIGHT:1\r\nHFDTE150320\r\n'
+    assert read_fixes_between(io.BytesIO(data), 0, 2 ** 40) == []
+    assert read_time_range(io.BytesIO(data)) is None
+
+
+@pytest.mark.parametrize('filename', [
+    'skydrop-2019-04-15.igc', 'skytraxx21-2023-04-15.igc', 'example.igc',
+])
+def test_time_range(filename):
+    with open(os.path.join(DATA, filename), 'rb') as f:
+        data = f.read()
+
+    fixes = read_fixes(data)
+    assert read_time_range(io.BytesIO(data)) == \
+        (fix_timestamp(fixes[0]), fix_timestamp(fixes[-1]))
+
+    fixes = read_fixes(MIDNIGHT_FLIGHT)
+    assert read_time_range(io.BytesIO(MIDNIGHT_FLIGHT)) == \
+        (fix_timestamp(fixes[0]), fix_timestamp(fixes[-1]))
+
+
+def test_time_range_next_day():
+    with open(os.path.join(DATA, 'example.igc'), 'rb') as f:
+        assert read_time_range(f) == (995299360, 995385772)
+
+
+def test_without_date():
+    data = b'B2359505107126N00149300WA002880042900\r\n'
+    with pytest.raises(ValueError):
+        read_fixes_between(io.BytesIO(data), 0, 2 ** 40)
+
+
+class CountingFile(io.BytesIO):
+    def __init__(self, data):
+        io.BytesIO.__init__(self, data)
+        self.reads = 0
+
+    def readline(self, *args):
+        self.reads += 1
+        return io.BytesIO.readline(self, *args)
+
+
+def test_number_of_reads():
+    lines = [b'HFDTE150320\r\n']
+    for i in range(20000):
+        lines.append(b'B%02d%02d%02d5107126N00149300WA0028800429\r\n' % (
+            i // 3600, i // 60 % 60, i % 60))
+    f = CountingFile(b''.join(lines))
+
+    fixes = read_fixes_between(f, 1584230400 + 10000, 1584230400 + 10009)
+
+    assert len(fixes) == 10
+    assert f.reads < 100
@@ -0,0 +1,205 @@
+import asyncio
+import concurrent.futures
+import os
+import sys
+
+import pytest
+
+pytestmark = pytest.mark.skipif(
+    sys.version_info < (3, 7), reason='requires Python 3.7')
+
+if sys.version_info >= (3, 7):
+    from aerofiles.igc.service import (
+        IngestionService, percentile, post, run_load, summarize,
+    )
+
+
+def example():
+    path = os.path.join(os.path.dirname(__file__), 'data', 'example.igc')
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def run_with_service(test, **kwargs):
+    async def main():
+        kwargs.setdefault('workers', 2)
+        service = IngestionService(**kwargs)
+        await service.start('127.0.0.1', 0)
+        try:
+            return await test(service)
+        finally:
+            await service.close()
+
+    return asyncio.run(main())
+
+
+async def request(service, body, path='/'):
+    reader, writer = await asyncio.open_connection('127.0.0.1', service.port)
+    try:
+        return await post(reader, writer, '127.0.0.1', path, body)
+    finally:
+        writer.close()
+
+
+def test_summarize():
+    summary = summarize(example())
+
+    assert summary['pilot'] == 'Bloggs Bill D'
+    assert summary['date'] == '2001-07-16'
+    assert summary['num_fixes'] == 10
+    assert summary['first_fix'] == '2001-07-16T16:02:40+00:00'
+    assert summary['duration'] == 86412
+    assert summary['max_gps_alt'] == 439
+    assert summary['errors'] == []
+    assert len(summary['fingerprint']) == 40
+
+
+def test_upload():
+    stored = []
+
+    async def test(service):
+        return await request(service, example())
+
+    status, summary = run_with_service(test, on_summary=stored.append)
+    assert status == 200
+    assert summary['num_fixes'] == 10
+    assert stored == [summary]
+
+
+async def raw_request(service, data):
+    reader, writer = await asyncio.open_connection('127.0.0.1', service.port)
+    writer.write(data)
+    response = await reader.read()
+    writer.close()
+    return response
+
+
+def test_errors():
+    async def test(service):
+        return await asyncio.gather(
+            raw_request(service, b'GET / HTTP/1.1\r\nConnection: close\r\n\r\n'),
+            raw_request(service, b'POST / HTTP/1.1\r\nContent-Length: 2000\r\n\r\n'),
+            raw_request(service, b'POST / HTTP/1.1\r\n\r\n'),
+            request(service, b'', path='/unknown'),
+            raw_request(service, b'POST / HTTP/1.1\r\nContent-Length: abc\r\n\r\n'),
+            raw_request(service, b'POST / HTTP/1.1\r\nContent-Length: -5\r\n\r\n'),
+        )
+
+    responses = run_with_service(test, max_upload_size=1000)
+    assert responses[0].startswith(b'HTTP/1.1 405 Method Not Allowed\r\n')
+    assert responses[1].startswith(b'HTTP/1.1 413 Payload Too Large\r\n')
+    assert responses[2].startswith(b'HTTP/1.1 411 Length Required\r\n')
+    assert responses[3][0] == 404
+    assert responses[4].startswith(b'HTTP/1.1 400 Bad Request\r\n')
+    assert responses[4].endswith(b'{"error": "Invalid Content-Length"}')
+    assert responses[5].startswith(b'HTTP/1.1 400 Bad Request\r\n')
+
+
+def test_internal_error():
+    def on_summary(summary):
+        raise RuntimeError('database is down')
+
+    async def test(service):
+        return await request(service, example())
+
+    status, payload = run_with_service(
+        test, executor=concurrent.futures.ThreadPoolExecutor(1),
+        on_summary=on_summary)
+    assert status == 500
+    assert payload == {'error': 'Internal Server Error'}
+
+
+def test_invalid_file():
+    async def test(service):
+        # a fix without date header
+        return await request(
+            service, b'B1602405407121N00249342WA002800042120509950\r\n')
+
+    status, payload = run_with_service(
+        test, executor=concurrent.futures.ThreadPoolExecutor(1))
+    assert status == 400
+    assert payload['error'].startswith('Invalid IGC file')
+
+
+def test_backpressure():
+    async def test(service):
+        loop = asyncio.get_running_loop()
+        blocker = loop.create_future()
+        service.on_summary = lambda summary: blocker
+
+        # the first upload blocks the only worker
+        first = asyncio.ensure_future(request(service, example()))
+        await asyncio.sleep(0.2)
+
+        loop.call_later(0.3, blocker.set_result, None)
+        others = await asyncio.gather(
+            *[request(service, example()) for _ in range(4)])
+        return [await first] + others
+
+    results = run_with_service(
+        test, workers=1, queue_size=2,
+        executor=concurrent.futures.ThreadPoolExecutor(1))
+    statuses = [status for status, _ in results]
+    # one upload is processed, two are queued and the rest is rejected
+    assert sorted(statuses) == [200, 200, 200, 503, 503]
+
+
+def test_close_idle_connection():
+    async def main():
+        service = IngestionService(
+            workers=1, executor=concurrent.futures.ThreadPoolExecutor(1))
+        await service.start('127.0.0.1', 0)
+        reader, writer = await asyncio.open_connection(
+            '127.0.0.1', service.port)
+        try:
+            status, _ = await post(
+                reader, writer, '127.0.0.1', '/', example())
+            # the keep-alive connection is idle now
+            await asyncio.wait_for(service.close(), 5)
+            return status, await asyncio.wait_for(reader.read(), 5)
+        finally:
+            writer.close()
+
+    assert asyncio.run(main()) == (200, b'')
+
+
+def test_close_pending_uploads():
+    async def on_summary(summary):
+        await asyncio.Event().wait()
+
+    async def main():
+        service = IngestionService(
+            workers=1, executor=concurrent.futures.ThreadPoolExecutor(1),
+            on_summary=on_summary)
+        await service.start('127.0.0.1', 0)
+
+        # the first upload blocks the only worker, the second is queued
+        uploads = [
+            asyncio.ensure_future(request(service, example()))
+            for _ in range(2)
+        ]
+        await asyncio.sleep(0.2)
+        await asyncio.wait_for(service.close(), 5)
+        return await asyncio.wait_for(asyncio.gather(*uploads), 5)
+
+    assert asyncio.run(main()) == [
+        (503, {'error': 'Service is shutting down'}),
+    ] * 2
+
+
+def test_run_load():
+    async def test(service):
+        url = 'http://127.0.0.1:%d/' % service.port
+        return await run_load(url, [example()], requests=20, concurrency=4)
+
+    stats = run_with_service(test)
+    assert stats['requests'] == 20
+    assert stats['errors'] == 0
+    assert stats['requests_per_second'] > 0
+    assert 0 < stats['p50'] <= stats['p99'] <= stats['max']
+
+
+def test_percentile():
+    assert percentile([1, 2, 3, 4], 0.5) == 2
+    assert percentile([1, 2, 3, 4], 0.99) == 4
+    assert percentile([], 0.5) is None
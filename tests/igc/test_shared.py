@@ -0,0 +1,135 @@
+import multiprocessing.pool
+import os
+import pickle
+
+from aerofiles.igc import Reader
+from aerofiles.igc.columns import fix_columns
+import aerofiles.igc.shared
+from aerofiles.igc.shared import SharedColumns, read_shared
+import aerofiles.igc.columns
+
+import pytest
+
+
+numpy = pytest.importorskip('numpy')
+shared_memory = pytest.importorskip('multiprocessing.shared_memory')
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), 'data')
+NAMES = [
+    'example.igc', 'skydrop-2019-04-15.igc', 'xctrack-2023-04-28.igc',
+    'skytraxx21-2023-04-15.igc',
+]
+PATHS = [os.path.join(DATA_DIR, name) for name in NAMES]
+
+
+def read(path):
+    with open(path, 'r') as f:
+        return Reader().read(f)
+
+
+def exists(name):
+    try:
+        shared_memory.SharedMemory(name).close()
+    except OSError:
+        return False
+    return True
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_read_shared(workers):
+    with read_shared(PATHS, workers=workers) as flights:
+        assert [flight.path for flight in flights] == PATHS
+
+        for path, flight in zip(PATHS, flights):
+            expected = read(path)
+            fixes = expected['fix_records'][1]
+            assert flight['header'] == expected['header']
+            assert flight['task'] == expected['task']
+            assert flight['fix_records'] == \
+                [expected['fix_records'][0], None]
+
+            columns = fix_columns(fixes)
+            assert sorted(flight.columns) == sorted(columns)
+            for name, values in columns.items():
+                assert flight.columns[name].dtype == values.dtype
+                numpy.testing.assert_array_equal(flight.columns[name], values)
+
+        names = [flight.handle.name for flight in flights]
+        assert all(exists(name) for name in names)
+        del columns, values
+
+    assert not any(exists(name) for name in names)
+
+    # closing twice is safe
+    flights.close()
+
+
+def test_handle():
+    columns = {
+        'time': numpy.arange(5, dtype=numpy.int64),
+        'validity': numpy.array([True, False, True, True, False]),
+        'lat': numpy.linspace(45., 46., 5),
+        'empty': numpy.zeros(0),
+    }
+    handle = SharedColumns.create(columns)
+    try:
+        copy = pickle.loads(pickle.dumps(handle))
+        assert len(pickle.dumps(handle)) < 500
+
+        shared = copy.open()
+        for name, values in columns.items():
+            numpy.testing.assert_array_equal(shared[name], values)
+            assert shared[name].ctypes.data % 8 == 0
+
+        # the arrays are views of the same memory
+        shared['time'][0] = 42
+        assert handle.open()['time'][0] == 42
+
+        del shared
+        copy.close()
+    finally:
+        handle.unlink()
+
+    assert not exists(handle.name)
+
+
+def test_cleanup_after_error(monkeypatch):
+    created = []
+    create = SharedColumns.create.__func__
+
+    def recording_create(cls, columns):
+        handle = create(cls, columns)
+        created.append(handle.name)
+        return handle
+
+    monkeypatch.setattr(
+        SharedColumns, 'create', classmethod(recording_create))
+
+    paths = PATHS[:2] + [os.path.join(DATA_DIR, 'missing.igc')] + PATHS[2:]
+    pool = multiprocessing.pool.ThreadPool(2)
+    try:
+        with pytest.raises(IOError):
+            read_shared(paths, pool=pool)
+    finally:
+        pool.close()
+        pool.join()
+
+    assert len(created) == len(PATHS)
+    assert not any(exists(name) for name in created)
+
+    created[:] = []
+    with pytest.raises(IOError):
+        read_shared(paths, workers=1)
+    assert len(created) == 2
+    assert not any(exists(name) for name in created)
+
+
+def test_read_shared_latin1(latin1_path):
+    with read_shared([latin1_path], workers=1) as flights:
+        assert len(flights[0].columns['time']) > 0
+
+
+def test_requires_numpy(monkeypatch):
+    monkeypatch.setattr(aerofiles.igc.columns, 'numpy_missing', True)
+    with pytest.raises(ImportError):
+        read_shared(PATHS)
@@ -0,0 +1,81 @@
+import datetime
+import math
+
+from aerofiles.igc.thermals import detect_thermals, fit_circle
+from aerofiles.util import geo
+
+import pytest
+
+
+START = datetime.datetime(2020, 5, 1, 12, 0, 0)
+M_PER_DEG = math.radians(geo.EARTH_RADIUS)
+
+
+def thermal_flight(wind=(5., 0.), airspeed=25., direction=1):
+    """
+    Return 1 Hz fixes of 60 s cruise north, 180 s circling with 2 m/s climb
+    and another 60 s cruise north, all with the given ``(east, north)`` wind.
+    """
+    lat, lon, alt = 50., 8., 1000.
+    heading = 0.
+    fixes = []
+    for t in range(300):
+        fixes.append({
+            'datetime': START + datetime.timedelta(seconds=t),
+            'lat': lat, 'lon': lon, 'validity': 'A',
+            'pressure_alt': int(round(alt)), 'gps_alt': int(round(alt)),
+        })
+
+        if 60 <= t < 240:
+            heading += direction * 18.
+            alt += 2.
+        else:
+            heading = 0.
+
+        east = airspeed * math.sin(math.radians(heading)) + wind[0]
+        north = airspeed * math.cos(math.radians(heading)) + wind[1]
+        lat += north / M_PER_DEG
+        lon += east / (M_PER_DEG * math.cos(math.radians(lat)))
+
+    return fixes
+
+
+def test_fit_circle(use_numpy):
+    angles = [math.radians(a) for a in range(0, 360, 30)]
+    xs = [3. + 2. * math.cos(a) for a in angles]
+    ys = [-1. + 2. * math.sin(a) for a in angles]
+
+    assert fit_circle(xs, ys) == pytest.approx((3., -1., 2.))
+    assert fit_circle(xs[:2], ys[:2]) is None
+    assert fit_circle([0., 1., 2.], [0., 1., 2.]) is None
+
+
+def test_detect_thermals(use_numpy):
+    thermals = detect_thermals(thermal_flight())
+    assert len(thermals) == 1
+
+    thermal = thermals[0]
+    assert thermal.direction == 'right'
+    assert 160 <= thermal.duration <= 200
+    assert thermal.climb_rate == pytest.approx(2., abs=0.2)
+    assert thermal.altitude_gain > 300
+
+    assert thermal.wind_speed == pytest.approx(5., abs=0.2)
+    assert thermal.wind_direction == pytest.approx(270., abs=2.)
+    assert thermal.airspeed == pytest.approx(25., abs=0.5)
+    assert thermal.drift == pytest.approx((5., 0.), abs=1.)
+
+
+def test_detect_thermals_wind_from_north(use_numpy):
+    thermals = detect_thermals(
+        thermal_flight(wind=(0., -8.), direction=-1))
+
+    assert [t.direction for t in thermals] == ['left']
+    assert thermals[0].wind_speed == pytest.approx(8., abs=0.2)
+    assert thermals[0].wind_direction == pytest.approx(0., abs=2.) or \
+        thermals[0].wind_direction == pytest.approx(360., abs=2.)
+
+
+def test_no_thermals(use_numpy):
+    fixes = thermal_flight()[:60]
+    assert detect_thermals(fixes) == []
@@ -1,13 +1,21 @@
 import datetime
 from io import BytesIO
+import os
+import time
 
-from aerofiles.igc import Writer
+from aerofiles.igc import Reader, Writer
+from aerofiles.igc.columns import fix_timestamp
+import aerofiles.igc.writer
+import aerofiles.igc.columns
 
 from freezegun import freeze_time
 
 import pytest
 
 
+DATA_DIR = os.path.join(os.path.dirname(__file__), 'data')
+
+
 @pytest.fixture()
 def output():
     return BytesIO()
@@ -517,6 +525,56 @@ def test_fix(writer):
     assert writer.fp.getvalue() == b'B1234565124225N00624765EA0123401432\r\n'
 
 
+def test_fix_integer_coordinates(output):
+    writer = Writer(output, integer_coordinates=True)
+    writer.write_fix(
+        datetime.time(12, 34, 56),
+        latitude=-(51 * 60000 + 24225),
+        longitude=179 * 60000 + 59999,
+        valid=True,
+        pressure_alt=1234,
+        gps_alt=1432,
+    )
+    assert writer.fp.getvalue() == b'B1234565124225S17959999EA0123401432\r\n'
+
+
+def test_invalid_integer_coordinates(output):
+    writer = Writer(output, integer_coordinates=True)
+    with pytest.raises(ValueError):
+        writer.write_fix(latitude=90 * 60000 + 1)
+
+    with pytest.raises(ValueError):
+        writer.write_fix(longitude=-180 * 60000 - 1)
+
+
+def test_integer_coordinates_round_trip(output):
+    path = os.path.join(DATA_DIR, 'example.igc')
+    with open(path, 'r') as f:
+        lines = f.read().splitlines()
+    with open(path, 'r') as f:
+        result = Reader(integer_coordinates=True).read(f)
+
+    writer = Writer(output, integer_coordinates=True)
+    for waypoint in result['task'][1]['waypoints']:
+        writer.write_task_point(
+            waypoint['latitude'], waypoint['longitude'],
+            waypoint['description'])
+    for fix in result['fix_records'][1]:
+        writer.write_fix(
+            fix['time'], fix['lat'], fix['lon'], fix['validity'] == 'A',
+            fix['pressure_alt'], fix['gps_alt'])
+
+    written = output.getvalue().decode('ascii').splitlines()
+    waypoints = len(result['task'][1]['waypoints'])
+    c_records = [line for line in lines if line.startswith('C')]
+    b_records = [line for line in lines if line.startswith('B')]
+
+    # the reader keeps the last task declaration of the file
+    assert [line[:18] for line in written[:waypoints]] == \
+        [line[:18] for line in c_records[-waypoints:]]
+    assert written[waypoints:] == [line[:35] for line in b_records]
+
+
 def test_default_fix(writer):
     with freeze_time("2012-01-14 03:21:34"):
         writer.write_fix()
@@ -604,6 +662,379 @@ def test_fix_with_invalid_longitude(writer):
     assert 'Invalid longitude:' in str(ex)
 
 
+def fix_arguments(path, integer_coordinates=False):
+    with open(path, 'r') as f:
+        result = Reader(integer_coordinates=integer_coordinates).read(f)
+
+    names = [e['extension_type'] for e in result['fix_record_extensions'][1]]
+    return [
+        (fix['datetime'], fix['lat'], fix['lon'], fix['validity'] == 'A',
+         fix['pressure_alt'], fix['gps_alt'],
+         [fix.get(name, 0) for name in names])
+        for fix in result['fix_records'][1]
+    ], [(e['extension_type'], e['bytes'][1] - e['bytes'][0] + 1)
+        for e in result['fix_record_extensions'][1]]
+
+
+@pytest.mark.parametrize('integer_coordinates', [False, True])
+@pytest.mark.parametrize('chunk_size', [1, 7, 1024])
+def test_write_fixes(integer_coordinates, chunk_size):
+    for name in ('example.igc', 'xctrack-2023-04-28.igc',
+                 'skytraxx21-2023-04-15.igc'):
+        fixes, extensions = fix_arguments(
+            os.path.join(DATA_DIR, name), integer_coordinates)
+
+        single = Writer(BytesIO(), integer_coordinates=integer_coordinates)
+        bulk = Writer(BytesIO(), integer_coordinates=integer_coordinates)
+        if extensions:
+            single.write_fix_extensions(extensions)
+            bulk.write_fix_extensions(extensions)
+
+        for fix in fixes:
+            single.write_fix(*fix)
+        bulk.write_fixes(iter(fixes), chunk_size=chunk_size)
+
+        assert bulk.fp.getvalue() == single.fp.getvalue()
+
+
+def test_write_fixes_arguments(writer):
+    writer.write_fix_extensions([('FXA', 3), ('SIU', 2)])
+    fixes = [
+        (datetime.time(1, 2, 3), 51.40375, -6.41275, True, 12, -3, ['001', 2.7]),
+        {'time': datetime.datetime(2020, 1, 2, 3, 4, 5), 'latitude': -0.5,
+         'extensions': [999, 99]},
+        {'time': '120000', 'longitude': 179.99999, 'valid': True,
+         'pressure_alt': 1234.9, 'extensions': ['\xe4bc', 0]},
+    ]
+
+    expected = Writer(BytesIO())
+    expected.write_fix_extensions([('FXA', 3), ('SIU', 2)])
+    expected.write_fix(*fixes[0])
+    expected.write_fix(**fixes[1])
+    expected.write_fix(**fixes[2])
+
+    writer.write_fixes(fixes)
+    assert writer.fp.getvalue() == expected.fp.getvalue()
+
+
+def test_write_fixes_default_time(writer):
+    with freeze_time("2012-01-14 03:21:34"):
+        writer.write_fixes([(), {}])
+    assert writer.fp.getvalue() == b'B0321340000000N00000000EV0000000000\r\n' * 2
+
+
+@pytest.mark.parametrize('fix, message', [
+    ((datetime.time(2, 3, 4), 91.2), 'Invalid latitude:'),
+    ((datetime.time(2, 3, 4), 0, 181), 'Invalid longitude:'),
+    (('abcdef', ), 'Invalid time: abcdef'),
+    ((datetime.time(2, 3, 4), ) + (None, ) * 5 + (['023'], ),
+     'Number of extensions does not match declaration'),
+    ((datetime.time(2, 3, 4), ), 'Invalid extensions list'),
+    ((datetime.time(2, 3, 4), ) + (None, ) * 5 + (['x', 13, 2], ),
+     'Extension value has wrong length'),
+])
+def test_write_fixes_errors(writer, fix, message):
+    writer.write_fix_extensions([('FXA', 3), ('SIU', 2), ('ENL', 3)])
+    valid = (datetime.time(2, 3, 3), 1., 2., True, 0, 0, [1, 2, 3])
+
+    with pytest.raises(ValueError) as ex:
+        writer.write_fixes([valid, valid, fix, valid])
+    assert message in str(ex)
+
+    # the fixes before the invalid one are written
+    assert writer.fp.getvalue().count(b'B020303') == 2
+
+
+def test_write_fixes_integer_coordinate_errors(output):
+    writer = Writer(output, integer_coordinates=True)
+    with pytest.raises(ValueError):
+        writer.write_fixes([(datetime.time(2, 3, 4), 90 * 60000 + 1)])
+
+    with pytest.raises(ValueError):
+        writer.write_fixes([(datetime.time(2, 3, 4), 0, -180 * 60000 - 1)])
+
+    assert output.getvalue() == b''
+
+
+@pytest.mark.parametrize('integer_coordinates', [False, True])
+def test_write_fix_columns(integer_coordinates):
+    numpy = pytest.importorskip('numpy')
+
+    for name in ('example.igc', 'xctrack-2023-04-28.igc',
+                 'skytraxx21-2023-04-15.igc'):
+        fixes, extensions = fix_arguments(
+            os.path.join(DATA_DIR, name), integer_coordinates)
+
+        expected = Writer(BytesIO(), integer_coordinates=integer_coordinates)
+        columnar = Writer(BytesIO(), integer_coordinates=integer_coordinates)
+        if extensions:
+            expected.write_fix_extensions(extensions)
+            columnar.write_fix_extensions(extensions)
+
+        expected.write_fixes(fixes)
+
+        time, latitude, longitude, valid, pressure_alt, gps_alt, values = \
+            zip(*fixes)
+        columnar.write_fix_columns(
+            numpy.array([fix_timestamp({'datetime': t}) for t in time]),
+            numpy.array(latitude),
+            numpy.array(longitude),
+            valid=numpy.array(valid),
+            pressure_alt=numpy.array(pressure_alt),
+            gps_alt=list(gps_alt),
+            extensions=dict(
+                (type, numpy.array([v[i] for v in values]))
+                for i, (type, _) in enumerate(extensions)),
+        )
+
+        assert columnar.fp.getvalue() == expected.fp.getvalue()
+
+
+def test_write_fix_columns_values(writer):
+    numpy = pytest.importorskip('numpy')
+
+    writer.write_fix_extensions([('FXA', 3), ('SIU', 2)])
+    writer.write_fix_columns(
+        numpy.array([0, 86399, 86400 + 3723, 1588334400]),
+        numpy.array([51.40375, -0.5, numpy.nan, 45.9999999]),
+        numpy.array([-6.41275, 179.99999, 0., -0.]),
+        pressure_alt=numpy.array([-12.5, 99999, numpy.nan, 0]),
+        gps_alt=-3,
+        extensions={'SIU': [1, 2, 3, 4], 'FXA': numpy.array([1, 22, 333, -9.])},
+    )
+
+    assert writer.fp.getvalue().splitlines()[1:] == [
+        b'B0000005124225N00624765WV-0012-000300101',
+        b'B2359590030000S17959999EV99999-000302202',
+        b'B0102030000000N00000000EV00000-000333303',
+        b'B1200004600000N00000000EV00000-0003-0904',
+    ]
+
+
+def test_write_fix_columns_integer_coordinates(output):
+    numpy = pytest.importorskip('numpy')
+
+    writer = Writer(output, integer_coordinates=True)
+    writer.write_fix_columns(
+        numpy.array(['2020-05-01T00:01'], dtype='datetime64[m]'),
+        [90 * 60000], numpy.array([-(180 * 60000)], dtype=numpy.int32),
+        valid=True, pressure_alt=[1234], gps_alt=[1432])
+
+    assert output.getvalue() == b'B0001009000000N18000000WA0123401432\r\n'
+
+
+@pytest.mark.parametrize('latitude, longitude, expected', [
+    (51.99999999, -6.999999999, b'5200000N00700000W'),
+    (-0.999999999, 179.99999999, b'0100000S18000000E'),
+    (89.999999999, 0.00000001, b'9000000N00000000E'),
+    (12.5000083, -12.49999, b'1230000N01229999W'),
+])
+def test_degree_boundary(latitude, longitude, expected):
+    numpy = pytest.importorskip('numpy')
+    time = datetime.time(1, 2, 3)
+    record = b'B010203' + expected + b'V0000000000\r\n'
+
+    single = Writer(BytesIO())
+    single.write_fix(time, latitude, longitude)
+    assert single.fp.getvalue() == record
+
+    bulk = Writer(BytesIO())
+    bulk.write_fixes([(time, latitude, longitude)])
+    assert bulk.fp.getvalue() == record
+
+    columnar = Writer(BytesIO())
+    columnar.write_fix_columns(
+        [3723], numpy.array([latitude]), numpy.array([longitude]))
+    assert columnar.fp.getvalue() == record
+
+
+@pytest.mark.parametrize('kwargs, message', [
+    ({'latitude': [1, 91]}, 'Invalid latitude: 91'),
+    ({'longitude': [-180.5, 0]}, 'Invalid longitude: -180.5'),
+    ({'gps_alt': [100000, 0]}, 'Altitude value has wrong length'),
+    ({'pressure_alt': [0, -10000]}, 'Altitude value has wrong length'),
+    ({'valid': [True]}, 'Columns have different lengths'),
+    ({'extensions': {'FXA': [1, 2]}},
+     'Extensions do not match declaration'),
+    ({'extensions': {'FXA': [1, 2], 'ENL': [1, 2], 'SIU': [1, 2]}},
+     'Extensions do not match declaration'),
+    ({'extensions': {'FXA': [1, 2], 'SIU': [1, 100]}},
+     'Extension value has wrong length'),
+    ({'extensions': {'FXA': [1, float('nan')], 'SIU': [1, 2]}},
+     'Missing extension value'),
+])
+def test_write_fix_columns_errors(writer, kwargs, message):
+    pytest.importorskip('numpy')
+
+    writer.write_fix_extensions([('FXA', 3), ('SIU', 2)])
+    arguments = {
+        'time': [1, 2], 'latitude': [0, 0], 'longitude': [0, 0],
+        'extensions': {'FXA': [1, 2], 'SIU': [1, 2]},
+    }
+    arguments.update(kwargs)
+
+    with pytest.raises(ValueError) as ex:
+        writer.write_fix_columns(**arguments)
+    assert message in str(ex)
+
+    # nothing is written
+    assert writer.fp.getvalue().count(b'B') == 0
+
+
+def test_write_fix_columns_requires_numpy(writer, monkeypatch):
+    monkeypatch.setattr(aerofiles.igc.columns, 'numpy_missing', True)
+    with pytest.raises(ImportError):
+        writer.write_fix_columns([], [], [])
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.
+
+    def time(self):
+        return self.now
+
+
+class CountingOutput(BytesIO):
+    def __init__(self):
+        BytesIO.__init__(self)
+        self.writes = 0
+        self.flushes = 0
+
+    def write(self, data):
+        self.writes += 1
+        return BytesIO.write(self, data)
+
+    def flush(self):
+        self.flushes += 1
+
+
+FIX = (datetime.time(1, 2, 3), 51.40375, 6.41275, True, 12, 15)
+
+
+def test_unbuffered(writer):
+    writer.write_fix(*FIX)
+    assert writer.buffer is None
+    assert writer.fp.getvalue() == b'B0102035124225N00624765EA0001200015\r\n'
+
+
+def test_flush_records():
+    output = CountingOutput()
+    writer = Writer(output, flush_records=3)
+
+    writer.write_fix(*FIX)
+    writer.write_fix(*FIX)
+    assert output.getvalue() == b''
+
+    writer.write_fix(*FIX)
+    assert output.getvalue().count(b'B') == 3
+    assert (output.writes, output.flushes) == (1, 1)
+
+    writer.write_fixes([FIX] * 4, chunk_size=2)
+    assert output.getvalue().count(b'B') == 7
+    assert output.writes == 2
+
+    writer.write_fix(*FIX)
+    writer.flush()
+    assert output.getvalue().count(b'B') == 8
+    assert (output.writes, output.flushes) == (3, 3)
+
+    # flushing an empty buffer only flushes the file
+    writer.flush()
+    assert (output.writes, output.flushes) == (3, 4)
+
+
+def test_flush_interval(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(aerofiles.igc.writer, '_monotonic', clock.time)
+
+    output = CountingOutput()
+    writer = Writer(output, flush_interval=2.5)
+
+    writer.write_fix(*FIX)
+    clock.now += 2
+    writer.write_fix(*FIX)
+    assert output.getvalue() == b''
+
+    clock.now += 0.5
+    writer.write_fix(*FIX)
+    assert output.getvalue().count(b'B') == 3
+
+    clock.now += 1
+    writer.write_fix(*FIX)
+    assert output.getvalue().count(b'B') == 3
+    assert output.writes == 1
+
+
+def test_flush_interval_ignores_system_time(monkeypatch):
+    assert aerofiles.igc.writer._monotonic is \
+        getattr(time, 'monotonic', time.time)
+
+    clock = Clock()
+    monkeypatch.setattr(aerofiles.igc.writer, '_monotonic', clock.time)
+    output = CountingOutput()
+    writer = Writer(output, flush_interval=2.5)
+
+    # the system time is set back, e.g. from GPS
+    monkeypatch.setattr(time, 'time', lambda: 0.)
+    writer.write_fix(*FIX)
+    clock.now += 3
+    writer.write_fix(*FIX)
+    assert output.getvalue().count(b'B') == 2
+
+
+def test_flush_on_event():
+    output = CountingOutput()
+    writer = Writer(output, flush_on_event=True)
+
+    writer.write_fix(*FIX)
+    writer.write_satellites(datetime.time(1, 2, 3), [1, 2])
+    assert output.getvalue() == b''
+
+    writer.write_event(datetime.time(1, 2, 4), 'PEV')
+    assert output.getvalue().splitlines()[-1] == b'E010204PEV'
+    assert output.writes == 1
+
+
+def test_close():
+    output = CountingOutput()
+    with Writer(output, flush_records=100) as writer:
+        writer.write_fix(*FIX)
+        writer.write_fix(*FIX)
+        assert output.getvalue() == b''
+
+    assert output.getvalue().count(b'B') == 2
+    assert output.writes == 1
+    assert not output.closed
+
+    # also after an error
+    output = CountingOutput()
+    with pytest.raises(ValueError):
+        with Writer(output, flush_interval=60) as writer:
+            writer.write_fix(*FIX)
+            writer.write_fix(latitude=100)
+    assert output.getvalue().count(b'B') == 1
+
+
+def test_fsync(tmpdir, monkeypatch):
+    synced = []
+    monkeypatch.setattr(os, 'fsync', synced.append)
+
+    with open(str(tmpdir.join('flight.igc')), 'wb') as output:
+        writer = Writer(output, flush_records=2, fsync=True)
+        writer.write_fix(*FIX)
+        assert synced == []
+
+        writer.write_fix(*FIX)
+        assert synced == [output.fileno()]
+
+        writer.flush()
+        assert synced == [output.fileno()] * 2
+
+    with open(str(tmpdir.join('flight.igc')), 'rb') as f:
+        assert f.read().count(b'B') == 2
+
+
 def test_event(writer):
     writer.write_event(datetime.time(12, 34, 56), 'PEV')
     assert writer.fp.getvalue() == b'E123456PEV\r\n'
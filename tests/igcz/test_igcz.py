@@ -0,0 +1,162 @@
+import io
+import os
+
+from aerofiles import igc
+from aerofiles.igcz import Reader, Writer
+from aerofiles.igcz.format import (
+    read_deltas, read_varint, unzigzag, write_deltas, write_varint, zigzag,
+)
+
+import pytest
+
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), '..', 'igc', 'data')
+NAMES = sorted(name for name in os.listdir(DATA_DIR) if name.endswith('.igc'))
+
+
+def compress(data, **kwargs):
+    fp = io.BytesIO()
+    Writer(fp, **kwargs).write(io.BytesIO(data))
+    fp.seek(0)
+    return fp
+
+
+def read_data(name):
+    with open(os.path.join(DATA_DIR, name), 'rb') as f:
+        return f.read()
+
+
+def test_varints():
+    for value in (0, 1, -1, 63, -64, 64, 1 << 40, -(1 << 40)):
+        assert unzigzag(zigzag(value)) == value
+
+    buffer = bytearray()
+    for value in (0, 127, 128, 300, 1 << 35):
+        write_varint(buffer, value)
+    assert len(buffer) == 1 + 1 + 2 + 2 + 6
+
+    position = 0
+    for value in (0, 127, 128, 300, 1 << 35):
+        decoded, position = read_varint(buffer, position)
+        assert decoded == value
+
+    buffer = bytearray()
+    write_deltas(buffer, [5, 3, 3, -10, 100000])
+    assert read_deltas(buffer, 0, 5) == ([5, 3, 3, -10, 100000], len(buffer))
+
+
+@pytest.mark.parametrize('name', NAMES)
+@pytest.mark.parametrize('compressed', [True, False])
+def test_round_trip(name, compressed):
+    data = read_data(name)
+    fp = compress(data, compress=compressed)
+
+    output = io.BytesIO()
+    Reader().decompress(fp, output)
+    assert output.getvalue() == data
+
+
+@pytest.mark.parametrize('name', NAMES)
+def test_read(name):
+    with open(os.path.join(DATA_DIR, name), 'r') as f:
+        expected = igc.Reader().read(f)
+
+    assert Reader().read(compress(read_data(name))) == expected
+
+
+@pytest.mark.parametrize('name', NAMES)
+def test_read_integer_coordinates(name):
+    with open(os.path.join(DATA_DIR, name), 'r') as f:
+        expected = igc.Reader(integer_coordinates=True).read(
+            f, aggregators=[igc.FixCount()])
+
+    reader = Reader(integer_coordinates=True)
+    result = reader.read(
+        compress(read_data(name)), aggregators=[igc.FixCount()])
+    assert result == expected
+
+
+def test_read_unchanged_records():
+    data = (
+        b'AXXX\r\n'
+        b'HFDTE150419\r\n'
+        b'HFPLTPILOTINCHARGE:J\xf6rg\r\n'
+        b'I013638FXA\r\n'
+        b'B1200004804500N01152000EA0050000600010\r\n'
+        b'B1200014804500N01152000EA00500006000X0\r\n'
+        b'B120002\r\n'
+        b'B2359594804500N01152000EA0050000600010\r\n'
+        b'B0000004804500N01152000EA0050000600010\r\n'
+        b'E000001PEV\r\n'
+    )
+    expected = igc.Reader().read(
+        io.StringIO(data.decode('utf-8', 'replace')))
+    result = Reader().read(compress(data))
+
+    assert result['header'][1]['pilot'] == u'J\ufffdrg'
+    assert [fix['datetime'] for fix in result['fix_records'][1]] == \
+        [fix['datetime'] for fix in expected['fix_records'][1]]
+    assert len(result['fix_records'][1]) == 4
+    assert result['event_records'] == expected['event_records']
+
+    # the invalid B records are reported
+    assert result['fix_records'][0] == expected['fix_records'][0]
+    del result['fix_records'], expected['fix_records']
+    assert result == expected
+
+
+def test_size():
+    data = read_data('xctrack-2023-04-28.igc')
+    uncompressed = compress(data, compress=False).getvalue()
+    compressed = compress(data).getvalue()
+
+    assert len(uncompressed) < len(data) / 3
+    assert len(compressed) < len(uncompressed)
+
+
+def test_read_columns():
+    name = 'xctrack-2023-04-28.igc'
+    with open(os.path.join(DATA_DIR, name), 'r') as f:
+        expected = igc.Reader(integer_coordinates=True).read(f)
+    fixes = expected['fix_records'][1]
+
+    columns = Reader().read_columns(compress(read_data(name)))
+    assert columns['lat'] == [fix['lat'] for fix in fixes]
+    assert columns['lon'] == [fix['lon'] for fix in fixes]
+    assert columns['gps_alt'] == [fix['gps_alt'] for fix in fixes]
+    assert columns['valid'] == [fix['validity'] == 'A' for fix in fixes]
+    assert columns['time'][0] == \
+        fixes[0]['time'].hour * 3600 + fixes[0]['time'].minute * 60 + \
+        fixes[0]['time'].second
+
+    for extension in expected['fix_record_extensions'][1]:
+        name = extension['extension_type']
+        assert columns[name] == [fix[name] for fix in fixes]
+
+
+def test_unchanged_records():
+    data = (
+        b'AXXX\r\n'
+        b'HFDTE150419\r\n'
+        b'I013638FXA\r\n'
+        b'B1200004804500N01152000EA0050000600010\r\n'
+        b'B1200014804500N01152000EA00500006000X0\r\n'
+        b'B120002\r\n'
+        b'B1200034804500N01152000EA0050000600010\n'
+        b'I023638FXA3940SIU\r\n'
+        b'B1200044804500N01152000EA005000060001012\r\n'
+        b'GABC'
+    )
+    fp = compress(data)
+    assert len(Reader().read_columns(fp)['time']) == 1
+
+    fp.seek(0)
+    assert b''.join(Reader().lines(fp)) == data
+
+
+def test_invalid():
+    with pytest.raises(ValueError):
+        Reader().read_columns(io.BytesIO(b'AXXX\r\n'))
+
+    fp = compress(b'')
+    assert Reader().read_columns(fp)['time'] == []